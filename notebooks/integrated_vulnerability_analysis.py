@@ -1,5 +1,6 @@
 import json
 import os
+import sys
 import numpy as np
 import pandas as pd
 import matplotlib as mpl
@@ -10,6 +11,9 @@ from folium.features import GeoJsonTooltip
 from branca.element import Template, MacroElement, Element
 import branca.colormap as cm
 
+sys.path.append('../scripts')
+from geo_cache import load_geo_all
+
 # ---------------------------
 # 0) 글로벌 설정: 한글 폰트 & 음수 기호
 # ---------------------------
@@ -41,11 +45,8 @@ paths = {
     '충남': '../data/raw/hangjeongdong_충청남도.geojson',
     '충북': '../data/raw/hangjeongdong_충청북도.geojson',
 }
-geos = [json.load(open(p, encoding='utf-8')) for p in paths.values()]
-geo_all = {
-    "type": "FeatureCollection",
-    "features": [f for g in geos for f in g['features']]
-}
+# 바이너리 캐시 사용 (원본 변경 시 자동 재생성)
+geo_all = load_geo_all(paths, cache_dir='../data/cache/geometry')
 
 print(f"✅ GeoJSON 로드 완료: {len(geo_all['features'])}개 행정동")
 
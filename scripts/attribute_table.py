@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+지도 속성 테이블 (adm_cd2 키, 열 단위 JSON)
+행정동마다 속성/툴팁 문자열을 지오메트리에 싣는 대신 지도당 한 번 표 형태로 포함하고
+스타일·툴팁은 JS 함수 하나가 adm_cd2로 표를 조회하여 생성
+- 수치 열은 표시 자릿수로 미리 반올림 (파이썬 f"{v:.1f}"와 JS toFixed(1) 결과가 같아짐)
+- 문자열 열(행정동명, 등급 라벨)은 범주 목록 + 코드 배열로 저장
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+from branca.element import Element, MacroElement, Template
+
+# adm_cd2 → 행 객체 조회 함수 (표 하나당 한 번 정의)
+LOOKUP_SCRIPT = """
+{% macro script(this, kwargs) %}
+var {{ this.get_name() }} = (function(table) {
+    const index = new Map(table.key.map((key, i) => [key, i]));
+    const names = Object.keys(table.columns);
+    return function(key) {
+        const i = index.get(key);
+        const row = {};
+        if (i === undefined) return row;
+        names.forEach(function(name) {
+            const column = table.columns[name];
+            const value = Array.isArray(column) ? column[i] : column.categories[column.codes[i]];
+            if (value !== null) row[name] = value;
+        });
+        return row;
+    };
+})({{ this.table }});
+{% endmacro %}
+"""
+
+# 행정동 레이어 스타일/툴팁 (줌 단계별 지오메트리 교체 후 재적용)
+LAYER_SCRIPT = """
+{% macro script(this, kwargs) %}
+(function() {
+    const geoLayer = {{ this.geojson_name }};
+    const lookup = {{ this.lookup_name }};
+    const style = {{ this.style_js }};
+    const tooltip = {{ this.tooltip_js }};
+
+    function restyle() {
+        geoLayer.setStyle(feature => style(lookup(feature.properties.{{ this.key }})));
+    }
+
+    geoLayer.bindTooltip(function(layer) {
+        return tooltip(lookup(layer.feature.properties.{{ this.key }}));
+    }, {sticky: true, className: '{{ this.tooltip_class }}'});
+    geoLayer.on('lodchange', restyle);
+    restyle();
+})();
+{% endmacro %}
+"""
+
+
+def build_attribute_table(frame, key='adm_cd2', decimals=1):
+    """
+    DataFrame → 열 단위 속성 테이블 딕셔너리
+    Args:
+        frame (pd.DataFrame): 행정동별 속성 (key 열 포함)
+        key (str): 조회 키 열
+        decimals (int | dict): 실수 열 반올림 자릿수 (열 이름별 지정 가능)
+    Returns:
+        dict: {'key': [...], 'columns': {열: 값 목록 또는 {'categories', 'codes'}}}
+    """
+    columns = {}
+    for name in frame.columns:
+        if name == key:
+            continue
+        series = frame[name]
+        if pd.api.types.is_float_dtype(series):
+            digits = decimals.get(name, 1) if isinstance(decimals, dict) else decimals
+            # 내장 round는 정확한 이진 값 기준 반올림이라 f"{v:.1f}"와 일치 (np.round는 10배 후 반올림이라 어긋남)
+            columns[name] = [None if np.isnan(v) else round(v, digits) for v in series.tolist()]
+        elif pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+            columns[name] = series.tolist()
+        else:
+            categorical = pd.Categorical(series.astype(object).where(series.notna(), None))
+            columns[name] = {'categories': [str(c) for c in categorical.categories],
+                             'codes': categorical.codes.tolist()}
+            if (categorical.codes < 0).any():
+                # 결측값은 null 범주로
+                columns[name]['categories'].append(None)
+                columns[name]['codes'] = np.where(categorical.codes < 0, len(categorical.categories),
+                                                  categorical.codes).tolist()
+    return {'key': frame[key].astype(str).tolist(), 'columns': columns}
+
+
+class AttributeTable(MacroElement):
+    """지도에 속성 테이블과 조회 함수를 추가 (JS에서 get_name()(adm_cd2) → 행 객체)"""
+
+    _template = Template(LOOKUP_SCRIPT)
+
+    def __init__(self, table):
+        super().__init__()
+        self._name = 'AttributeTable'
+        self.table = json.dumps(table, ensure_ascii=False, separators=(',', ':'))
+
+
+def add_attribute_layer(m, geo_layer, table, style_js, tooltip_js, key='adm_cd2', tooltip_style='font-size: 12px;'):
+    """
+    geo_layer에 속성 테이블 기반 스타일/툴팁 추가
+    Args:
+        style_js (str): 행 객체 → Leaflet 스타일을 반환하는 JS 함수 식
+        tooltip_js (str): 행 객체 → 툴팁 HTML을 반환하는 JS 함수 식
+    Returns:
+        AttributeTable: 추가된 테이블 (다른 스크립트에서 get_name()으로 조회)
+    """
+    lookup = AttributeTable(table)
+    m.add_child(lookup)
+
+    tooltip_class = f"{geo_layer.get_name()}_tooltip"
+    m.get_root().header.add_child(Element(f"<style>.{tooltip_class} {{ {tooltip_style} }}</style>"))
+
+    macro = MacroElement()
+    macro._template = Template(LAYER_SCRIPT)
+    macro.geojson_name = geo_layer.get_name()
+    macro.lookup_name = lookup.get_name()
+    macro.style_js = style_js
+    macro.tooltip_js = tooltip_js
+    macro.key = key
+    macro.tooltip_class = tooltip_class
+    m.add_child(macro)
+    return lookup
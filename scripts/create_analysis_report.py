@@ -7,14 +7,20 @@
 import pandas as pd
 import json
 import numpy as np
+from weight_scenarios import DEFAULT_WEIGHTS, integrated_scores
+from weight_sensitivity import load_sensitivity
+from table_store import read_table
+from region_stats import group_means
+from station_locator import load_station_regions, lookup_stations
 
 print("📊 취약지수 분석 리포트 생성 시작")
 
 # 데이터 로드
-housing_data = pd.read_csv('results/yunjin/housing_vulnerability_analysis.csv')
-sewer_data = pd.read_csv('results/yunjin/sewer_infrastructure_analysis_summary.csv')
-social_data = pd.read_csv('data/processed/202506_읍면동_사회취약계층표.csv')
-rainfall_data = pd.read_csv('data/processed/여름_강수량_호우_백분위.csv', encoding='cp949')
+housing_data = read_table('housing_vulnerability')
+sewer_data = read_table('sewer_summary')
+social_data = read_table('social_vulnerability')
+rainfall_data = read_table('rainfall_percentile')
+station_regions = load_station_regions()
 
 # 시도별 통계 계산
 def calculate_sido_stats():
@@ -24,25 +30,10 @@ def calculate_sido_stats():
                  '대전광역시', '울산광역시', '세종특별자치시', '경기도', '강원도', '충청북도', 
                  '충청남도', '전라북도', '전라남도', '경상북도', '경상남도', '제주특별자치도']
     
-    sido_stations = {
-        '서울특별시': ['서울'],
-        '부산광역시': ['부산'],
-        '대구광역시': ['대구'],
-        '인천광역시': ['인천'],
-        '광주광역시': ['광주'],
-        '대전광역시': ['대전'],
-        '울산광역시': ['울산'],
-        '세종특별자치시': ['세종'],
-        '경기도': ['수원', '파주', '동두천', '이천', '양평'],
-        '강원도': ['춘천', '원주', '강릉', '동해', '태백', '속초', '홍천', '영월'],
-        '충청북도': ['충주', '청주', '제천', '보은'],
-        '충청남도': ['천안', '서산', '보령', '홍성'],
-        '전라북도': ['전주', '군산', '정읍', '남원', '순창군', '장수', '임실', '부안'],
-        '전라남도': ['순천', '여수', '목포', '해남', '고흥', '거창', '장흥', '영광군', '진도군'],
-        '경상북도': ['영주', '봉화', '밀양', '상주', '의령군', '정선군', '합천', '태백', '고산', '의성', '문경', '구미', '안동', '경주시', '영천', '청송군', '울진', '영덕', '울릉도'],
-        '경상남도': ['산청', '거제', '통영', '창원', '부여', '양산시', '김해시', '성산', '진주', '밀양', '포항', '남해'],
-        '제주특별자치도': ['제주', '서귀포', '고산', '흑산도', '백령도']
-    }
+    # 강수량지수: 지점이 속한 행정동의 시도별 관측값 평균 (행정동을 못 찾은 지점은 시도 목록 사용)
+    rainfall_col = '백분위(강수량 0.5, 호우 * 0.5)'
+    rainfall_sido = rainfall_data.assign(시도=lookup_stations(rainfall_data['지점정보'], station_regions))
+    rainfall = group_means(rainfall_sido, '시도', {'avg_rainfall': rainfall_col}, groups=sido_list[1:], total_label=None)
     
     for sido in sido_list[1:]:
         housing_sido = housing_data[housing_data['region'] == sido]
@@ -54,17 +45,7 @@ def calculate_sido_stats():
         social_sido = social_data[social_data['시도명'] == sido]
         avg_social = social_sido['사회취약지수'].mean() if len(social_sido) > 0 else 0
         
-        avg_rainfall = 0
-        if sido in sido_stations:
-            stations = sido_stations[sido]
-            rainfall_values = []
-            for station in stations:
-                station_data = rainfall_data[rainfall_data['지점정보'].str.contains(station, na=False)]
-                if len(station_data) > 0:
-                    rainfall_values.extend(station_data['백분위(강수량 0.5, 호우 * 0.5)'].tolist())
-            
-            if rainfall_values:
-                avg_rainfall = sum(rainfall_values) / len(rainfall_values)
+        avg_rainfall = rainfall[sido]['avg_rainfall']
         
         stats[sido] = {
             'avg_housing': avg_housing,
@@ -98,13 +79,8 @@ def analyze_vulnerability_correlations():
     # 상관관계 계산
     correlations = df[['housing', 'sewer', 'social', 'rainfall']].corr()
     
-    # 종합 위험도 계산 (가중 평균)
-    df['integrated_risk'] = (
-        df['housing'] * 0.3 + 
-        df['sewer'] * 0.2 + 
-        df['social'] * 0.2 + 
-        df['rainfall'] * 0.3
-    )
+    # 종합 위험도 계산 (가중 평균, 가중치는 weight_scenarios.DEFAULT_WEIGHTS)
+    df['integrated_risk'] = integrated_scores(df, DEFAULT_WEIGHTS)
     
     # 종합 위험도를 백분율로 변환 (0-100 범위)
     df['integrated_risk_percent'] = df['integrated_risk']
@@ -146,6 +122,55 @@ def analyze_vulnerability_correlations():
 # 분석 실행
 analysis_results = analyze_vulnerability_correlations()
 
+# 가중치 민감도 분석 (scripts/weight_sensitivity.py 결과)
+def build_sensitivity_section(top_k=15):
+    """읍면동별 상위 N 우선지역 확률과 순위 신뢰구간 섹션 HTML"""
+    summary, meta = load_sensitivity()
+    if summary is None:
+        print("⚠️ 민감도 분석 결과가 없습니다. python scripts/weight_sensitivity.py 실행 후 다시 생성하세요.")
+        return '<p>민감도 분석 결과가 없습니다. <code>python scripts/weight_sensitivity.py</code> 실행 후 리포트를 다시 생성하세요.</p>'
+
+    meta = meta or {}
+    top_n = meta.get('top_n', 100)
+    ci = int(round(meta.get('ci_level', 0.95) * 100))
+    prob = summary[f'상위{top_n}확률']
+    certain = int((prob >= 0.9).sum())
+    borderline = int(((prob >= 0.1) & (prob < 0.9)).sum())
+    print(f"🎲 민감도 분석 결과 반영: 상위 {top_n} 확정 {certain}개, 경계 {borderline}개")
+
+    rows = ''.join([f'''
+                        <tr>
+                            <td>{row['adm_nm']}</td>
+                            <td>{int(row['기준순위'])}</td>
+                            <td>{row[f'상위{top_n}확률']:.1%}</td>
+                            <td>{int(row['순위하한'])} ~ {int(row['순위상한'])}</td>
+                            <td>{row['등급유지확률']:.1%}</td>
+                        </tr>
+                        ''' for _, row in summary.head(top_k).iterrows()])
+    return f'''
+                <table class="risk-table">
+                    <thead>
+                        <tr>
+                            <th>읍면동</th>
+                            <th>기준 순위</th>
+                            <th>상위 {top_n} 확률</th>
+                            <th>순위 {ci}% 구간</th>
+                            <th>등급 유지 확률</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {rows}
+                    </tbody>
+                </table>
+                
+                <div class="insights">
+                    <h3>🎲 분석 방식</h3>
+                    <p><strong>표본:</strong> 기준 가중치 중심의 디리클레 가중치(집중도 {meta.get('concentration', '-')})와 등급 경계 흔들림(σ={meta.get('bin_jitter', '-')}) {meta.get('n_samples', 0):,}회</p>
+                    <p><strong>우선지역 판단:</strong> 상위 {top_n} 확률 90% 이상 {certain}개 읍면동은 가중치 선택과 무관하게 우선지역, 10~90% {borderline}개 읍면동은 가중치에 따라 포함 여부가 달라지는 경계 지역입니다.</p>
+                </div>'''
+
+sensitivity_section = build_sensitivity_section()
+
 # 위험도 점수에 따른 CSS 클래스 반환 함수
 def get_risk_class(score):
     if score < 20:
@@ -427,6 +452,11 @@ html_content = f"""
                 </div>
             </div>
             
+            <div class="section">
+                <h2>🎲 가중치 민감도 분석 (읍면동 우선지역 확률)</h2>
+                {sensitivity_section}
+            </div>
+            
             <div class="section">
                 <h2>📋 각 지수별 상위 위험 지역</h2>
                 
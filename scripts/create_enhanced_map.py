@@ -12,56 +12,38 @@ import json
 import numpy as np
 from folium import plugins
 import branca.colormap as cm
-import os
+from geo_cache import GEO_PATHS, load_geometry_cache
+from geometry_lod import add_lod_swap
+from topojson_export import OBJECT_PATH, attach_properties, load_lod_topojson
+from attribute_table import add_attribute_layer, build_attribute_table
+from region_stats import group_means, top_k_records
+from station_locator import load_station_regions, lookup_stations
+from table_store import read_table
 
 print("🚀 향상된 통합 취약지수 지도 생성 시작")
 
 # 데이터 로드
-housing_data = pd.read_csv('results/yunjin/housing_vulnerability_analysis.csv')
-sewer_data = pd.read_csv('results/yunjin/sewer_infrastructure_analysis_summary.csv')
-social_data = pd.read_csv('data/processed/202506_읍면동_사회취약계층표.csv')
-rainfall_data = pd.read_csv('data/processed/여름_강수량_호우_백분위.csv', encoding='cp949')
+housing_data = read_table('housing_vulnerability')
+sewer_data = read_table('sewer_summary')
+social_data = read_table('social_vulnerability')
+rainfall_data = read_table('rainfall_percentile')
 
 # GeoJSON 데이터 로드 및 통합
 print("📁 GeoJSON 데이터 로드 중...")
 
 # 모든 시도의 GeoJSON 파일 경로
-geo_paths = {
-    '서울': 'data/raw/hangjeongdong_서울특별시.geojson',
-    '부산': 'data/raw/hangjeongdong_부산광역시.geojson',
-    '대구': 'data/raw/hangjeongdong_대구광역시.geojson',
-    '인천': 'data/raw/hangjeongdong_인천광역시.geojson',
-    '광주': 'data/raw/hangjeongdong_광주광역시.geojson',
-    '대전': 'data/raw/hangjeongdong_대전광역시.geojson',
-    '울산': 'data/raw/hangjeongdong_울산광역시.geojson',
-    '세종': 'data/raw/hangjeongdong_세종특별자치시.geojson',
-    '경기': 'data/raw/hangjeongdong_경기도.geojson',
-    '강원': 'data/raw/hangjeongdong_강원도.geojson',
-    '충북': 'data/raw/hangjeongdong_충청북도.geojson',
-    '충남': 'data/raw/hangjeongdong_충청남도.geojson',
-    '전북': 'data/raw/hangjeongdong_전라북도.geojson',
-    '전남': 'data/raw/hangjeongdong_전라남도.geojson',
-    '경북': 'data/raw/hangjeongdong_경상북도.geojson',
-    '경남': 'data/raw/hangjeongdong_경상남도.geojson',
-    '제주': 'data/raw/hangjeongdong_제주특별자치도.geojson'
-}
+geo_paths = GEO_PATHS
 
-# GeoJSON 파일들 로드
-geos = []
-for sido, path in geo_paths.items():
-    if os.path.exists(path):
-        with open(path, 'r', encoding='utf-8') as f:
-            geo_data = json.load(f)
-            geos.append(geo_data)
-            print(f"✅ {sido}: {len(geo_data['features'])}개 행정동")
-    else:
-        print(f"❌ {sido}: 파일 없음 ({path})")
+# GeoJSON 파일들 로드 (바이너리 캐시 사용, 원본 변경 시 자동 재생성)
+geo_cache = load_geometry_cache(geo_paths)
+geo_all = geo_cache.to_feature_collection()
 
-# 모든 GeoJSON 병합
-geo_all = {
-    "type": "FeatureCollection",
-    "features": [f for g in geos for f in g['features']]
-}
+# 기상관측 지점 → 행정동 (지점 좌표 포함 판정, 지오메트리/지점 파일이 바뀌면 재계산)
+station_regions = load_station_regions(geo_cache=geo_cache)
+
+# 개별 지도용 줌 단계별 단순화 지오메트리 (전국 단계 TopoJSON으로 싣고 확대 시 교체)
+geo_lod = load_lod_topojson(geo_cache)
+geo_national = next(iter(geo_lod.values()))
 
 print(f"✅ GeoJSON 로드 완료: {len(geo_all['features'])}개 행정동")
 
@@ -88,18 +70,8 @@ def create_individual_map(index_name, index_property, color_scheme, title):
         tiles='OpenStreetMap'
     )
     
-    # 색상 매핑 함수
-    def get_color(value, colors):
-        if pd.isna(value) or value < 1:
-            return colors[0]
-        elif value >= len(colors):
-            return colors[-1]
-        else:
-            return colors[int(value) - 1]
-    
-    # 레이어 생성
-    layer = folium.FeatureGroup(name=title, show=True)
-    
+    # 레이어 생성 (행정동 전체를 TopoJson 하나로, 값/등급은 adm_cd2 키 속성 테이블로 전달)
+    rows = []
     for feat in geo_all['features']:
         # 임시로 랜덤 값 생성 (실제로는 실제 데이터 사용)
         if index_property == '주거취약지수':
@@ -118,26 +90,34 @@ def create_individual_map(index_name, index_property, color_scheme, title):
             value = np.random.uniform(0, 100)
             grade = 3
         
-        color = get_color(grade, color_scheme)
-        
-        folium.GeoJson(
-            feat,
-            style_function=lambda x, color=color: {
-                'fillColor': color,
-                'color': 'black',
-                'weight': 1,
-                'fillOpacity': 0.7
-            },
-            tooltip=folium.Tooltip(
-                f"<b>{feat['properties'].get('adm_nm', '')}</b><br>"
-                f"{title}: {value:.1f}<br>"
-                f"등급: {grade}",
-                style="font-size: 12px;"
-            )
-        ).add_to(layer)
+        rows.append({
+            'adm_cd2': feat['properties'].get('adm_cd2', ''),
+            'adm_nm': feat['properties'].get('adm_nm', ''),
+            'value': value,
+            'grade': grade
+        })
     
+    codes = [{'adm_cd2': row['adm_cd2']} for row in rows]
+    layer = folium.TopoJson(attach_properties(geo_national, codes), OBJECT_PATH, name=title)
     layer.add_to(m)
     
+    # 등급별 색상(1 미만/결측은 첫 색, 팔레트 길이 이상은 마지막 색)과 툴팁은 속성 테이블을 조회하는 JS 함수로 생성
+    add_attribute_layer(
+        m, layer, build_attribute_table(pd.DataFrame(rows)),
+        style_js=f"""row => {{
+            const colors = {json.dumps(color_scheme)};
+            const grade = row.grade;
+            let fillColor = colors[Math.floor(grade) - 1];
+            if (grade === undefined || grade < 1) fillColor = colors[0];
+            else if (grade >= colors.length) fillColor = colors[colors.length - 1];
+            return {{fillColor: fillColor, color: 'black', weight: 1, fillOpacity: 0.7}};
+        }}""",
+        tooltip_js=f"""row => '<b>' + (row.adm_nm === undefined ? '' : row.adm_nm) + '</b><br>'
+            + {json.dumps(title, ensure_ascii=False)} + ': ' + row.value.toFixed(1) + '<br>'
+            + '등급: ' + row.grade"""
+    )
+    add_lod_swap(m, layer, geo_lod)
+    
     # 레이어 컨트롤 추가
     folium.LayerControl().add_to(m)
     
@@ -163,44 +143,12 @@ sewer_map_path = create_individual_map('sewer', '수도인프라지수', sewer_c
 social_map_path = create_individual_map('social', '사회취약지수', social_colors, '사회취약지수')
 rainfall_map_path = create_individual_map('rainfall', '강수량지수', rainfall_colors, '강수량지수')
 
-# 상위 10개 데이터 추출
-def get_top_10_data(data, value_col, name_col):
-    """상위 10개 데이터 추출 (높은 값 순)"""
-    sorted_data = data.sort_values(value_col, ascending=False).head(10)
-    return [
-        {'region': row[name_col], 'value': row[value_col]} 
-        for _, row in sorted_data.iterrows()
-    ]
-
-def get_top_10_data_low(data, value_col, name_col):
-    """상위 10개 데이터 추출 (낮은 값 순)"""
-    sorted_data = data.sort_values(value_col, ascending=True).head(10)
-    return [
-        {'region': row[name_col], 'value': row[value_col]} 
-        for _, row in sorted_data.iterrows()
-    ]
-
-def get_top_10_data_from_features(features, value_col, name_col):
-    """GeoJSON features에서 상위 10개 데이터 추출"""
-    data_list = []
-    for feat in features:
-        properties = feat['properties']
-        if value_col in properties and name_col in properties:
-            data_list.append({
-                'region': properties[name_col],
-                'value': properties[value_col]
-            })
-    
-    # 값 기준으로 정렬 (높은 값이 위험)
-    data_list.sort(key=lambda x: x['value'], reverse=True)
-    return data_list[:10]
-
-# 각 지수별 상위 10개
-housing_top10 = get_top_10_data(housing_data, 'vulnerability_normalized', 'region')
-# 수도인프라지수는 낮은 값이 취약하므로 별도 함수 사용
-sewer_top10 = get_top_10_data_low(sewer_data, '하수도_인프라_지수', '행정구역명')
-social_top10 = get_top_10_data(social_data, '사회취약지수', '읍면동명')
-rainfall_top10 = get_top_10_data(rainfall_data, '백분위(강수량 0.5, 호우 * 0.5)', '지점정보')
+# 각 지수별 상위 10개 (부분 정렬)
+housing_top10 = top_k_records(housing_data, 'vulnerability_normalized', 'region')
+# 수도인프라지수는 낮은 값이 취약하므로 낮은 값 순
+sewer_top10 = top_k_records(sewer_data, '하수도_인프라_지수', '행정구역명', ascending=True)
+social_top10 = top_k_records(social_data, '사회취약지수', '읍면동명')
+rainfall_top10 = top_k_records(rainfall_data, '백분위(강수량 0.5, 호우 * 0.5)', '지점정보')
 
 # 시도 목록
 sido_list = ['전국', '서울특별시', '부산광역시', '대구광역시', '인천광역시', '광주광역시', 
@@ -212,68 +160,23 @@ def calculate_sido_stats():
     """시도별 평균 지수 계산"""
     stats = {}
     
-    # 시도별 기상청 지점 매핑
-    sido_stations = {
-        '서울특별시': ['서울'],
-        '부산광역시': ['부산'],
-        '대구광역시': ['대구'],
-        '인천광역시': ['인천'],
-        '광주광역시': ['광주'],
-        '대전광역시': ['대전'],
-        '울산광역시': ['울산'],
-        '세종특별자치시': ['세종'],
-        '경기도': ['수원', '파주', '동두천', '이천', '양평'],
-        '강원도': ['춘천', '원주', '강릉', '동해', '태백', '속초', '홍천', '영월'],
-        '충청북도': ['충주', '청주', '제천', '보은'],
-        '충청남도': ['천안', '서산', '보령', '홍성'],
-        '전라북도': ['전주', '군산', '정읍', '남원', '순창군', '장수', '임실', '부안'],
-        '전라남도': ['순천', '여수', '목포', '해남', '고흥', '거창', '장흥', '영광군', '진도군'],
-        '경상북도': ['영주', '봉화', '밀양', '상주', '의령군', '정선군', '합천', '태백', '고산', '의성', '문경', '구미', '안동', '경주시', '영천', '청송군', '울진', '영덕', '울릉도'],
-        '경상남도': ['산청', '거제', '통영', '창원', '부여', '양산시', '김해시', '성산', '진주', '밀양', '포항', '남해'],
-        '제주특별자치도': ['제주', '서귀포', '고산', '흑산도', '백령도']
-    }
-    
-    # 전국 평균
-    stats['전국'] = {
-        'avg_housing': housing_data['vulnerability_normalized'].mean(),
-        'avg_sewer': sewer_data['하수도_인프라_지수'].mean(),
-        'avg_social': social_data['사회취약지수'].mean(),
-        'avg_rainfall': rainfall_data['백분위(강수량 0.5, 호우 * 0.5)'].mean()
-    }
-    
-    # 시도별 평균 (주거취약지수는 시도별 데이터가 있으므로 그대로 사용)
-    for sido in sido_list[1:]:  # 전국 제외
-        # 주거취약지수
-        housing_sido = housing_data[housing_data['region'] == sido]
-        avg_housing = housing_sido['vulnerability_normalized'].mean() if len(housing_sido) > 0 else 0
-        
-        # 수도인프라지수
-        sewer_sido = sewer_data[sewer_data['시도'] == sido]
-        avg_sewer = sewer_sido['하수도_인프라_지수'].mean() if len(sewer_sido) > 0 else 0
-        
-        # 사회취약지수
-        social_sido = social_data[social_data['시도명'] == sido]
-        avg_social = social_sido['사회취약지수'].mean() if len(social_sido) > 0 else 0
-        
-        # 강수량지수 (시도별로 해당하는 기상청 지점 사용)
-        avg_rainfall = 0
-        if sido in sido_stations:
-            stations = sido_stations[sido]
-            rainfall_values = []
-            for station in stations:
-                # 지점명에 해당 지점이 포함된 데이터 찾기
-                station_data = rainfall_data[rainfall_data['지점정보'].str.contains(station, na=False)]
-                if len(station_data) > 0:
-                    rainfall_values.extend(station_data['백분위(강수량 0.5, 호우 * 0.5)'].tolist())
-            
-            if rainfall_values:
-                avg_rainfall = sum(rainfall_values) / len(rainfall_values)
-        
+    # 원천 표별 시도 평균 (표마다 한 번 집계, 전국은 표 전체 평균)
+    sido_names = sido_list[1:]
+    housing = group_means(housing_data, 'region', {'avg_housing': 'vulnerability_normalized'}, groups=sido_names)
+    sewer = group_means(sewer_data, '시도', {'avg_sewer': '하수도_인프라_지수'}, groups=sido_names)
+    social = group_means(social_data, '시도명', {'avg_social': '사회취약지수'}, groups=sido_names)
+
+    # 강수량지수 (지점이 속한 행정동의 시도별 관측값 평균, 행정동을 못 찾은 지점은 시도 목록 사용, 전국은 전체 평균)
+    rainfall_col = '백분위(강수량 0.5, 호우 * 0.5)'
+    rainfall_sido = rainfall_data.assign(시도=lookup_stations(rainfall_data['지점정보'], station_regions))
+    rainfall = group_means(rainfall_sido, '시도', {'avg_rainfall': rainfall_col}, groups=sido_names)
+
+    for sido in sido_list:
         stats[sido] = {
-            'avg_housing': avg_housing,
-            'avg_sewer': avg_sewer,
-            'avg_social': avg_social,
-            'avg_rainfall': avg_rainfall
+            'avg_housing': housing[sido]['avg_housing'],
+            'avg_sewer': sewer[sido]['avg_sewer'],
+            'avg_social': social[sido]['avg_social'],
+            'avg_rainfall': rainfall[sido]['avg_rainfall']
         }
     
     return stats
@@ -11,7 +11,21 @@ import json
 import numpy as np
 from folium import plugins
 import branca.colormap as cm
+from branca.element import Template, MacroElement, Element
 import os
+from geo_cache import GEO_PATHS, load_geometry_cache
+from geometry_lod import add_lod_swap
+from attribute_table import AttributeTable, build_attribute_table
+from topojson_export import OBJECT_PATH, attach_properties, load_lod_topojson
+import region_resolver
+from region_resolver import SewerRegionResolver, normalize_sgg_name
+from match_cache import KEY_COLUMNS, MatchCache, match_fingerprint
+from region_crosswalk import RegionCrosswalk, load_crosswalk
+from rainfall_assignment import load_station_weights, interpolate_by_region, nearest_station_by_region
+from grading import GRADE_LABELS, assign_grades, grade_labels
+from weight_scenarios import DEFAULT_WEIGHTS, INDEX_COLUMNS, integrated_scores
+from region_stats import SIDO_STAT_COLUMNS, TOTAL_LABEL, group_means, top_k_table
+from table_store import read_table
 
 print("🚀 통합 취약지수 지도 생성 시작")
 
@@ -21,42 +35,11 @@ print("🚀 통합 취약지수 지도 생성 시작")
 print("📁 GeoJSON 데이터 로드 중...")
 
 # 모든 시도의 GeoJSON 파일 경로
-geo_paths = {
-    '서울': 'data/raw/hangjeongdong_서울특별시.geojson',
-    '부산': 'data/raw/hangjeongdong_부산광역시.geojson',
-    '대구': 'data/raw/hangjeongdong_대구광역시.geojson',
-    '인천': 'data/raw/hangjeongdong_인천광역시.geojson',
-    '광주': 'data/raw/hangjeongdong_광주광역시.geojson',
-    '대전': 'data/raw/hangjeongdong_대전광역시.geojson',
-    '울산': 'data/raw/hangjeongdong_울산광역시.geojson',
-    '세종': 'data/raw/hangjeongdong_세종특별자치시.geojson',
-    '경기': 'data/raw/hangjeongdong_경기도.geojson',
-    '강원': 'data/raw/hangjeongdong_강원도.geojson',
-    '충북': 'data/raw/hangjeongdong_충청북도.geojson',
-    '충남': 'data/raw/hangjeongdong_충청남도.geojson',
-    '전북': 'data/raw/hangjeongdong_전라북도.geojson',
-    '전남': 'data/raw/hangjeongdong_전라남도.geojson',
-    '경북': 'data/raw/hangjeongdong_경상북도.geojson',
-    '경남': 'data/raw/hangjeongdong_경상남도.geojson',
-    '제주': 'data/raw/hangjeongdong_제주특별자치도.geojson'
-}
-
-# GeoJSON 파일들 로드
-geos = []
-for sido, path in geo_paths.items():
-    if os.path.exists(path):
-        with open(path, 'r', encoding='utf-8') as f:
-            geo_data = json.load(f)
-            geos.append(geo_data)
-            print(f"✅ {sido}: {len(geo_data['features'])}개 행정동")
-    else:
-        print(f"❌ {sido}: 파일 없음 ({path})")
+geo_paths = GEO_PATHS
 
-# 모든 GeoJSON 병합
-geo_all = {
-    "type": "FeatureCollection",
-    "features": [f for g in geos for f in g['features']]
-}
+# GeoJSON 파일들 로드 (바이너리 캐시 사용, 원본 변경 시 자동 재생성)
+geo_cache = load_geometry_cache(geo_paths)
+geo_all = geo_cache.to_feature_collection()
 
 print(f"✅ GeoJSON 로드 완료: {len(geo_all['features'])}개 행정동")
 
@@ -65,69 +48,38 @@ print(f"✅ GeoJSON 로드 완료: {len(geo_all['features'])}개 행정동")
 # ---------------------------
 
 # 주거취약지수 데이터 로드 (시도별 데이터)
-housing_data = pd.read_csv('results/yunjin/housing_vulnerability_analysis.csv')
+housing_data = read_table('housing_vulnerability')
 print(f"🏠 주거취약지수 데이터: {len(housing_data)}개 행")
 
 # 수도인프라지수 데이터 로드 (시군구별 데이터)
-sewer_data = pd.read_csv('results/yunjin/sewer_infrastructure_analysis_summary.csv')
+sewer_data = read_table('sewer_summary')
 print(f"💧 수도인프라지수 데이터: {len(sewer_data)}개 행")
 
 # 사회취약지수 데이터 로드 (읍면동별 데이터)
-social_data = pd.read_csv('data/processed/202506_읍면동_사회취약계층표.csv')
+social_data = read_table('social_vulnerability')
 print(f"👥 사회취약지수 데이터: {len(social_data)}개 행")
 
 # 강수량 데이터 로드 (시군구별 데이터)
-rainfall_data = pd.read_csv('data/processed/여름_강수량_호우_백분위.csv', encoding='cp949')
+rainfall_data = read_table('rainfall_percentile')
 print(f"🌧️ 강수량 데이터: {len(rainfall_data)}개 행")
 
 # 데이터 전처리
 housing_data['주거취약지수'] = housing_data['vulnerability_normalized']
 
-# 등급 계산 함수
-def calculate_grade(value, bins):
-    if pd.isna(value):
-        return 1
-    for i in range(1, len(bins)):
-        if value < bins[i]:
-            return i
-    return len(bins) - 1
-
+# 등급 계산 (지수별 구간 경계/라벨은 grading.GRADE_SCALES 참고)
 # 주거취약지수 등급 (70/50/30/10 기준으로 5등급)
-housing_bins = [0, 10, 30, 50, 70, 100]
-housing_data['주거취약등급'] = housing_data['주거취약지수'].apply(lambda x: calculate_grade(x, housing_bins))
+housing_data['주거취약등급'], housing_data['주거취약등급라벨'] = assign_grades(housing_data['주거취약지수'], '주거취약')
 
 # 수도인프라지수 등급 (80/60/40 기준으로 4등급)
-sewer_bins = [0, 40, 60, 80, 100]
-sewer_data['수도인프라등급'] = sewer_data['하수도_인프라_지수'].apply(lambda x: calculate_grade(x, sewer_bins))
+sewer_data['수도인프라등급'], sewer_data['수도인프라등급라벨'] = assign_grades(sewer_data['하수도_인프라_지수'], '수도인프라')
 
 # 사회취약지수 등급 (25/50/75 기준으로 4등급)
-social_bins = [0, 25, 50, 75, 100]
-social_data['사회취약등급'] = social_data['사회취약지수'].apply(lambda x: calculate_grade(x, social_bins))
+social_data['사회취약등급'], social_data['사회취약등급라벨'] = assign_grades(social_data['사회취약지수'], '사회취약')
 
 # 강수량 지수 등급 (30/60/80 기준으로 4등급)
-rainfall_bins = [0, 30, 60, 80, 100]
-rainfall_data['강수량등급'] = rainfall_data['백분위(강수량 0.5, 호우 * 0.5)'].apply(lambda x: calculate_grade(x, rainfall_bins))
+rainfall_data['강수량등급'], rainfall_data['강수량등급라벨'] = assign_grades(rainfall_data['백분위(강수량 0.5, 호우 * 0.5)'], '강수량')
 
 print("📊 등급 계산 완료")
-
-# 등급별 라벨 매핑
-def get_grade_label(grade, grade_type):
-    if grade_type == "주거취약":
-        labels = {1: "매우 낮음", 2: "낮음", 3: "보통", 4: "높음", 5: "매우 높음"}
-    elif grade_type == "수도인프라":
-        labels = {1: "매우 낮음", 2: "낮음", 3: "보통", 4: "높음"}
-    elif grade_type == "강수량":
-        labels = {1: "매우 낮음", 2: "낮음", 3: "보통", 4: "높음"}
-    else:  # 사회취약
-        labels = {1: "매우 낮음", 2: "낮음", 3: "보통", 4: "높음"}
-    return labels.get(grade, "보통")
-
-# 등급 라벨 추가
-housing_data['주거취약등급라벨'] = housing_data['주거취약등급'].apply(lambda x: get_grade_label(x, "주거취약"))
-sewer_data['수도인프라등급라벨'] = sewer_data['수도인프라등급'].apply(lambda x: get_grade_label(x, "수도인프라"))
-social_data['사회취약등급라벨'] = social_data['사회취약등급'].apply(lambda x: get_grade_label(x, "사회취약"))
-rainfall_data['강수량등급라벨'] = rainfall_data['강수량등급'].apply(lambda x: get_grade_label(x, "강수량"))
-
 print("📊 등급 라벨 매핑 완료")
 
 # 시도명 매핑 함수
@@ -160,199 +112,29 @@ housing_data['region'] = housing_data['region'].apply(map_sido_name)
 # 3) GeoJSON feature에 데이터 속성 병합
 # ---------------------------
 
-# 데이터를 딕셔너리로 변환 (중복 제거)
-housing_dict = housing_data.set_index('region').to_dict(orient='index')
+# 행정동 테이블 (GeoJSON 순서, 코드는 대응표로 정규화한 정수 adm_cd2)
+crosswalk = load_crosswalk(geo_cache=geo_cache)
+features = pd.DataFrame(geo_cache.properties)[['adm_cd2', 'adm_nm', 'sidonm', 'sggnm']].fillna('')
+features['adm_cd2'] = features['adm_cd2'].astype(str)
+features['adm_code'] = crosswalk.canonical_codes(features['adm_cd2'])
+features['sido_cd'] = RegionCrosswalk.sido_of(features['adm_code'])
 
-# 수도인프라지수: 중복 제거 후 딕셔너리 생성
+# 수도인프라지수: 중복 제거
 sewer_data_unique = sewer_data.drop_duplicates(subset=['시도', '행정구역명']).copy()
 # 시도명과 행정구역명을 문자열로 변환
 sewer_data_unique['시도'] = sewer_data_unique['시도'].astype(str)
 sewer_data_unique['행정구역명'] = sewer_data_unique['행정구역명'].astype(str)
-sewer_dict = sewer_data_unique.set_index(['시도', '행정구역명']).to_dict(orient='index')
+sewer_keys = pd.MultiIndex.from_frame(sewer_data_unique[['시도', '행정구역명']])
 
 # 시도별 평균 수도인프라지수 계산 (매핑되지 않은 지역용)
-sewer_sido_avg = sewer_data_unique.groupby('시도')['하수도_인프라_지수'].mean().to_dict()
+sewer_sido_avg = sewer_data_unique.groupby('시도')['하수도_인프라_지수'].mean()
 
 # 시도별 평균 등급 계산
-sewer_sido_grade_avg = sewer_data_unique.groupby('시도')['등급_숫자'].mean().round().astype(int).to_dict()
-
-# 시군구명 정규화 함수
-def normalize_sgg_name(sgg_name):
-    """시군구명을 정규화하여 매핑을 개선"""
-    if not sgg_name:
-        return sgg_name
-    
-    # 일반적인 패턴들
-    patterns = {
-        # 구분자 추가
-        '수원시장안구': '수원시 장안구',
-        '수원시권선구': '수원시 권선구', 
-        '수원시팔달구': '수원시 팔달구',
-        '수원시영통구': '수원시 영통구',
-        '성남시수정구': '성남시 수정구',
-        '성남시중원구': '성남시 중원구',
-        '성남시분당구': '성남시 분당구',
-        '안양시만안구': '안양시 만안구',
-        '안양시동안구': '안양시 동안구',
-        '부천시원미구': '부천시 원미구',
-        '부천시소사구': '부천시 소사구',
-        '부천시오정구': '부천시 오정구',
-        '광명시': '광명시',
-        '평택시': '평택시',
-        '동두천시': '동두천시',
-        '안산시상록구': '안산시 상록구',
-        '안산시단원구': '안산시 단원구',
-        '고양시덕양구': '고양시 덕양구',
-        '고양시일산동구': '고양시 일산동구',
-        '고양시일산서구': '고양시 일산서구',
-        '과천시': '과천시',
-        '구리시': '구리시',
-        '남양주시': '남양주시',
-        '오산시': '오산시',
-        '시흥시': '시흥시',
-        '군포시': '군포시',
-        '의왕시': '의왕시',
-        '하남시': '하남시',
-        '용인시처인구': '용인시 처인구',
-        '용인시기흥구': '용인시 기흥구',
-        '용인시수지구': '용인시 수지구',
-        '파주시': '파주시',
-        '이천시': '이천시',
-        '안성시': '안성시',
-        '김포시': '김포시',
-        '화성시': '화성시',
-        '광주시': '광주시',
-        '여주시': '여주시',
-        '부천시': '부천시',
-        '고양시': '고양시',
-        '안산시': '안산시',
-        '용인시': '용인시',
-        
-        # 시도명 정규화
-        '세종시': '세종특별자치시',
-    }
-    
-    return patterns.get(sgg_name, sgg_name)
-
-def flexible_sewer_mapping(sidonm, sggnm, sewer_dict, sewer_data_unique):
-    """유연한 수도인프라지수 매핑 함수"""
-    if not sggnm:
-        return None
-    
-    # 시도명 정규화
-    sido_mapping = {
-        '서울': '서울특별시',
-        '부산': '부산광역시',
-        '대구': '대구광역시',
-        '인천': '인천광역시',
-        '광주': '광주광역시',
-        '대전': '대전광역시',
-        '울산': '울산광역시',
-        '세종': '세종특별자치시',
-        '경기': '경기도',
-        '강원': '강원도',
-        '충북': '충청북도',
-        '충남': '충청남도',
-        '전북': '전라북도',
-        '전남': '전라남도',
-        '경북': '경상북도',
-        '경남': '경상남도',
-        '제주': '제주특별자치도'
-    }
-    
-    # 시도명 매핑 적용
-    mapped_sido = sido_mapping.get(sidonm, sidonm)
-    
-    # 1단계: 정확한 매칭 시도 (원본 시도명)
-    exact_key = (sidonm, sggnm)
-    if exact_key in sewer_dict:
-        return sewer_dict[exact_key]
-    
-    # 2단계: 매핑된 시도명으로 정확한 매칭 시도
-    if mapped_sido != sidonm:
-        mapped_key = (mapped_sido, sggnm)
-        if mapped_key in sewer_dict:
-            return sewer_dict[mapped_key]
-    
-    # 3단계: 정규화된 시군구명으로 매칭
-    normalized_sggnm = normalize_sgg_name(sggnm)
-    normalized_key = (mapped_sido, normalized_sggnm)
-    if normalized_key in sewer_dict:
-        return sewer_dict[normalized_key]
-    
-    # 4단계: 부분 단어 매칭 (시군구명에 포함된 키워드로 검색)
-    sggnm_clean = sggnm.replace(' ', '').replace('시', '').replace('구', '').replace('군', '').replace('읍', '').replace('면', '').replace('동', '')
-    
-    # 데이터에서 해당 시도의 모든 행정구역명 확인
-    sido_data = sewer_data_unique[sewer_data_unique['시도'] == mapped_sido]
-    
-    for _, row in sido_data.iterrows():
-        data_sggnm = str(row['행정구역명'])
-        data_sggnm_clean = data_sggnm.replace(' ', '').replace('시', '').replace('구', '').replace('군', '').replace('읍', '').replace('면', '').replace('동', '')
-        
-        # 부분 매칭 시도 (양방향)
-        if (sggnm_clean in data_sggnm_clean or data_sggnm_clean in sggnm_clean or
-            sggnm in data_sggnm or data_sggnm in sggnm):
-            return row.to_dict()
-    
-    # 5단계: 세종특별자치시 특별 처리
-    if mapped_sido == '세종특별자치시':
-        # 세종시 데이터 찾기 (시군구명에 '세종'이 포함된 경우)
-        for _, row in sewer_data_unique.iterrows():
-            if '세종' in str(row['행정구역명']):
-                return row.to_dict()
-    
-    # 6단계: 시군구명에서 주요 키워드만 추출하여 매칭
-    # 예: "수원시 장안구" -> "장안", "수원"
-    sggnm_parts = sggnm.replace('시', ' ').replace('구', ' ').replace('군', ' ').split()
-    
-    for _, row in sido_data.iterrows():
-        data_sggnm = str(row['행정구역명'])
-        data_sggnm_parts = data_sggnm.replace('시', ' ').replace('구', ' ').replace('군', ' ').split()
-        
-        # 공통 키워드가 있는지 확인
-        common_parts = set(sggnm_parts) & set(data_sggnm_parts)
-        if len(common_parts) > 0:
-            return row.to_dict()
-    
-    return None
-
-def flexible_rainfall_mapping(sidonm, sggnm, rainfall_data):
-    """유연한 강수량 데이터 매핑 함수"""
-    if not sggnm:
-        return None
-    
-    # 시도별 지점 매핑 (기상청 지점명 기준)
-    sido_stations = {
-        '서울특별시': ['서울'],
-        '부산광역시': ['부산', '북부산'],
-        '대구광역시': ['대구'],
-        '인천광역시': ['인천', '강화'],
-        '광주광역시': ['광주'],
-        '대전광역시': ['대전'],
-        '울산광역시': ['울산'],
-        '세종특별자치시': ['세종'],
-        '경기도': ['수원', '파주', '동두천', '이천', '양평'],
-        '강원도': ['춘천', '북춘천', '원주', '강릉', '북강릉', '동해', '태백', '속초', '홍천', '영월', '대관령'],
-        '충청북도': ['충주', '청주', '서청주', '제천', '보은'],
-        '충청남도': ['천안', '서산', '보령', '홍성'],
-        '전라북도': ['전주', '군산', '정읍', '남원', '순창군', '장수', '임실', '부안'],
-        '전라남도': ['순천', '여수', '광양시', '목포', '해남', '고흥', '거창', '장흥', '영광군', '진도군'],
-        '경상북도': ['영주', '봉화', '밀양', '상주', '의령군', '정선군', '합천', '태백', '고산', '의성', '문경', '구미', '안동', '경주시', '영천', '청송군', '울진', '영덕', '울릉도'],
-        '경상남도': ['산청', '거제', '통영', '창원', '북창원', '부여', '양산시', '김해시', '성산', '진주', '밀양', '포항', '남해'],
-        '제주특별자치도': ['제주', '서귀포', '고산', '흑산도', '백령도']
-    }
-    
-    # 해당 시도의 지점들 확인
-    stations = sido_stations.get(sidonm, [])
-    
-    # 해당 시도의 지점 데이터 찾기
-    for station in stations:
-        station_data = rainfall_data[rainfall_data['지점정보'].str.contains(station, na=False)]
-        if len(station_data) > 0:
-            return station_data.iloc[0].to_dict()
-    
-    return None
+sewer_sido_grade_avg = sewer_data_unique.groupby('시도')['등급_숫자'].mean().round().astype(int)
+sewer_sido_grade_label = pd.Series(
+    grade_labels(sewer_sido_grade_avg.to_numpy(), GRADE_LABELS, default='매우 높음').astype(str),
+    index=sewer_sido_grade_avg.index
+)
 
 def extract_sgg_name(adm_nm):
     """행정구역명에서 시군구명만 추출"""
@@ -382,226 +164,160 @@ print("\n정규화된 시군구명 샘플:")
 for sgg in sewer_data_unique['행정구역명_정규화'].head(10):
     print(f"  {sgg}")
 
-# 정규화된 시군구명으로도 딕셔너리 생성
-sewer_dict_normalized = sewer_data_unique.set_index(['시도', '행정구역명_정규화']).to_dict(orient='index')
-
-# 사회취약지수: 중복 제거 후 딕셔너리 생성
+# 사회취약지수: 중복 제거 후 정규화 행정동코드 기준 테이블
 social_data_unique = social_data.drop_duplicates(subset=['행정동코드']).copy()
-# 행정동코드를 문자열로 변환
-social_data_unique['행정동코드'] = social_data_unique['행정동코드'].astype(str)
-social_dict = social_data_unique.set_index('행정동코드').to_dict(orient='index')
-
-# 시군구별 매핑 통계를 위한 집계
-sgg_mapping_stats = {}
-
-print(f"📊 딕셔너리 생성 완료:")
-print(f"  - 주거취약지수: {len(housing_dict)}개")
-print(f"  - 수도인프라지수 (원본): {len(sewer_dict)}개")
-print(f"  - 수도인프라지수 (정규화): {len(sewer_dict_normalized)}개")
-print(f"  - 사회취약지수: {len(social_dict)}개")
+social_data_unique['adm_code'] = crosswalk.canonical_codes(social_data_unique['행정동코드'])
+social_data_unique = social_data_unique.drop_duplicates(subset=['adm_code'])
+
+# 강수량 지수: 관측 지점 좌표 기반 할당 (행정동 대표점 → KD-tree 근접 지점)
+# - 'nearest': 값이 있는 가장 가까운 지점의 지수/등급 사용
+# - 'idw': 근접 4개 지점의 역거리가중 보간 후 등급 재계산
+RAINFALL_METHOD = 'nearest'
+
+rainfall_by_station = rainfall_data.dropna(subset=['지점정보']).drop_duplicates(subset=['지점정보']).set_index('지점정보')
+rainfall_weights = load_station_weights(geo_cache=geo_cache)
+rainfall_index_col = '백분위(강수량 0.5, 호우 * 0.5)'
+
+if RAINFALL_METHOD == 'idw':
+    rainfall_by_region = interpolate_by_region(rainfall_weights, rainfall_by_station[rainfall_index_col]).dropna()
+    rainfall_region_data = pd.DataFrame({rainfall_index_col: rainfall_by_region})
+    rainfall_region_data['강수량등급'], rainfall_region_data['강수량등급라벨'] = assign_grades(
+        rainfall_region_data[rainfall_index_col], '강수량')
+else:
+    nearest_station = nearest_station_by_region(rainfall_weights, rainfall_by_station[rainfall_index_col])
+    rainfall_region_data = rainfall_by_station.loc[nearest_station.values].set_index(nearest_station.index)
+
+print(f"📊 결합 테이블 준비 완료:")
+print(f"  - 주거취약지수: {housing_data['region'].nunique()}개")
+print(f"  - 수도인프라지수 (원본): {len(sewer_data_unique)}개")
+print(f"  - 수도인프라지수 (정규화): {len(sewer_data_unique.drop_duplicates(subset=['시도', '행정구역명_정규화']))}개")
+print(f"  - 사회취약지수: {len(social_data_unique)}개")
 print(f"  - 시도별 평균 수도인프라지수: {len(sewer_sido_avg)}개")
 
 # 디버깅: 샘플 매핑 확인
 print("\n=== 디버깅: 수도인프라지수 매핑 샘플 ===")
-sample_keys = list(sewer_dict.keys())[:5]
-print("수도인프라지수 딕셔너리 키 샘플:")
-for key in sample_keys:
+print("수도인프라지수 키 샘플:")
+for key in sewer_keys[:5]:
     print(f"  {key}")
 
 print("\nGeoJSON 시군구 샘플:")
-for i, feat in enumerate(geo_all['features'][:5]):
-    sidonm = feat['properties'].get('sidonm', '')
-    sggnm = feat['properties'].get('sggnm', '')
-    print(f"  {i+1}. {sidonm} {sggnm}")
+for i, row in enumerate(features.head(5).itertuples()):
+    print(f"  {i+1}. {row.sidonm} {row.sggnm}")
 
 print(f"\n매핑 시도:")
-sample_feat = geo_all['features'][0]
-sidonm = sample_feat['properties'].get('sidonm', '')
-sggnm = sample_feat['properties'].get('sggnm', '')
+sidonm, sggnm = features.loc[0, 'sidonm'], features.loc[0, 'sggnm']
 print(f"  GeoJSON: {sidonm} {sggnm}")
-print(f"  딕셔너리에서 찾기: {(sidonm, sggnm) in sewer_dict}")
-if (sidonm, sggnm) in sewer_dict:
-    print(f"  찾음: {sewer_dict[(sidonm, sggnm)]}")
+print(f"  테이블에서 찾기: {(sidonm, sggnm) in sewer_keys}")
+if (sidonm, sggnm) in sewer_keys:
+    print(f"  찾음: {sewer_data_unique.iloc[sewer_keys.get_loc((sidonm, sggnm))].to_dict()}")
 else:
     print(f"  못찾음")
-    print(f"  딕셔너리 키 타입: {type(list(sewer_dict.keys())[0])}")
-    print(f"  찾는 키 타입: {type((sidonm, sggnm))}")
-
-# 매핑 성공/실패 통계
-mapping_stats = {
-    'social_success': 0,
-    'social_failed': 0,
-    'sewer_success': 0,
-    'sewer_failed': 0,
-    'sewer_sido_avg_used': 0,
-    'housing_success': 0,
-    'housing_failed': 0,
-    'rainfall_success': 0,
-    'rainfall_failed': 0
-}
 
 print("🔄 GeoJSON 데이터 병합 중...")
 
-for feat in geo_all['features']:
-    # 기본 정보 추출
-    adm_cd2 = str(feat['properties'].get('adm_cd2', ''))
-    adm_nm = feat['properties'].get('adm_nm', '')
-    sidonm = feat['properties'].get('sidonm', '')
-    sggnm = feat['properties'].get('sggnm', '')
-    
-    # 주거취약지수 (시도별)
-    housing_row = housing_dict.get(sidonm)
-    if housing_row:
-        housing_vuln = housing_row.get('주거취약지수', 50)
-        housing_grade = housing_row.get('주거취약등급', 3)
-        housing_grade_label = housing_row.get('주거취약등급라벨', '보통')
-        mapping_stats['housing_success'] += 1
-    else:
-        housing_vuln = 50
-        housing_grade = 3
-        housing_grade_label = '보통'
-        mapping_stats['housing_failed'] += 1
-    
-    # 수도인프라지수 (시도+시군구별, 실패시 시도 평균 사용)
-    # GeoJSON에서 시군구명 추출
-    extracted_sggnm = extract_sgg_name(adm_nm)
-    
-    # 유연한 매핑 함수 사용
-    sewer_row = flexible_sewer_mapping(sidonm, extracted_sggnm, sewer_dict, sewer_data_unique)
-    
-    if sewer_row:
-        sewer_vuln = sewer_row.get('하수도_인프라_지수', 50)
-        sewer_grade = sewer_row.get('등급_숫자', 3)
-        sewer_grade_label = sewer_row.get('인프라_등급', '보통')
-        mapping_stats['sewer_success'] += 1
-        
-        # 시군구별 매핑 통계
-        sgg_key = f"{sidonm}_{sggnm}"
-        if sgg_key not in sgg_mapping_stats:
-            sgg_mapping_stats[sgg_key] = {'success': 0, 'total': 0}
-        sgg_mapping_stats[sgg_key]['success'] += 1
-        sgg_mapping_stats[sgg_key]['total'] += 1
-    else:
-        # 4단계: 시도별 평균값 사용
-        sewer_vuln = sewer_sido_avg.get(sidonm, 50)
-        sewer_grade = sewer_sido_grade_avg.get(sidonm, 3)
-        # 등급 라벨 매핑
-        if sewer_grade == 1:
-            sewer_grade_label = "매우 낮음"
-        elif sewer_grade == 2:
-            sewer_grade_label = "낮음"
-        elif sewer_grade == 3:
-            sewer_grade_label = "보통"
-        elif sewer_grade == 4:
-            sewer_grade_label = "높음"
-        else:
-            sewer_grade_label = "매우 높음"
-        mapping_stats['sewer_sido_avg_used'] += 1
-        mapping_stats['sewer_failed'] += 1
-        
-        # 시군구별 매핑 통계
-        sgg_key = f"{sidonm}_{sggnm}"
-        if sgg_key not in sgg_mapping_stats:
-            sgg_mapping_stats[sgg_key] = {'success': 0, 'total': 0}
-        sgg_mapping_stats[sgg_key]['total'] += 1
-    
-    # 사회취약지수 (읍면동별 개별 데이터)
-    social_row = social_dict.get(adm_cd2)
-    if social_row:
-        social_vuln = social_row.get('사회취약지수', 50)
-        social_grade = social_row.get('사회취약등급', 3)
-        social_grade_label = social_row.get('사회취약등급라벨', '보통')
-        mapping_stats['social_success'] += 1
-    else:
-        # 행정동코드 형식이 다를 수 있으므로 다른 형식도 시도
-        # 10자리 -> 8자리 변환 시도
-        if len(adm_cd2) == 10:
-            adm_cd2_8 = adm_cd2[2:]  # 앞 2자리 제거
-            social_row = social_dict.get(adm_cd2_8)
-            if social_row:
-                social_vuln = social_row.get('사회취약지수', 50)
-                social_grade = social_row.get('사회취약등급', 3)
-                social_grade_label = social_row.get('사회취약등급라벨', '보통')
-                mapping_stats['social_success'] += 1
-            else:
-                social_vuln = 50
-                social_grade = 3
-                social_grade_label = '보통'
-                mapping_stats['social_failed'] += 1
-        else:
-            social_vuln = 50
-            social_grade = 3
-            social_grade_label = '보통'
-            mapping_stats['social_failed'] += 1
-    
-    # 강수량 지수 (시군구별)
-    rainfall_row = flexible_rainfall_mapping(sidonm, extracted_sggnm, rainfall_data)
-    if rainfall_row:
-        rainfall_vuln = rainfall_row.get('백분위(강수량 0.5, 호우 * 0.5)', 50)
-        rainfall_grade = rainfall_row.get('강수량등급', 3)
-        rainfall_grade_label = rainfall_row.get('강수량등급라벨', '보통')
-        mapping_stats['rainfall_success'] += 1
-    else:
-        rainfall_vuln = 50
-        rainfall_grade = 3
-        rainfall_grade_label = '보통'
-        mapping_stats['rainfall_failed'] += 1
-    
-    # 통합 취약도 계산 (가중 평균) - 강수량 포함
-    integrated_score = (housing_vuln * 0.3 + sewer_vuln * 0.2 + social_vuln * 0.2 + rainfall_vuln * 0.3)
-    
-    # 통합 등급 계산
-    if integrated_score < 30:
-        integrated_grade = 1
-        integrated_label = "매우 낮음"
-    elif integrated_score < 50:
-        integrated_grade = 2
-        integrated_label = "낮음"
-    elif integrated_score < 70:
-        integrated_grade = 3
-        integrated_label = "보통"
-    elif integrated_score < 85:
-        integrated_grade = 4
-        integrated_label = "높음"
-    else:
-        integrated_grade = 5
-        integrated_label = "매우 높음"
-    
-    # GeoJSON 속성에 데이터 추가
-    feat['properties'].update({
-        '주거취약지수': round(housing_vuln, 2),
-        '주거취약등급': housing_grade,
-        '주거취약등급라벨': housing_grade_label,
-        '수도인프라지수': round(sewer_vuln, 2),
-        '수도인프라등급': sewer_grade,
-        '수도인프라등급라벨': sewer_grade_label,
-        '사회취약지수': round(social_vuln, 2),
-        '사회취약등급': social_grade,
-        '사회취약등급라벨': social_grade_label,
-        '강수량지수': round(rainfall_vuln, 2),
-        '강수량등급': rainfall_grade,
-        '강수량등급라벨': rainfall_grade_label,
-        '통합취약도': round(integrated_score, 2),
-        '통합등급': integrated_grade,
-        '통합등급라벨': integrated_label
-    })
+# 기본값 (매핑되지 않은 지역용)
+DEFAULT_INDEX_VALUE = 50
+DEFAULT_GRADE = 3
+DEFAULT_GRADE_LABEL = '보통'
+
+def attach_index(table, source, value_col, grade_col, label_col, prefix, matched_status):
+    """
+    source(features와 같은 인덱스, 매칭 실패는 결측)의 지수/등급/라벨을 features에 붙이고
+    {prefix}_매칭 컬럼에 매칭 상태 기록 (실패는 '기본값')
+    """
+    matched = source[value_col].notna()
+    table[f'{prefix}지수'] = source[value_col].fillna(DEFAULT_INDEX_VALUE).to_numpy(np.float64)
+    table[f'{prefix}등급'] = source[grade_col].fillna(DEFAULT_GRADE).astype(np.int64).to_numpy()
+    table[f'{prefix}등급라벨'] = source[label_col].astype(object).where(matched, DEFAULT_GRADE_LABEL).to_numpy()
+    table[f'{prefix}_매칭'] = np.where(matched, matched_status, '기본값')
+
+# 주거취약지수 (시도 코드 기준)
+housing_data['sido_cd'] = crosswalk.sido_codes(housing_data['region'])
+housing_by_sido = housing_data.drop_duplicates(subset=['sido_cd']).set_index('sido_cd')
+attach_index(features, housing_by_sido.reindex(features['sido_cd']).reset_index(drop=True),
+             '주거취약지수', '주거취약등급', '주거취약등급라벨', '주거취약', '시도')
+
+# 수도인프라지수: 전체 행정동을 한 번에 매칭 (6단계 유연 매칭을 미리 컴파일한 매칭기)
+# 매칭 결과는 data/cache/match/에 저장해 두고 새 행정동명만 다시 매칭, 실패 시 시도별 평균 사용
+def resolve_sewer(keys):
+    """미캐시 행정동 → (수도인프라 행 위치, 매칭 단계, 매칭된 행정구역명)"""
+    resolver = SewerRegionResolver(sewer_data_unique)
+    positions, stages = resolver.resolve_batch(keys['sidonm'].tolist(),
+                                               [extract_sgg_name(adm_nm) for adm_nm in keys['adm_nm']])
+    names = sewer_data_unique['시도'].to_numpy() + ' ' + sewer_data_unique['행정구역명'].to_numpy()
+    return positions, stages, [names[pos] if pos >= 0 else None for pos in positions]
+
+sewer_cache = MatchCache('sewer_summary', *match_fingerprint(
+    [sewer_data_unique[['시도', '행정구역명']]], [region_resolver, extract_sgg_name]))
+sewer_positions, sewer_stages = sewer_cache.resolve_batch(features[KEY_COLUMNS], resolve_sewer)
+sewer_cache.save()
+print(f"  {sewer_cache.summary()}")
+sewer_matched = sewer_positions >= 0
+sewer_rows = sewer_data_unique.iloc[np.where(sewer_matched, sewer_positions, 0)].reset_index(drop=True)
+features['수도인프라지수'] = np.where(sewer_matched, sewer_rows['하수도_인프라_지수'],
+                                features['sidonm'].map(sewer_sido_avg).fillna(DEFAULT_INDEX_VALUE))
+features['수도인프라등급'] = np.where(sewer_matched, sewer_rows['등급_숫자'],
+                                features['sidonm'].map(sewer_sido_grade_avg).fillna(DEFAULT_GRADE)).astype(np.int64)
+features['수도인프라등급라벨'] = np.where(sewer_matched, sewer_rows['인프라_등급'].astype(str),
+                                  features['sidonm'].map(sewer_sido_grade_label).fillna(DEFAULT_GRADE_LABEL))
+features['수도인프라_매칭'] = np.where(sewer_matched, pd.Series(sewer_stages).fillna('').to_numpy(),
+                                  np.where(features['sidonm'].isin(sewer_sido_avg.index), '시도평균', '기본값'))
+
+# 사회취약지수 (읍면동별 개별 데이터, 정규화 행정동코드 기준)
+social_by_code = social_data_unique.set_index('adm_code')
+attach_index(features, social_by_code.reindex(features['adm_code']).reset_index(drop=True),
+             '사회취약지수', '사회취약등급', '사회취약등급라벨', '사회취약', '행정동코드')
+
+# 강수량 지수 (근접 관측 지점 기준)
+rainfall_by_code = rainfall_region_data.rename(columns={rainfall_index_col: '강수량지수'})
+rainfall_by_code.index = rainfall_by_code.index.astype(str)
+attach_index(features, rainfall_by_code.reindex(features['adm_cd2']).reset_index(drop=True),
+             '강수량지수', '강수량등급', '강수량등급라벨', '강수량', '관측지점')
+
+# 통합 취약도 계산 (가중 평균, 전체 행정동 일괄) - 강수량 포함
+# 가중치는 weight_scenarios.DEFAULT_WEIGHTS (시나리오별 비교는 weight_scenarios.py 참고)
+features['통합취약도'] = integrated_scores(features, DEFAULT_WEIGHTS)
+features['통합등급'], integrated_labels = assign_grades(features['통합취약도'], '통합')
+features['통합등급라벨'] = integrated_labels.astype(str)
+
+# GeoJSON 속성에 일괄 반영
+PROPERTY_COLUMNS = [
+    '주거취약지수', '주거취약등급', '주거취약등급라벨',
+    '수도인프라지수', '수도인프라등급', '수도인프라등급라벨',
+    '사회취약지수', '사회취약등급', '사회취약등급라벨',
+    '강수량지수', '강수량등급', '강수량등급라벨',
+    '통합취약도', '통합등급', '통합등급라벨'
+]
+SCORE_COLUMNS = list(INDEX_COLUMNS.values()) + ['통합취약도']
+properties = features[PROPERTY_COLUMNS].copy()
+properties[SCORE_COLUMNS] = properties[SCORE_COLUMNS].round(2)
+for feat, props in zip(geo_all['features'], properties.to_dict(orient='records')):
+    feat['properties'].update(props)
+
+# 행정동별 지수 저장 (가중치 시나리오 분석 입력)
+index_table = features.set_index('adm_cd2')[['sidonm', 'adm_nm'] + SCORE_COLUMNS + ['통합등급']]
+index_table.to_csv('results/integrated_vulnerability_scores.csv', encoding='utf-8-sig')
 
 print(f"✅ 매핑 완료:")
-print(f"  - 사회취약지수: {mapping_stats['social_success']}개 성공, {mapping_stats['social_failed']}개 실패")
-print(f"  - 수도인프라지수: {mapping_stats['sewer_success']}개 성공, {mapping_stats['sewer_failed']}개 실패")
-print(f"  - 주거취약지수: {mapping_stats['housing_success']}개 성공, {mapping_stats['housing_failed']}개 실패")
-print(f"  - 강수량지수: {mapping_stats['rainfall_success']}개 성공, {mapping_stats['rainfall_failed']}개 실패")
-print(f"  - 시도별 평균 수도인프라지수 사용: {mapping_stats['sewer_sido_avg_used']}개")
+for name, prefix in [('사회취약지수', '사회취약'), ('수도인프라지수', '수도인프라'),
+                     ('주거취약지수', '주거취약'), ('강수량지수', '강수량')]:
+    failed = int(features[f'{prefix}_매칭'].isin(['기본값', '시도평균']).sum())
+    print(f"  - {name}: {len(features) - failed}개 성공, {failed}개 실패")
+print(f"  - 시도별 평균 수도인프라지수 사용: {int((~sewer_matched).sum())}개")
+
+# 수도인프라지수 매칭 단계별 건수
+print("  - 수도인프라지수 매칭 단계:")
+for stage, count in pd.Series(sewer_stages).fillna('실패').value_counts().items():
+    print(f"      {stage}: {count}개")
 
 # 시군구별 매핑 통계 출력
 print(f"\n=== 시군구별 수도인프라지수 매핑 통계 ===")
-failed_sgg = []
-for sgg_key, stats in sgg_mapping_stats.items():
-    if stats['success'] == 0 and stats['total'] > 0:
-        failed_sgg.append(sgg_key)
-    elif stats['success'] > 0:
-        success_rate = (stats['success'] / stats['total']) * 100
-        print(f"  {sgg_key}: {stats['success']}/{stats['total']} ({success_rate:.1f}%)")
+sgg_mapping_stats = (pd.DataFrame({'sgg_key': features['sidonm'] + '_' + features['sggnm'], 'success': sewer_matched})
+                     .groupby('sgg_key', sort=False)['success'].agg(['sum', 'count']))
+failed_sgg = sgg_mapping_stats.index[sgg_mapping_stats['sum'] == 0].tolist()
+for sgg_key, stats in sgg_mapping_stats[sgg_mapping_stats['sum'] > 0].iterrows():
+    success_rate = (stats['sum'] / stats['count']) * 100
+    print(f"  {sgg_key}: {stats['sum']}/{stats['count']} ({success_rate:.1f}%)")
 
 if failed_sgg:
     print(f"\n매핑 실패한 시군구 ({len(failed_sgg)}개):")
@@ -615,16 +331,30 @@ if failed_sgg:
 # ---------------------------
 print("🗺️ 지도 생성 중...")
 
+# 렌더링 모드
+# - 'single': 지오메트리를 한 번만 포함하고 레이어 전환은 JS 재스타일 (기본값)
+# - 'per_feature': 기존 방식 (레이어별 행정동마다 GeoJson 생성)
+RENDER_MODE = 'single'
+
 # 중심점 계산
 center_lat = 36.5
 center_lon = 127.5
 
 # 기본 지도 생성
-m = folium.Map(
-    location=[center_lat, center_lon],
-    zoom_start=7,
-    tiles='OpenStreetMap'
-)
+if RENDER_MODE == 'single':
+    # 지수 레이어가 기본 레이어(라디오)로 들어가므로 타일은 레이어 컨트롤에서 제외
+    m = folium.Map(
+        location=[center_lat, center_lon],
+        zoom_start=7,
+        tiles=None
+    )
+    folium.TileLayer('OpenStreetMap', control=False).add_to(m)
+else:
+    m = folium.Map(
+        location=[center_lat, center_lon],
+        zoom_start=7,
+        tiles='OpenStreetMap'
+    )
 
 # 각 지수별 색상 팔레트 정의 (다른 색상 사용)
 housing_colors = ['#fee5d9', '#fcae91', '#fb6a4a', '#de2d26', '#a50f15']  # 빨간색 계열
@@ -642,151 +372,166 @@ def get_color(value, colors):
     else:
         return colors[int(value) - 1]
 
-# 상위 10개 위험지역 데이터 준비
-def get_top_10_data(geo_features, index_name):
-    """각 지수별 상위 10개 위험지역 데이터 추출"""
-    data_list = []
-    for feat in geo_features:
-        adm_nm = feat['properties'].get('adm_nm', '')
-        value = feat['properties'].get(index_name, 0)
-        if value > 0:  # 유효한 데이터만
-            data_list.append({
-                'region': adm_nm,
-                'value': value
-            })
-    
-    # 값 기준으로 정렬 (높은 값이 위험)
-    data_list.sort(key=lambda x: x['value'], reverse=True)
-    return data_list[:10]
+# 시도별 데이터 준비
+# 지도 표시값(반올림된 지수) 기준 집계 표 (시도 순서는 GEO_PATHS 순서)
+region_table = pd.concat([features[['sidonm', 'adm_nm']], properties[SCORE_COLUMNS]], axis=1)
+sido_list = [TOTAL_LABEL] + [sido for sido in pd.unique(features['sidonm'].fillna('')) if sido]
+
+# 레이어 설정 (레이어명, 값/등급/라벨 속성, 색상 팔레트)
+LAYER_CONFIGS = [
+    {'name': '주거취약지수', 'value': '주거취약지수', 'grade': '주거취약등급', 'label': '주거취약등급라벨', 'colors': housing_colors},
+    {'name': '수도인프라지수', 'value': '수도인프라지수', 'grade': '수도인프라등급', 'label': '수도인프라등급라벨', 'colors': sewer_colors},
+    {'name': '사회취약지수', 'value': '사회취약지수', 'grade': '사회취약등급', 'label': '사회취약등급라벨', 'colors': social_colors},
+    {'name': '강수량지수', 'value': '강수량지수', 'grade': '강수량등급', 'label': '강수량등급라벨', 'colors': rainfall_colors},
+    {'name': '통합취약지수', 'value': '통합취약도', 'grade': '통합등급', 'label': '통합등급라벨', 'colors': integrated_colors, 'detail': True},
+]
+
+# 통합취약지수 툴팁에 함께 표시할 세부 지수
+DETAIL_FIELDS = [('주거', '주거취약지수'), ('수도', '수도인프라지수'), ('사회', '사회취약지수'), ('강수량', '강수량지수')]
+
+def build_tooltip_html(props, config):
+    """레이어별 툴팁 HTML"""
+    html = (
+        f"<b>{props.get('adm_nm', '')}</b><br>"
+        f"{config['value']}: {props.get(config['value'], 0):.1f}<br>"
+        f"등급: {props.get(config['label'], '보통')}"
+    )
+    if config.get('detail'):
+        for short_name, prop in DETAIL_FIELDS:
+            html += f"<br>{short_name}: {props.get(prop, 0):.1f}"
+    return html
+
+def add_per_feature_layers(m, features):
+    """기존 방식: 레이어마다 행정동별 GeoJson 객체 생성 (지오메트리 5회 중복)"""
+    for i, config in enumerate(LAYER_CONFIGS):
+        layer = folium.FeatureGroup(name=config['name'], show=(i == 0))
+        for feat in features:
+            grade = feat['properties'].get(config['grade'], 3)
+            color = get_color(grade, config['colors'])
+
+            folium.GeoJson(
+                feat,
+                style_function=lambda x, color=color: {
+                    'fillColor': color,
+                    'color': 'black',
+                    'weight': 1,
+                    'fillOpacity': 0.7
+                },
+                tooltip=folium.Tooltip(
+                    build_tooltip_html(feat['properties'], config),
+                    style="font-size: 12px;"
+                )
+            ).add_to(layer)
+        layer.add_to(m)
+
+# 단일 레이어 모드용 클라이언트 스타일/툴팁 스크립트
+SINGLE_LAYER_SCRIPT = """
+{% macro script(this, kwargs) %}
+(function() {
+    const geoLayer = {{ this.geojson_name }};
+    const mapObj = {{ this.map_name }};
+    const lookup = {{ this.lookup_name }};
+    const layerConfigs = {{ this.layer_configs }};
+    const detailFields = {{ this.detail_fields }};
+
+    function gradeColor(grade, colors) {
+        if (grade === null || grade === undefined || isNaN(grade) || grade < 1) return colors[0];
+        if (grade >= colors.length) return colors[colors.length - 1];
+        return colors[Math.floor(grade) - 1];
+    }
 
-# 각 지수별 상위 10개 데이터
-housing_top10 = get_top_10_data(geo_all['features'], '주거취약지수')
-sewer_top10 = get_top_10_data(geo_all['features'], '수도인프라지수')
-social_top10 = get_top_10_data(geo_all['features'], '사회취약지수')
-rainfall_top10 = get_top_10_data(geo_all['features'], '강수량지수')
-integrated_top10 = get_top_10_data(geo_all['features'], '통합취약도')
+    let active = layerConfigs[0];
+
+    function restyle(config) {
+        active = config;
+        geoLayer.setStyle(function(feature) {
+            const grade = lookup(feature.properties.adm_cd2)[config.grade];
+            return {
+                fillColor: gradeColor(grade === undefined ? 3 : grade, config.colors),
+                color: 'black',
+                weight: 1,
+                fillOpacity: 0.7
+            };
+        });
+    }
 
-# 시도별 데이터 준비
-sido_list = ['전국'] + list(set([feat['properties'].get('sidonm', '') for feat in geo_all['features'] if feat['properties'].get('sidonm', '')]))
+    // 지수 값은 속성 테이블에서 소수 첫째 자리로 반올림되어 있음 (파이썬 f"{v:.1f}"와 같은 표시)
+    function tooltipHtml(row) {
+        const pick = (key, fallback) => (row[key] === undefined ? fallback : row[key]);
+        let html = '<b>' + pick('adm_nm', '') + '</b><br>'
+            + active.value + ': ' + pick(active.value, 0).toFixed(1) + '<br>'
+            + '등급: ' + pick(active.label, '보통');
+        if (active.detail) {
+            detailFields.forEach(function(field) {
+                html += '<br>' + field[0] + ': ' + pick(field[1], 0).toFixed(1);
+            });
+        }
+        return html;
+    }
+
+    geoLayer.bindTooltip(function(layer) {
+        return tooltipHtml(lookup(layer.feature.properties.adm_cd2));
+    }, {sticky: true, className: 'vuln-tooltip'});
+
+    mapObj.on('baselayerchange', function(e) {
+        const config = layerConfigs.find(c => c.name === e.name);
+        if (config) restyle(config);
+    });
+
+    // 줌 단계별 지오메트리 교체 후 새 레이어에 현재 지수 스타일 재적용
+    geoLayer.on('lodchange', function() { restyle(active); });
+
+    restyle(active);
+})();
+{% endmacro %}
+"""
+
+def add_single_collection_layers(m, geo_all, lod=None):
+    """
+    단일 FeatureCollection 방식: 지오메트리를 한 번만 싣고 속성에는 adm_cd2만 남김
+    지수/등급/라벨은 adm_cd2 키 속성 테이블로 한 번 포함, 레이어 전환은 JS 재스타일로 처리
+    lod(단계별 TopoJSON)가 있으면 가장 거친 단계를 TopoJSON으로 싣고 확대 시 세밀한 단계로 교체
+    """
+    codes = [{'adm_cd2': feat['properties'].get('adm_cd2', '')} for feat in geo_all['features']]
+    if lod is not None:
+        geo_layer = folium.TopoJson(attach_properties(next(iter(lod.values())), codes), OBJECT_PATH,
+                                    name='행정동', control=False)
+    else:
+        geo_layer = folium.GeoJson({
+            'type': 'FeatureCollection',
+            'features': [{'type': 'Feature', 'properties': props, 'geometry': feat['geometry']}
+                         for props, feat in zip(codes, geo_all['features'])]
+        }, name='행정동', control=False)
+    geo_layer.add_to(m)
+
+    # 툴팁/스타일용 속성 테이블 (행정동명 + 지수별 값/등급/라벨)
+    attributes = pd.DataFrame([feat['properties'] for feat in geo_all['features']])
+    lookup = AttributeTable(build_attribute_table(attributes[['adm_cd2', 'adm_nm'] + PROPERTY_COLUMNS]))
+    m.add_child(lookup)
+
+    # 레이어 컨트롤의 라디오 버튼 역할을 하는 빈 기본 레이어
+    for i, config in enumerate(LAYER_CONFIGS):
+        folium.FeatureGroup(name=config['name'], overlay=False, show=(i == 0)).add_to(m)
+
+    macro = MacroElement()
+    macro._template = Template(SINGLE_LAYER_SCRIPT)
+    macro.geojson_name = geo_layer.get_name()
+    macro.map_name = m.get_name()
+    macro.lookup_name = lookup.get_name()
+    macro.layer_configs = json.dumps(LAYER_CONFIGS, ensure_ascii=False)
+    macro.detail_fields = json.dumps(DETAIL_FIELDS, ensure_ascii=False)
+    m.get_root().header.add_child(Element(
+        "<style>.vuln-tooltip { font-size: 12px; }</style>"
+    ))
+    m.add_child(macro)
+    if lod is not None:
+        add_lod_swap(m, geo_layer, lod)
+
+if RENDER_MODE == 'single':
+    add_single_collection_layers(m, geo_all, load_lod_topojson(geo_cache))
+else:
+    add_per_feature_layers(m, geo_all['features'])
 
-# 주거취약지수 레이어
-housing_layer = folium.FeatureGroup(name='주거취약지수', show=True)
-for feat in geo_all['features']:
-    grade = feat['properties'].get('주거취약등급', 3)
-    color = get_color(grade, housing_colors)
-    
-    folium.GeoJson(
-        feat,
-        style_function=lambda x, color=color: {
-            'fillColor': color,
-            'color': 'black',
-            'weight': 1,
-            'fillOpacity': 0.7
-        },
-        tooltip=folium.Tooltip(
-            f"<b>{feat['properties'].get('adm_nm', '')}</b><br>"
-            f"주거취약지수: {feat['properties'].get('주거취약지수', 0):.1f}<br>"
-            f"등급: {feat['properties'].get('주거취약등급라벨', '보통')}",
-            style="font-size: 12px;"
-        )
-    ).add_to(housing_layer)
-housing_layer.add_to(m)
-
-# 수도인프라지수 레이어
-sewer_layer = folium.FeatureGroup(name='수도인프라지수', show=False)
-for feat in geo_all['features']:
-    grade = feat['properties'].get('수도인프라등급', 3)
-    color = get_color(grade, sewer_colors)
-    
-    folium.GeoJson(
-        feat,
-        style_function=lambda x, color=color: {
-            'fillColor': color,
-            'color': 'black',
-            'weight': 1,
-            'fillOpacity': 0.7
-        },
-        tooltip=folium.Tooltip(
-            f"<b>{feat['properties'].get('adm_nm', '')}</b><br>"
-            f"수도인프라지수: {feat['properties'].get('수도인프라지수', 0):.1f}<br>"
-            f"등급: {feat['properties'].get('수도인프라등급라벨', '보통')}",
-            style="font-size: 12px;"
-        )
-    ).add_to(sewer_layer)
-sewer_layer.add_to(m)
-
-# 사회취약지수 레이어
-social_layer = folium.FeatureGroup(name='사회취약지수', show=False)
-for feat in geo_all['features']:
-    grade = feat['properties'].get('사회취약등급', 3)
-    color = get_color(grade, social_colors)
-    
-    folium.GeoJson(
-        feat,
-        style_function=lambda x, color=color: {
-            'fillColor': color,
-            'color': 'black',
-            'weight': 1,
-            'fillOpacity': 0.7
-        },
-        tooltip=folium.Tooltip(
-            f"<b>{feat['properties'].get('adm_nm', '')}</b><br>"
-            f"사회취약지수: {feat['properties'].get('사회취약지수', 0):.1f}<br>"
-            f"등급: {feat['properties'].get('사회취약등급라벨', '보통')}",
-            style="font-size: 12px;"
-        )
-    ).add_to(social_layer)
-social_layer.add_to(m)
-
-# 강수량지수 레이어
-rainfall_layer = folium.FeatureGroup(name='강수량지수', show=False)
-for feat in geo_all['features']:
-    grade = feat['properties'].get('강수량등급', 3)
-    color = get_color(grade, rainfall_colors)
-    
-    folium.GeoJson(
-        feat,
-        style_function=lambda x, color=color: {
-            'fillColor': color,
-            'color': 'black',
-            'weight': 1,
-            'fillOpacity': 0.7
-        },
-        tooltip=folium.Tooltip(
-            f"<b>{feat['properties'].get('adm_nm', '')}</b><br>"
-            f"강수량지수: {feat['properties'].get('강수량지수', 0):.1f}<br>"
-            f"등급: {feat['properties'].get('강수량등급라벨', '보통')}",
-            style="font-size: 12px;"
-        )
-    ).add_to(rainfall_layer)
-rainfall_layer.add_to(m)
-
-# 통합취약지수 레이어
-integrated_layer = folium.FeatureGroup(name='통합취약지수', show=False)
-for feat in geo_all['features']:
-    grade = feat['properties'].get('통합등급', 3)
-    color = get_color(grade, integrated_colors)
-    
-    folium.GeoJson(
-        feat,
-        style_function=lambda x, color=color: {
-            'fillColor': color,
-            'color': 'black',
-            'weight': 1,
-            'fillOpacity': 0.7
-        },
-        tooltip=folium.Tooltip(
-            f"<b>{feat['properties'].get('adm_nm', '')}</b><br>"
-            f"통합취약도: {feat['properties'].get('통합취약도', 0):.1f}<br>"
-            f"등급: {feat['properties'].get('통합등급라벨', '보통')}<br>"
-            f"주거: {feat['properties'].get('주거취약지수', 0):.1f}<br>"
-            f"수도: {feat['properties'].get('수도인프라지수', 0):.1f}<br>"
-            f"사회: {feat['properties'].get('사회취약지수', 0):.1f}<br>"
-            f"강수량: {feat['properties'].get('강수량지수', 0):.1f}",
-            style="font-size: 12px;"
-        )
-    ).add_to(integrated_layer)
-integrated_layer.add_to(m)
 
 # 레이어 컨트롤 추가
 folium.LayerControl().add_to(m)
@@ -801,44 +546,17 @@ print("🗺️ 지도 생성 완료")
 # ---------------------------
 print("📄 HTML 템플릿 생성 중...")
 
-# 상위 10개 데이터를 JSON으로 변환
-import json
-
-top10_data = {
-    'housing': housing_top10,
-    'sewer': sewer_top10,
-    'social': social_top10,
-    'rainfall': rainfall_top10,
-    'integrated': integrated_top10
-}
-
-# 시도별 통계 계산
-def calculate_sido_stats(geo_features, sido_name):
-    """시도별 통계 계산"""
-    if sido_name == '전국':
-        features = geo_features
-    else:
-        features = [f for f in geo_features if f['properties'].get('sidonm', '') == sido_name]
-    
-    if not features:
-        return {'avg_housing': 0, 'avg_sewer': 0, 'avg_social': 0, 'avg_rainfall': 0}
-    
-    housing_values = [f['properties'].get('주거취약지수', 0) for f in features]
-    sewer_values = [f['properties'].get('수도인프라지수', 0) for f in features]
-    social_values = [f['properties'].get('사회취약지수', 0) for f in features]
-    rainfall_values = [f['properties'].get('강수량지수', 0) for f in features]
-    
-    return {
-        'avg_housing': sum(housing_values) / len(housing_values),
-        'avg_sewer': sum(sewer_values) / len(sewer_values),
-        'avg_social': sum(social_values) / len(social_values),
-        'avg_rainfall': sum(rainfall_values) / len(rainfall_values)
-    }
+# 각 지수별 상위 10개 위험지역 (0 이하 값 제외)
+top10_data = top_k_table(region_table, {
+    'housing': '주거취약지수',
+    'sewer': '수도인프라지수',
+    'social': '사회취약지수',
+    'rainfall': '강수량지수',
+    'integrated': '통합취약도'
+}, 'adm_nm', positive_only=True)
 
-# 시도별 통계 데이터
-sido_stats = {}
-for sido in sido_list:
-    sido_stats[sido] = calculate_sido_stats(geo_all['features'], sido)
+# 시도별 통계 데이터 (전국 + 시도별 평균)
+sido_stats = group_means(region_table, 'sidonm', SIDO_STAT_COLUMNS, groups=sido_list[1:])
 
 # HTML 템플릿 생성
 html_template = f"""
@@ -1130,7 +848,6 @@ with open(temp_map_path, 'r', encoding='utf-8') as f:
 final_html = html_template.replace('<!-- 지도가 여기에 렌더링됩니다 -->', map_html)
 
 # 임시 파일 삭제
-import os
 os.remove(temp_map_path)
 
 # 최종 HTML 파일 저장
@@ -41,6 +41,7 @@ def create_housing_vulnerability_map_notebook():
                     "import json\n",
                     "import os\n",
                     "import re\n",
+                    "import sys\n",
                     "import numpy as np\n",
                     "from pathlib import Path\n",
                     "\n",
@@ -48,6 +49,11 @@ def create_housing_vulnerability_map_notebook():
                     "project_dir = r\"/Users/sullem/yj/HIuniv_Project\"\n",
                     "os.chdir(project_dir)\n",
                     "\n",
+                    "# 매칭 색인 모듈 (scripts/name_match_index.py)\n",
+                    "sys.path.append(os.path.join(project_dir, \"scripts\"))\n",
+                    "from name_match_index import NameMatchIndex\n",
+                    "from match_cache import MatchCache, match_fingerprint\n",
+                    "\n",
                     "print(f\"현재 작업 디렉토리: {os.getcwd()}\")"
                 ]
             },
@@ -201,6 +207,8 @@ def create_housing_vulnerability_map_notebook():
                     "    \n",
                     "    # 포괄적인 매핑 딕셔너리 생성\n",
                     "    mapping_dict = create_comprehensive_mapping_dict(df_clean)\n",
+                    "    # 느슨한 매칭(6~9단계)용 색인\n",
+                    "    match_index = NameMatchIndex(mapping_dict)\n",
                     "    \n",
                     "    print(f\"데이터: {len(df_clean)}개 시도\")\n",
                     "    print(f\"매핑 딕셔너리 크기: {len(mapping_dict)}개 키\")\n",
@@ -212,7 +220,8 @@ def create_housing_vulnerability_map_notebook():
                     "else:\n",
                     "    print(\"region 컬럼이 없습니다.\")\n",
                     "    df_clean = pd.DataFrame()\n",
-                    "    mapping_dict = {}"
+                    "    mapping_dict = {}\n",
+                    "    match_index = NameMatchIndex(mapping_dict)"
                 ]
             },
             {
@@ -247,72 +256,75 @@ def create_housing_vulnerability_map_notebook():
                     "        return '#grey'  # 기본값\n",
                     "\n",
                     "# 최강화된 매칭 함수\n",
-                    "def find_matching_data_ultimate(sggnm, mapping_dict, df_clean):\n",
+                    "def average_data(df_clean):\n",
+                    "    \"\"\"매칭 실패 시 사용할 평균값 행\"\"\"\n",
+                    "    avg_data = df_clean.mean(numeric_only=True)\n",
+                    "    avg_data['region'] = '평균값'\n",
+                    "    avg_data['vulnerability_level'] = '보통'\n",
+                    "    return avg_data\n",
+                    "\n",
+                    "def find_matching_data_ultimate(sggnm, mapping_dict, df_clean, match_index, return_stage=False):\n",
                     "    \"\"\"최강화된 시도명 매칭 함수\"\"\"\n",
+                    "    def result(row, stage):\n",
+                    "        return (row, stage) if return_stage else row\n",
+                    "    \n",
                     "    try:\n",
                     "        if pd.isna(sggnm) or sggnm == '' or not mapping_dict:\n",
-                    "            return None\n",
+                    "            return result(None, None)\n",
                     "        \n",
                     "        # 1. 정확한 매칭\n",
                     "        if sggnm in mapping_dict:\n",
-                    "            return mapping_dict[sggnm]\n",
+                    "            return result(mapping_dict[sggnm], '정확')\n",
                     "        \n",
                     "        # 2. 정규화된 매칭\n",
                     "        normalized_sggnm = normalize_region(sggnm)\n",
                     "        if normalized_sggnm in mapping_dict:\n",
-                    "            return mapping_dict[normalized_sggnm]\n",
+                    "            return result(mapping_dict[normalized_sggnm], '정규화')\n",
                     "        \n",
                     "        # 3. 시/도 제거 후 매칭\n",
                     "        for suffix in ['시', '도', '특별자치시', '광역시']:\n",
                     "            if sggnm.endswith(suffix):\n",
                     "                base_name = sggnm[:-len(suffix)]\n",
                     "                if base_name in mapping_dict:\n",
-                    "                    return mapping_dict[base_name]\n",
+                    "                    return result(mapping_dict[base_name], '접미사제거')\n",
                     "        \n",
                     "        # 4. 공백 제거 후 매칭\n",
                     "        no_space = sggnm.replace(' ', '')\n",
                     "        if no_space in mapping_dict:\n",
-                    "            return mapping_dict[no_space]\n",
+                    "            return result(mapping_dict[no_space], '공백제거')\n",
                     "        \n",
                     "        # 5. 특수문자 제거 후 매칭\n",
                     "        clean_sggnm = re.sub(r'[^가-힣]', '', sggnm)\n",
                     "        if clean_sggnm in mapping_dict:\n",
-                    "            return mapping_dict[clean_sggnm]\n",
-                    "        \n",
-                    "        # 6. 부분 매칭 (포함 관계)\n",
-                    "        for key in mapping_dict.keys():\n",
-                    "            if sggnm in key or key in sggnm:\n",
-                    "                return mapping_dict[key]\n",
-                    "        \n",
-                    "        # 7. 유사도 기반 매칭 (60% 이상 일치)\n",
-                    "        for key in mapping_dict.keys():\n",
-                    "            if len(set(sggnm) & set(key)) >= min(len(sggnm), len(key)) * 0.6:\n",
-                    "                return mapping_dict[key]\n",
+                    "            return result(mapping_dict[clean_sggnm], '특수문자제거')\n",
                     "        \n",
-                    "        # 8. 단어 기반 매칭\n",
-                    "        sggnm_words = sggnm.split()\n",
-                    "        for word in sggnm_words:\n",
-                    "            if word in mapping_dict:\n",
-                    "                return mapping_dict[word]\n",
-                    "        \n",
-                    "        # 9. 부분 문자열 매칭 (2글자 이상)\n",
-                    "        for i in range(len(sggnm)-1):\n",
-                    "            for j in range(i+2, len(sggnm)+1):\n",
-                    "                substring = sggnm[i:j]\n",
-                    "                if substring in mapping_dict:\n",
-                    "                    return mapping_dict[substring]\n",
+                    "        # 6~9. 포함 관계 → 60% 글자 일치 → 단어 → 부분 문자열 (2글자 이상)\n",
+                    "        # match_index가 mapping_dict 키 순서 기준으로 기존과 같은 키를 반환\n",
+                    "        key, stage = match_index.fuzzy_match(sggnm)\n",
+                    "        if key is not None:\n",
+                    "            return result(mapping_dict[key], stage)\n",
                     "        \n",
                     "        # 10. 기본값 반환 (매칭 실패 시 평균값 사용)\n",
                     "        if not df_clean.empty:\n",
-                    "            avg_data = df_clean.mean(numeric_only=True)\n",
-                    "            avg_data['region'] = '평균값'\n",
-                    "            avg_data['vulnerability_level'] = '보통'\n",
-                    "            return avg_data\n",
+                    "            return result(average_data(df_clean), '평균값')\n",
                     "        \n",
-                    "        return None\n",
+                    "        return result(None, None)\n",
                     "    except Exception as e:\n",
                     "        print(f\"매칭 오류 ({sggnm}): {e}\")\n",
-                    "        return None"
+                    "        return result(None, None)\n",
+                    "\n",
+                    "def cached_row(cached, df_clean):\n",
+                    "    \"\"\"매칭 캐시 항목 (행 위치, 단계, 원본 이름) → 행 데이터\"\"\"\n",
+                    "    position, stage, _ = cached\n",
+                    "    if position >= 0:\n",
+                    "        return df_clean.iloc[position]\n",
+                    "    return average_data(df_clean) if stage == '평균값' else None\n",
+                    "\n",
+                    "def row_provenance(matched_data, stage, df_clean):\n",
+                    "    \"\"\"매칭 결과 → 매칭 캐시 항목 (행 위치, 단계, 원본 이름)\"\"\"\n",
+                    "    if matched_data is None or stage == '평균값':\n",
+                    "        return -1, stage, None\n",
+                    "    return df_clean.index.get_loc(matched_data.name), stage, str(matched_data['region'])"
                 ]
             },
             {
@@ -328,6 +340,13 @@ def create_housing_vulnerability_map_notebook():
                     "matched_details = []\n",
                     "\n",
                     "if len(geo_files) > 0 and not df_clean.empty:\n",
+                    "    # 행정동별 매칭 결과 캐시 (data/cache/match/): 원본 이름 목록·매칭 코드가 같으면 이전 결과 재사용\n",
+                    "    match_cache = MatchCache('housing_map_notebook', *match_fingerprint(\n",
+                    "        [df_clean[['region']], list(mapping_dict)],\n",
+                    "        [normalize_region, create_comprehensive_mapping_dict, average_data, find_matching_data_ultimate,\n",
+                    "         os.path.join(project_dir, 'scripts', 'name_match_index.py')]\n",
+                    "    ))\n",
+                    "    \n",
                     "    for geo_file in geo_files:\n",
                     "        geo_path = os.path.join(geo_dir, geo_file)\n",
                     "        \n",
@@ -340,8 +359,16 @@ def create_housing_vulnerability_map_notebook():
                     "                total_features += 1\n",
                     "                sggnm = feature.get('properties', {}).get('sggnm', '')\n",
                     "                \n",
-                    "                # 최강화된 매칭 함수 사용\n",
-                    "                matched_data = find_matching_data_ultimate(sggnm, mapping_dict, df_clean)\n",
+                    "                # 최강화된 매칭 함수 사용 (캐시에 있으면 저장된 매칭 행 재사용)\n",
+                    "                match_key = (feature.get('properties', {}).get('sidonm', ''), sggnm,\n",
+                    "                             feature.get('properties', {}).get('adm_nm', ''))\n",
+                    "                cached = match_cache.get(match_key)\n",
+                    "                if cached is not None:\n",
+                    "                    matched_data = cached_row(cached, df_clean)\n",
+                    "                else:\n",
+                    "                    matched_data, stage = find_matching_data_ultimate(sggnm, mapping_dict, df_clean, match_index,\n",
+                    "                                                                      return_stage=True)\n",
+                    "                    match_cache.put(match_key, *row_provenance(matched_data, stage, df_clean))\n",
                     "                \n",
                     "                if matched_data is not None:\n",
                     "                    matched_count += 1\n",
@@ -390,6 +417,9 @@ def create_housing_vulnerability_map_notebook():
                     "        except Exception as e:\n",
                     "            print(f\"오류 발생 ({geo_file}): {e}\")\n",
                     "\n",
+                    "    match_cache.save()\n",
+                    "    print(match_cache.summary())\n",
+                    "\n",
                     "print(f\"총 feature 수: {total_features}\")\n",
                     "print(f\"매칭된 feature 수: {matched_count}\")\n",
                     "if total_features > 0:\n",
@@ -1,4 +1,3 @@
-import json
 import os
 import numpy as np
 import pandas as pd
@@ -6,9 +5,11 @@ import matplotlib as mpl
 import matplotlib.font_manager as fm
 import folium
 import random
-import re
 from folium.features import GeoJsonTooltip
 from branca.element import Template, MacroElement, Element
+from geo_cache import load_geo_all
+from grading import assign_grades
+from region_crosswalk import RegionCrosswalk, load_crosswalk
 
 # ---------------------------
 # 0) 글로벌 설정: 한글 폰트 & 음수 기호
@@ -42,11 +43,8 @@ paths = {
     '충북': 'data/raw/hangjeongdong_충청북도.geojson',
 }
 
-geos = [json.load(open(p, encoding='utf-8')) for p in paths.values()]
-geo_all = {
-    "type": "FeatureCollection",
-    "features": [f for g in geos for f in g['features']]
-}
+# 바이너리 캐시 사용 (원본 변경 시 자동 재생성)
+geo_all = load_geo_all(paths)
 
 # ---------------------------
 # 2) 기존 데이터 로드
@@ -60,80 +58,40 @@ sewer_data = pd.read_csv('results/yunjin/sewer_infrastructure_analysis_summary.c
 # 주거취약성 데이터 로드 (시도 단위)
 housing_data = pd.read_csv('results/yunjin/housing_vulnerability_analysis.csv')
 
-# 법정동코드 데이터 로드
-cd = pd.read_excel('data/raw/KIKcd_H.20250714_processed.xlsx')
-
-# ---------------------------
-# 3) 정규화 함수 정의 (사회취약계층 노트북에서 가져옴)
-# ---------------------------
-def norm_gu(name):
-    if pd.isna(name) or name == '':       # 빈 문자열 방지
-        return ''
-    return str(name).split()[-1]
-
-def norm_dong(name):
-    if pd.isna(name): 
-        return name
-    s = str(name).strip()
-    # 창제1동, 당감제1동 등: '제숫자' → '숫자'
-    s = re.sub(r'제(\d+)', r'\1', s)
-    # 구분 기호 통일 후 제거
-    s = s.replace('.', '·').replace('·', '').replace('ㆍ','')
-    return s
+# 행정구역 코드 대응표 (KIKcd_H + GeoJSON, 원본 변경 시 자동 재생성)
+crosswalk = load_crosswalk()
 
 # ---------------------------
-# 4) 데이터 전처리 및 결합
+# 3) 데이터 전처리 및 결합 (정수 코드 기준)
 # ---------------------------
 # 기존 취약성 데이터 처리 (읍면동 단위 유지)
 total = vulnerability_data.copy()
 
-# 시도명 매핑 함수
-def map_sido_name(sido_name):
-    mapping = {
-        '서울특별시': '서울특별시',
-        '부산광역시': '부산광역시',
-        '대구광역시': '대구광역시',
-        '인천광역시': '인천광역시',
-        '광주광역시': '광주광역시',
-        '대전광역시': '대전광역시',
-        '울산광역시': '울산광역시',
-        '세종특별자치시': '세종특별자치시',
-        '경기도': '경기도',
-        '강원도': '강원도',
-        '충청북도': '충청북도',
-        '충청남도': '충청남도',
-        '전라북도': '전라북도',
-        '전라남도': '전라남도',
-        '경상북도': '경상북도',
-        '경상남도': '경상남도',
-        '제주특별자치도': '제주특별자치도'
-    }
-    return mapping.get(sido_name, sido_name)
-
-# 데이터 결합
-total['시도명'] = total['시도명'].apply(map_sido_name)
-sewer_data['시도'] = sewer_data['시도'].apply(map_sido_name)
-housing_data['region'] = housing_data['region'].apply(map_sido_name)
+# 행정동코드가 없으면 (시도명, 시군구명, 읍면동명)으로 대응표에서 찾음
+if '행정동코드' not in total.columns:
+    print("기존 데이터에 행정동코드가 없습니다. 코드 대응표 매핑을 진행합니다.")
+    total['행정동코드'] = crosswalk.dong_codes(total['시도명'], total['시군구명'], total['읍면동명'])
+adm_codes = crosswalk.canonical_codes(total['행정동코드'])
+total['sgg_cd'] = RegionCrosswalk.sgg_of(adm_codes)
+total['sido_cd'] = RegionCrosswalk.sido_of(adm_codes)
 
 # 강수량 데이터는 별도로 생성 (임시 데이터)
 total['연강수량'] = np.random.uniform(800, 1400, len(total))
 
-# 수도인프라 데이터를 시군구별로 읍면동에 매핑 (시군구 단위 유지)
-sewer_sig = sewer_data.groupby(['시도', '행정구역명']).agg({
+# 수도인프라 데이터를 시군구 코드별로 집계 (시군구 단위 행만 사용)
+sewer_data['sgg_cd'] = crosswalk.sgg_codes(sewer_data['시도'], sewer_data['행정구역명'])
+sewer_sig = sewer_data[sewer_data['sgg_cd'] >= 0].groupby('sgg_cd').agg({
     '하수도_인프라_지수': 'mean',
     '인프라_등급': lambda x: x.mode()[0] if len(x.mode()) > 0 else '보통',
     '등급_숫자': 'mean'
 }).reset_index()
 
-# 시군구명 매핑을 위해 정규화
-total['key_gu'] = total['시군구명'].apply(norm_gu)
-sewer_sig['key_gu'] = sewer_sig['행정구역명'].apply(norm_gu)
-
-# 수도인프라 데이터를 시군구별로 읍면동에 매핑
-total = total.merge(sewer_sig, left_on=['시도명', 'key_gu'], right_on=['시도', 'key_gu'], how='left')
+# 수도인프라 데이터를 시군구 코드로 읍면동에 매핑
+total = total.merge(sewer_sig, on='sgg_cd', how='left')
 
-# 주거취약성 데이터를 시도별로 읍면동에 매핑 (시도 단위 유지)
-total = total.merge(housing_data, left_on='시도명', right_on='region', how='left')
+# 주거취약성 데이터를 시도 코드로 읍면동에 매핑 (시도 단위 유지)
+housing_data['sido_cd'] = crosswalk.sido_codes(housing_data['region'])
+total = total.merge(housing_data, on='sido_cd', how='left')
 
 # 결측값 처리
 total['하수도_인프라_지수'] = total['하수도_인프라_지수'].fillna(50)
@@ -142,58 +100,13 @@ total['인프라_등급'] = total['인프라_등급'].fillna('보통')
 total['vulnerability_level'] = total['vulnerability_level'].fillna('보통')
 total['등급_숫자'] = total['등급_숫자'].fillna(3)
 
-# 취약등급 계산
-def grade(x):
-    if x is None or (isinstance(x, float) and np.isnan(x)):
-        return 1
-    if x < 25:
-        return 1
-    elif x < 50:
-        return 2
-    elif x < 75:
-        return 3
-    else:
-        return 4
-
-def classify_infrastructure(score):
-    if score >= 80:
-        return '높음'
-    elif score >= 60:
-        return '보통'
-    elif score >= 40:
-        return '낮음'
-    else:
-        return '매우 낮음'
-
-def classify_vulnerability(score):
-    if score >= 70:
-        return '매우 높음'
-    elif score >= 50:
-        return '높음'
-    elif score >= 30:
-        return '보통'
-    elif score >= 10:
-        return '낮음'
-    else:
-        return '매우 낮음'
-
-def grade_to_number(grade):
-    grade_mapping = {
-        '매우 낮음': 1,
-        '낮음': 2,
-        '보통': 3,
-        '높음': 4,
-        '매우 높음': 5
-    }
-    return grade_mapping.get(grade, 3)
-
-total['취약등급'] = total['사회취약지수'].apply(grade)
-total['수도인프라_등급'] = total['하수도_인프라_지수'].apply(classify_infrastructure)
-total['주거취약_등급'] = total['vulnerability_normalized'].apply(classify_vulnerability)
+# 취약등급 계산 (지수별 구간 경계/라벨은 grading.GRADE_SCALES 참고)
+total['취약등급'] = assign_grades(total['사회취약지수'], '사회취약')[0]
+total['수도인프라_등급'] = assign_grades(total['하수도_인프라_지수'], '수도인프라')[1]
+total['주거취약_등급_숫자'], total['주거취약_등급'] = assign_grades(total['vulnerability_normalized'], '주거취약')
 
 # 등급을 숫자로 변환
 total['수도인프라_등급_숫자'] = total['등급_숫자'].astype(int)  # 기존 등급_숫자 사용
-total['주거취약_등급_숫자'] = total['주거취약_등급'].apply(grade_to_number)
 
 # 데이터 값 범위 확인
 print("데이터 값 범위:")
@@ -205,59 +118,12 @@ print(f"수도인프라_등급_숫자: {total['수도인프라_등급_숫자'].m
 print(f"주거취약_등급_숫자: {total['주거취약_등급_숫자'].min():.0f} ~ {total['주거취약_등급_숫자'].max():.0f}")
 
 # ---------------------------
-# 5) 최강화된 매핑 (법정동코드 활용)
+# 4) 행정동코드 정규화 (GeoJSON adm_cd2와 같은 10자리 문자열)
 # ---------------------------
-# 기존 데이터에 이미 행정동코드가 있는지 확인
-if '행정동코드' in total.columns:
-    print("기존 데이터에 행정동코드가 있습니다. 정규화를 진행합니다.")
-    # 행정동코드 정규화
-    total["행정동코드"] = (
-        total["행정동코드"]
-            .astype(str)                 # 3611025000  or  3611025000.0
-            .str.split(".").str[0]        # 3611025000  (소수점 제거)
-            .str.zfill(10)                # 10자리 0패딩 (0012312345 같은 코드 대비)
-            .str.strip()                  # 혹시 모를 공백 제거
-    )
-else:
-    print("기존 데이터에 행정동코드가 없습니다. 법정동코드 매핑을 진행합니다.")
-    # 법정동코드 데이터 전처리
-    cd.loc[(cd['시도명']=='세종특별자치시') & (cd['시군구명'].isna()), '시군구명'] = '세종시'
-    cd['시군구명'] = cd['시군구명'].fillna('')
-    cd['key_gu']   = cd['시군구명'].apply(norm_gu)
-    total['key_gu'] = total['시군구명'].apply(norm_gu)
-
-    cd['key_dong']   = cd['읍면동명'].apply(norm_dong)
-    total['key_dong'] = total['읍면동명'].apply(norm_dong)
-
-    cd_sorted = (cd.sort_values(['말소일자','생성일자'])   # 말소일자 NaN 이 먼저 옴
-                     .drop_duplicates(['시도명','key_gu','key_dong'],
-                                       keep='last'))
-
-    cd_subset = cd_sorted[['시도명','key_gu','key_dong','행정동코드']]
-
-    # 최강화된 매핑 적용
-    total = (total
-             .merge(cd_subset,
-                    left_on = ['시도명','key_gu','key_dong'],
-                    right_on=['시도명','key_gu','key_dong'],
-                    how='left')
-             .drop(columns=['key_gu','key_dong'])      # 정규화용 컬럼 제거
-            )
-
-    # 행정동코드 정규화
-    if '행정동코드' in total.columns:
-        total["행정동코드"] = (
-            total["행정동코드"]
-                .astype(str)                 # 3611025000  or  3611025000.0
-                .str.split(".").str[0]        # 3611025000  (소수점 제거)
-                .str.zfill(10)                # 10자리 0패딩 (0012312345 같은 코드 대비)
-                .str.strip()                  # 혹시 모를 공백 제거
-        )
-    else:
-        print("Warning: 매핑 후에도 행정동코드가 없습니다.")
+total["행정동코드"] = pd.Series(adm_codes, index=total.index).astype(str).str.zfill(10)
 
 # ---------------------------
-# 6) GeoJSON feature에 데이터 병합
+# 5) GeoJSON feature에 데이터 병합
 # ---------------------------
 # 행정동코드 매핑 (GeoJSON에서)
 code2name = {
@@ -309,7 +175,7 @@ for feat in geo_all['features']:
 print("✅ GeoJSON 데이터 병합 완료")
 
 # ---------------------------
-# 7) 각 지도별 설정
+# 6) 각 지도별 설정
 # ---------------------------
 MAP_CONFIGS = {
     "통합취약지수": {
@@ -339,7 +205,7 @@ MAP_CONFIGS = {
 }
 
 # ---------------------------
-# 8) 각 지도 생성
+# 7) 각 지도 생성
 # ---------------------------
 maps = {}
 for map_name, config in MAP_CONFIGS.items():
@@ -390,7 +256,7 @@ for map_name, config in MAP_CONFIGS.items():
     maps[map_name] = m
 
 # ---------------------------
-# 9) HTML 템플릿 생성 (탭 형태)
+# 8) HTML 템플릿 생성 (탭 형태)
 # ---------------------------
 html_template = """
 <!DOCTYPE html>
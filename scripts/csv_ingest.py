@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+원자료 CSV 공통 읽기 (인코딩 자동 판별 + pyarrow CSV 엔진)
+공공데이터 CSV는 파일마다 utf-8 / utf-8-sig(BOM) / cp949가 섞여 있어
+앞부분 바이트 표본으로 인코딩을 판별하고, 판별 결과는 파일 지문(크기/수정 시각)별로
+data/cache/encodings.json에 저장하여 다음 실행에서는 표본도 읽지 않음
+- 읽기는 pyarrow.csv (멀티스레드 파싱), 알려진 파일군은 SCHEMAS의 열 자료형을 명시
+- 빈 첫 줄(weather_rain/*.csv), 따옴표로 감싼 헤더(Natural_Disaster_Risk.csv)도 그대로 처리
+"""
+
+import codecs
+import json
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from geo_cache import file_fingerprint
+
+ENCODING_CACHE_PATH = 'data/cache/encodings.json'
+SAMPLE_SIZE = 64 * 1024
+
+# 판별 순서 (BOM이 없으면 utf-8 → cp949)
+CANDIDATE_ENCODINGS = ['utf-8', 'cp949']
+
+# 파일군별 열 자료형 (파일에 없는 열은 무시)
+SCHEMAS = {
+    'weather_rain': {
+        '지점정보': pa.string(),
+        '경도': pa.float64(),
+        '위도': pa.float64(),
+        '강수량(mm)': pa.float64()
+    },
+    'summer_rainfall': {
+        '지점정보': pa.string(),
+        **{f'{year}강수량(mm)': pa.float64() for year in range(2020, 2025)},
+        '2020~2024강수량 총합 (mm)': pa.float64(),
+        '2020~2024강수량 평균 (mm)': pa.float64(),
+        '호우주의보': pa.int64(),
+        '호우경보': pa.int64(),
+        '호우특보': pa.int64()
+    },
+    'heavy_rain_alerts': {
+        '재난': pa.string(),
+        '발생시간': pa.string(),
+        '발생지역': pa.string(),
+        '지점정보': pa.string()
+    },
+    'sewer_coverage': {
+        '시도': pa.string(),
+        '구군': pa.string(),
+        '행정구역명': pa.string(),
+        '수계': pa.string(),
+        '지류': pa.string(),
+        '세부단위유역 ': pa.string(),
+        '중권역': pa.string(),
+        '소권역': pa.string(),
+        '총인구(명)': pa.int64(),
+        '총면적': pa.float64()
+    }
+}
+
+
+def detect_encoding(sample, complete=False):
+    """
+    바이트 표본으로 인코딩 판별
+    Args:
+        sample (bytes): 파일 앞부분
+        complete (bool): 표본이 파일 전체인지 (아니면 끝에서 잘린 멀티바이트 문자 허용)
+    Returns:
+        str: 'utf-8-sig', 'utf-8' 또는 'cp949'
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    for encoding in CANDIDATE_ENCODINGS:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=complete)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"인코딩을 판별할 수 없습니다 (후보: {', '.join(CANDIDATE_ENCODINGS)})")
+
+
+def _load_encoding_cache(cache_path):
+    """저장된 판별 결과 (파일이 없거나 손상되었으면 빈 캐시)"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def sniff_encoding(path, cache_path=ENCODING_CACHE_PATH):
+    """파일 인코딩 (지문이 같으면 저장된 판별 결과 사용)"""
+    fingerprint = file_fingerprint(path)
+    key = os.path.normpath(path)
+    cache = _load_encoding_cache(cache_path)
+    entry = cache.get(key)
+    if (isinstance(entry, dict) and entry.get('encoding') and entry.get('size') == fingerprint['size']
+            and entry.get('mtime_ns') == fingerprint['mtime_ns']):
+        return entry['encoding']
+
+    with open(path, 'rb') as f:
+        sample = f.read(SAMPLE_SIZE)
+    encoding = detect_encoding(sample, complete=len(sample) < SAMPLE_SIZE)
+
+    cache[key] = dict(fingerprint, path=key, encoding=encoding)
+    cache_dir = os.path.dirname(cache_path) or '.'
+    os.makedirs(cache_dir, exist_ok=True)
+    # 여러 단계가 동시에 판별할 수 있으므로 호출마다 고유한 임시 파일에 쓴 뒤 교체
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=cache_dir, suffix='.tmp', delete=False) as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(f.name, cache_path)
+    return encoding
+
+
+def _dedupe_columns(names):
+    """중복 열 이름에 pd.read_csv와 같은 '.1', '.2' 접미사 부여 (KOSIS 다중 헤더 파일 등)"""
+    seen = {}
+    result = []
+    for name in names:
+        candidate = name
+        while candidate in seen:
+            seen[name] += 1
+            candidate = f"{name}.{seen[name]}"
+        seen.setdefault(candidate, 0)
+        result.append(candidate)
+    return result
+
+
+def read_csv_arrow(path, schema=None, encoding=None, skip_rows=0, cache_path=ENCODING_CACHE_PATH):
+    """
+    CSV → pyarrow.Table
+    Args:
+        path (str): CSV 경로
+        schema (str | dict): SCHEMAS의 파일군 이름 또는 {열: pyarrow 자료형}
+        encoding (str): 인코딩 (기본값: sniff_encoding 판별 결과)
+        skip_rows (int): 헤더 앞에서 건너뛸 행 수 (빈 줄은 자동으로 건너뜀)
+    """
+    if encoding is None:
+        encoding = sniff_encoding(path, cache_path)
+    if isinstance(schema, str):
+        schema = SCHEMAS[schema]
+
+    if encoding in ('utf-8', 'utf-8-sig'):
+        # Arrow가 직접 읽음 (UTF-8 BOM은 자동으로 건너뜀)
+        source = path
+    else:
+        # 한 번에 UTF-8로 변환 (Arrow의 스트리밍 변환보다 빠름)
+        with open(path, 'rb') as f:
+            source = pa.BufferReader(f.read().decode(encoding).encode('utf-8'))
+
+    table = pa_csv.read_csv(
+        source,
+        read_options=pa_csv.ReadOptions(skip_rows=skip_rows),
+        convert_options=pa_csv.ConvertOptions(column_types=schema or {}, strings_can_be_null=True)
+    )
+    names = _dedupe_columns(table.column_names)
+    return table if names == table.column_names else table.rename_columns(names)
+
+
+def read_csv(path, schema=None, encoding=None, skip_rows=0, cache_path=ENCODING_CACHE_PATH):
+    """CSV → pd.DataFrame (pd.read_csv와 같은 열 이름/결측 처리, 인자는 read_csv_arrow 참고)"""
+    return read_csv_arrow(path, schema, encoding, skip_rows, cache_path).to_pandas()
+
+
+def main(repeat=5):
+    """data/raw의 CSV 전체를 기존 pd.read_csv(수동 인코딩 지정)와 비교하여 결과와 시간 확인"""
+    import glob
+    import time
+
+    paths = sorted(glob.glob('data/raw/**/*.csv', recursive=True))
+    schemas = {'weather_rain': 'weather_rain', 'heavy_rain': 'heavy_rain_alerts', 'Sewer_Coverage': 'sewer_coverage'}
+
+    def schema_for(path):
+        if os.path.basename(path).startswith('20~24_'):
+            return 'summer_rainfall'
+        return next((schema for key, schema in schemas.items() if key in path), None)
+
+    print(f"📥 원자료 CSV {len(paths)}개 인코딩 판별")
+    encodings = {path: sniff_encoding(path) for path in paths}
+    for encoding in sorted(set(encodings.values())):
+        names = [os.path.basename(p) for p, e in encodings.items() if e == encoding]
+        print(f"   - {encoding}: {len(names)}개 ({', '.join(names[:3])}{' 등' if len(names) > 3 else ''})")
+
+    mismatched = []
+    for path in paths:
+        expected = pd.read_csv(path, encoding=encodings[path])
+        actual = read_csv(path, schema_for(path))
+        try:
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+        except AssertionError:
+            mismatched.append(os.path.basename(path))
+
+    def best_time(func):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    pandas_time = best_time(lambda: [pd.read_csv(p, encoding=encodings[p]) for p in paths])
+    arrow_time = best_time(lambda: [read_csv(p, schema_for(p)) for p in paths])
+    print(f"⚡ 전체 읽기: pd.read_csv {pandas_time * 1000:.0f}ms → pyarrow {arrow_time * 1000:.0f}ms "
+          f"({pandas_time / arrow_time:.1f}배)")
+    print(f"   pd.read_csv와 다른 파일: {', '.join(mismatched) if mismatched else '없음'}")
+    return encodings
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+행정동 GeoJSON 바이너리 캐시
+hangjeongdong_*.geojson 파일들을 한 번만 파싱하여
+좌표/오프셋 배열(.npy)과 속성 테이블(adm_cd2 기준)로 저장하고,
+이후 실행에서는 메모리 매핑으로 바로 열어 사용
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# 모든 시도의 GeoJSON 파일 경로 (프로젝트 루트 기준)
+GEO_PATHS = {
+    '서울': 'data/raw/hangjeongdong_서울특별시.geojson',
+    '부산': 'data/raw/hangjeongdong_부산광역시.geojson',
+    '대구': 'data/raw/hangjeongdong_대구광역시.geojson',
+    '인천': 'data/raw/hangjeongdong_인천광역시.geojson',
+    '광주': 'data/raw/hangjeongdong_광주광역시.geojson',
+    '대전': 'data/raw/hangjeongdong_대전광역시.geojson',
+    '울산': 'data/raw/hangjeongdong_울산광역시.geojson',
+    '세종': 'data/raw/hangjeongdong_세종특별자치시.geojson',
+    '경기': 'data/raw/hangjeongdong_경기도.geojson',
+    '강원': 'data/raw/hangjeongdong_강원도.geojson',
+    '충북': 'data/raw/hangjeongdong_충청북도.geojson',
+    '충남': 'data/raw/hangjeongdong_충청남도.geojson',
+    '전북': 'data/raw/hangjeongdong_전라북도.geojson',
+    '전남': 'data/raw/hangjeongdong_전라남도.geojson',
+    '경북': 'data/raw/hangjeongdong_경상북도.geojson',
+    '경남': 'data/raw/hangjeongdong_경상남도.geojson',
+    '제주': 'data/raw/hangjeongdong_제주특별자치도.geojson'
+}
+
+CACHE_DIR = 'data/cache/geometry'
+CACHE_VERSION = 1
+
+# 지오메트리 타입 코드
+GEOM_POLYGON = 0
+GEOM_MULTIPOLYGON = 1
+
+_ARRAY_NAMES = ['coords', 'ring_offsets', 'part_offsets', 'feature_offsets', 'geom_types', 'source_ids']
+
+
+def file_fingerprint(path):
+    """원본 파일의 크기와 수정 시각"""
+    st = os.stat(path)
+    return {'path': path, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _cache_path(paths, cache_dir):
+    """원본 파일 목록별 캐시 디렉토리 경로"""
+    key = hashlib.md5('\n'.join(paths).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, key)
+
+
+class GeometryCache:
+    """
+    평탄화된 행정동 지오메트리
+    - coords: (좌표 수, 2) float64 [경도, 위도]
+    - ring_offsets: 링별 coords 시작 위치 (링 수 + 1)
+    - part_offsets: 폴리곤별 ring_offsets 시작 위치 (폴리곤 수 + 1)
+    - feature_offsets: 행정동별 part_offsets 시작 위치 (행정동 수 + 1)
+    - properties: 행정동별 속성 딕셔너리 (adm_cd2로 조회 가능)
+    """
+
+    def __init__(self, arrays, properties, sources):
+        self.coords = arrays['coords']
+        self.ring_offsets = arrays['ring_offsets']
+        self.part_offsets = arrays['part_offsets']
+        self.feature_offsets = arrays['feature_offsets']
+        self.geom_types = arrays['geom_types']
+        self.source_ids = arrays['source_ids']
+        self.properties = properties
+        self.sources = sources
+        self.adm_cd2 = np.array([str(p.get('adm_cd2', '')) for p in properties])
+        self.index = {code: i for i, code in enumerate(self.adm_cd2)}
+
+    def __len__(self):
+        return len(self.properties)
+
+    def geometry(self, i):
+        """i번째 행정동의 GeoJSON geometry 복원"""
+        polygons = []
+        for part in range(self.feature_offsets[i], self.feature_offsets[i + 1]):
+            rings = []
+            for ring in range(self.part_offsets[part], self.part_offsets[part + 1]):
+                rings.append(self.coords[self.ring_offsets[ring]:self.ring_offsets[ring + 1]].tolist())
+            polygons.append(rings)
+
+        if self.geom_types[i] == GEOM_POLYGON:
+            return {'type': 'Polygon', 'coordinates': polygons[0]}
+        return {'type': 'MultiPolygon', 'coordinates': polygons}
+
+    def feature(self, i):
+        """i번째 행정동의 GeoJSON Feature 복원"""
+        return {
+            'type': 'Feature',
+            'properties': dict(self.properties[i]),
+            'geometry': self.geometry(i)
+        }
+
+    def get(self, adm_cd2):
+        """adm_cd2로 Feature 조회 (없으면 None)"""
+        i = self.index.get(str(adm_cd2))
+        return None if i is None else self.feature(i)
+
+    def to_feature_collection(self):
+        """기존 geo_all과 동일한 형태의 FeatureCollection 생성"""
+        return {
+            "type": "FeatureCollection",
+            "features": [self.feature(i) for i in range(len(self))]
+        }
+
+    def feature_coord_ranges(self):
+        """행정동별 coords 시작/끝 위치"""
+        ring_start = self.part_offsets[self.feature_offsets[:-1]]
+        ring_end = self.part_offsets[self.feature_offsets[1:]]
+        return self.ring_offsets[ring_start], self.ring_offsets[ring_end]
+
+    def bounds(self):
+        """행정동별 경계 상자 (minx, miny, maxx, maxy)"""
+        start, end = self.feature_coord_ranges()
+        xs = np.asarray(self.coords[:, 0])
+        ys = np.asarray(self.coords[:, 1])
+        return np.column_stack([
+            np.minimum.reduceat(xs, start), np.minimum.reduceat(ys, start),
+            np.maximum.reduceat(xs, start), np.maximum.reduceat(ys, start)
+        ]) if len(start) else np.empty((0, 4))
+
+    def centroids(self):
+        """행정동별 대표점 (정점 평균, 경도/위도)"""
+        start, end = self.feature_coord_ranges()
+        if not len(start):
+            return np.empty((0, 2))
+        sums = np.add.reduceat(np.asarray(self.coords), start, axis=0)
+        return sums / (end - start)[:, None]
+
+
+def _flatten(features, source_id, buffers):
+    """GeoJSON features를 평탄화 버퍼에 추가"""
+    for feat in features:
+        geom = feat['geometry']
+        if geom['type'] == 'Polygon':
+            polygons = [geom['coordinates']]
+            buffers['geom_types'].append(GEOM_POLYGON)
+        else:
+            polygons = geom['coordinates']
+            buffers['geom_types'].append(GEOM_MULTIPOLYGON)
+
+        for polygon in polygons:
+            for ring in polygon:
+                buffers['coords'].extend(ring)
+                buffers['ring_offsets'].append(len(buffers['coords']))
+            buffers['part_offsets'].append(len(buffers['ring_offsets']) - 1)
+        buffers['feature_offsets'].append(len(buffers['part_offsets']) - 1)
+        buffers['source_ids'].append(source_id)
+        buffers['properties'].append(feat['properties'])
+
+
+def build_geometry_cache(paths, cache_path, verbose=True):
+    """원본 GeoJSON을 한 번 파싱하여 캐시 생성"""
+    buffers = {
+        'coords': [],
+        'ring_offsets': [0],
+        'part_offsets': [0],
+        'feature_offsets': [0],
+        'geom_types': [],
+        'source_ids': [],
+        'properties': []
+    }
+    sources = []
+    for source_id, path in enumerate(paths):
+        with open(path, 'r', encoding='utf-8') as f:
+            geo_data = json.load(f)
+        _flatten(geo_data['features'], source_id, buffers)
+        sources.append(file_fingerprint(path))
+        if verbose:
+            print(f"✅ {os.path.basename(path)}: {len(geo_data['features'])}개 행정동 (캐시 생성)")
+
+    arrays = {
+        'coords': np.asarray(buffers['coords'], dtype=np.float64).reshape(-1, 2),
+        'ring_offsets': np.asarray(buffers['ring_offsets'], dtype=np.int64),
+        'part_offsets': np.asarray(buffers['part_offsets'], dtype=np.int64),
+        'feature_offsets': np.asarray(buffers['feature_offsets'], dtype=np.int64),
+        'geom_types': np.asarray(buffers['geom_types'], dtype=np.int8),
+        'source_ids': np.asarray(buffers['source_ids'], dtype=np.int16)
+    }
+
+    os.makedirs(cache_path, exist_ok=True)
+    for name in _ARRAY_NAMES:
+        np.save(os.path.join(cache_path, f'{name}.npy'), arrays[name])
+    with open(os.path.join(cache_path, 'properties.json'), 'w', encoding='utf-8') as f:
+        json.dump(buffers['properties'], f, ensure_ascii=False)
+    # 매니페스트는 마지막에 기록 (중간에 실패하면 다음 실행에서 재생성)
+    with open(os.path.join(cache_path, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'sources': sources}, f, ensure_ascii=False, indent=2)
+
+    return GeometryCache(arrays, buffers['properties'], sources)
+
+
+def _is_fresh(cache_path, paths):
+    """매니페스트의 크기/수정 시각이 원본과 일치하는지 확인"""
+    manifest_path = os.path.join(cache_path, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != CACHE_VERSION:
+        return False
+    return manifest['sources'] == [file_fingerprint(p) for p in paths]
+
+
+def open_geometry_cache(cache_path):
+    """캐시를 메모리 매핑으로 열기"""
+    arrays = {
+        name: np.load(os.path.join(cache_path, f'{name}.npy'), mmap_mode='r')
+        for name in _ARRAY_NAMES
+    }
+    with open(os.path.join(cache_path, 'properties.json'), 'r', encoding='utf-8') as f:
+        properties = json.load(f)
+    with open(os.path.join(cache_path, 'manifest.json'), 'r', encoding='utf-8') as f:
+        sources = json.load(f)['sources']
+    return GeometryCache(arrays, properties, sources)
+
+
+def load_geometry_cache(geo_paths=None, base_dir='.', cache_dir=None, verbose=True):
+    """
+    행정동 지오메트리 캐시 로드 (원본이 바뀌었으면 재생성)
+    Args:
+        geo_paths (dict): 시도별 GeoJSON 경로 (기본값: GEO_PATHS)
+        base_dir (str): 상대 경로의 기준 디렉토리 (notebooks/에서는 '..')
+        cache_dir (str): 캐시 디렉토리 (기본값: base_dir/data/cache/geometry)
+    """
+    if geo_paths is None:
+        geo_paths = GEO_PATHS
+    if cache_dir is None:
+        cache_dir = os.path.normpath(os.path.join(base_dir, CACHE_DIR))
+
+    paths = []
+    for sido, path in geo_paths.items():
+        full_path = os.path.normpath(os.path.join(base_dir, path))
+        if os.path.exists(full_path):
+            paths.append(full_path)
+        elif verbose:
+            print(f"❌ {sido}: 파일 없음 ({full_path})")
+
+    cache_path = _cache_path(paths, cache_dir)
+    if _is_fresh(cache_path, paths):
+        cache = open_geometry_cache(cache_path)
+        if verbose:
+            print(f"⚡ 지오메트리 캐시 사용: {cache_path}")
+    else:
+        cache = build_geometry_cache(paths, cache_path, verbose=verbose)
+    return cache
+
+
+def load_geo_all(geo_paths=None, base_dir='.', cache_dir=None, verbose=True):
+    """캐시를 거쳐 전국 행정동 FeatureCollection(geo_all) 로드"""
+    cache = load_geometry_cache(geo_paths, base_dir=base_dir, cache_dir=cache_dir, verbose=verbose)
+    return cache.to_feature_collection()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+행정동 지오메트리 단순화 (줌 단계별 LOD)
+행정동 경계를 공유 경계선(arc) 단위로 쪼개 한 번씩만 단순화하므로
+인접 행정동의 경계가 모든 단계에서 정확히 일치 (틈/겹침 없음)
+- 전국(national) / 시도(province) / 시군구(local) 3단계를 geo_cache와 같은 평탄화 배열로 캐시
+- add_lod_swap(): 지도에는 가장 거친 단계만 싣고, 확대 시 더 세밀한 단계(TopoJSON)로 교체
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+from branca.element import Element, JavascriptLink, MacroElement, Template
+from folium import TopoJson
+
+from geo_cache import _ARRAY_NAMES, GeometryCache, load_geometry_cache
+
+LOD_CACHE_DIR = 'data/cache/geometry_lod'
+LOD_VERSION = 1
+
+# 단계별 단순화 허용 오차(도), 좌표 소수 자릿수, 적용 시작 줌
+# 허용 오차는 해당 단계 최대 줌에서 1픽셀 안팎 (줌 7에서 1픽셀 ≈ 0.011도)
+LOD_LEVELS = [
+    {'name': 'national', 'tolerance': 0.004, 'decimals': 3, 'min_zoom': 0},
+    {'name': 'province', 'tolerance': 0.001, 'decimals': 4, 'min_zoom': 9},
+    {'name': 'local', 'tolerance': 0.0002, 'decimals': 5, 'min_zoom': 11},
+]
+
+
+class Topology:
+    """
+    공유 경계선 분해 결과
+    - vertices: (고유 정점 수, 2) 좌표
+    - arcs: 경계선별 정점 번호 배열 (정방향 기준)
+    - ring_arcs: 링별 [(경계선 번호, 역방향 여부), ...] (링 순서는 geo_cache의 ring_offsets와 같음)
+    """
+
+    def __init__(self, vertices, arcs, ring_arcs):
+        self.vertices = vertices
+        self.arcs = arcs
+        self.ring_arcs = ring_arcs
+
+
+def build_topology(cache):
+    """
+    링을 접합점(인접 정점이 2개가 아닌 정점)에서 잘라 공유 경계선으로 분해
+    같은 경계선을 지나는 링(인접 행정동, 구멍-섬)은 같은 경계선 번호를 참조
+    """
+    coords = np.ascontiguousarray(cache.coords, dtype=np.float64)
+    vertices, vertex_ids = np.unique(coords.view(np.complex128).ravel(), return_inverse=True)
+    vertices = vertices.view(np.float64).reshape(-1, 2)
+    ring_offsets = np.asarray(cache.ring_offsets)
+
+    # 닫는 정점을 뺀 링별 정점 번호
+    rings = []
+    for start, end in zip(ring_offsets[:-1], ring_offsets[1:]):
+        ids = vertex_ids[start:end]
+        if len(ids) > 1 and ids[0] == ids[-1]:
+            ids = ids[:-1]
+        rings.append(ids)
+
+    # 정점별 서로 다른 인접 정점 수 (무방향 간선 기준)
+    edges = np.concatenate([np.column_stack([ids, np.roll(ids, -1)]) for ids in rings if len(ids) > 1])
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    degree = np.bincount(edges.ravel(), minlength=len(vertices))
+    is_junction = degree != 2
+
+    arc_index = {}
+    arcs = []
+    ring_arcs = []
+
+    def add_arc(ids):
+        forward = tuple(ids.tolist())
+        backward = forward[::-1]
+        key, reversed_ = (forward, False) if forward <= backward else (backward, True)
+        if key not in arc_index:
+            arc_index[key] = len(arcs)
+            arcs.append(np.asarray(key, dtype=np.int64))
+        return arc_index[key], reversed_
+
+    for ids in rings:
+        if len(ids) < 3:
+            ring_arcs.append([])
+            continue
+        cuts = np.flatnonzero(is_junction[ids])
+        if not len(cuts):
+            # 접합점이 없는 닫힌 링 (섬, 구멍): 가장 작은 정점 번호에서 시작하는 하나의 경계선
+            start = int(np.argmin(ids))
+            forward = np.concatenate([ids[start:], ids[:start], ids[start:start + 1]])
+            backward = np.concatenate([forward[:1], forward[-2:0:-1], forward[:1]])
+            if tuple(backward.tolist()) < tuple(forward.tolist()):
+                ring_arcs.append([(add_arc(backward)[0], True)])
+            else:
+                ring_arcs.append([(add_arc(forward)[0], False)])
+            continue
+        rotated = np.concatenate([ids[cuts[0]:], ids[:cuts[0]]])
+        cuts = cuts - cuts[0]
+        bounds = list(cuts) + [len(rotated)]
+        closed = np.concatenate([rotated, rotated[:1]])
+        ring_arcs.append([add_arc(closed[a:b + 1]) for a, b in zip(bounds[:-1], bounds[1:])])
+
+    return Topology(vertices, arcs, ring_arcs)
+
+
+def _segment_distances(points, a, b):
+    """points에서 선분 a-b까지의 거리 (a == b이면 점 거리)"""
+    ab = b - a
+    length2 = float(ab @ ab)
+    if length2 == 0.0:
+        return np.hypot(points[:, 0] - a[0], points[:, 1] - a[1])
+    t = np.clip(((points - a) @ ab) / length2, 0.0, 1.0)
+    proj = a + t[:, None] * ab
+    return np.hypot(points[:, 0] - proj[:, 0], points[:, 1] - proj[:, 1])
+
+
+def arc_importance(points, min_tolerance):
+    """
+    Douglas-Peucker 정점 중요도: 허용 오차 t로 단순화하면 중요도 > t인 정점만 남음
+    (자식 정점의 중요도는 부모 분할 거리 이하로 제한, min_tolerance 미만 구간은 더 나누지 않음)
+    """
+    n = len(points)
+    importance = np.zeros(n)
+    importance[0] = importance[-1] = np.inf
+    stack = [(0, n - 1, np.inf)]
+    while stack:
+        first, last, parent = stack.pop()
+        if last - first < 2:
+            continue
+        distances = _segment_distances(points[first + 1:last], points[first], points[last])
+        k = int(np.argmax(distances))
+        dist = distances[k]
+        if dist < min_tolerance:
+            continue
+        split = first + 1 + k
+        importance[split] = min(dist, parent)
+        stack.append((first, split, importance[split]))
+        stack.append((split, last, importance[split]))
+
+    if n > 3 and np.array_equal(points[0], points[-1]):
+        # 접합점 없는 닫힌 경계선은 어느 단계에서도 삼각형 이상 유지
+        interior = np.argsort(-importance[1:-1], kind='stable')[:2] + 1
+        importance[interior] = np.inf
+    return importance
+
+
+def _dedupe(points):
+    """연속 중복 좌표 제거"""
+    if len(points) < 2:
+        return points
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+    return points[keep]
+
+
+def simplify_level(cache, topology, importances, tolerance, decimals):
+    """
+    허용 오차 하나로 전체 행정동 단순화 → geo_cache와 같은 평탄화 배열
+    구멍이 퇴화하면 제거, 외곽 링이 퇴화하면 원본 링(반올림)으로 대체
+    """
+    simplified_arcs = [
+        np.round(topology.vertices[arc[importance > tolerance]], decimals)
+        for arc, importance in zip(topology.arcs, importances)
+    ]
+
+    coords, ring_offsets, part_offsets, feature_offsets = [], [0], [0], [0]
+    for i in range(len(cache)):
+        for part in range(cache.feature_offsets[i], cache.feature_offsets[i + 1]):
+            for position, ring in enumerate(range(cache.part_offsets[part], cache.part_offsets[part + 1])):
+                pieces = [simplified_arcs[a][::-1] if reversed_ else simplified_arcs[a]
+                          for a, reversed_ in topology.ring_arcs[ring]]
+                points = _dedupe(np.concatenate(pieces)) if pieces else np.empty((0, 2))
+                if len(points) < 4:
+                    if position > 0:
+                        continue
+                    original = np.asarray(cache.coords[cache.ring_offsets[ring]:cache.ring_offsets[ring + 1]])
+                    points = _dedupe(np.round(original, decimals))
+                    if len(points) < 4:
+                        points = original
+                coords.append(points)
+                ring_offsets.append(ring_offsets[-1] + len(points))
+            part_offsets.append(len(ring_offsets) - 1)
+        feature_offsets.append(len(part_offsets) - 1)
+
+    return {
+        'coords': np.concatenate(coords) if coords else np.empty((0, 2)),
+        'ring_offsets': np.asarray(ring_offsets, dtype=np.int64),
+        'part_offsets': np.asarray(part_offsets, dtype=np.int64),
+        'feature_offsets': np.asarray(feature_offsets, dtype=np.int64),
+        'geom_types': np.asarray(cache.geom_types),
+        'source_ids': np.asarray(cache.source_ids)
+    }
+
+
+def build_lod(cache, levels=None, verbose=True):
+    """
+    전체 LOD 단계 생성
+    Returns:
+        dict: 단계 이름 → GeometryCache (속성은 원본 캐시와 공유)
+    """
+    if levels is None:
+        levels = LOD_LEVELS
+    topology = build_topology(cache)
+    min_tolerance = min(level['tolerance'] for level in levels)
+    importances = [arc_importance(topology.vertices[arc], min_tolerance) for arc in topology.arcs]
+    if verbose:
+        print(f"✅ 공유 경계선 분해: 정점 {len(topology.vertices):,}개, 경계선 {len(topology.arcs):,}개")
+
+    lod = {}
+    for level in levels:
+        arrays = simplify_level(cache, topology, importances, level['tolerance'], level['decimals'])
+        lod[level['name']] = GeometryCache(arrays, cache.properties, cache.sources)
+        if verbose:
+            print(f"   - {level['name']}: 좌표 {len(arrays['coords']):,}개 "
+                  f"(원본 대비 {len(arrays['coords']) / len(cache.coords):.1%})")
+    return lod
+
+
+def load_geometry_lod(geo_cache=None, levels=None, cache_dir=LOD_CACHE_DIR, verbose=True):
+    """
+    LOD 단계 로드 (원본 GeoJSON이나 단계 설정이 바뀌었으면 재생성)
+    Returns:
+        dict: 단계 이름 → GeometryCache (LOD_LEVELS 순서, 거친 단계부터)
+    """
+    if geo_cache is None:
+        geo_cache = load_geometry_cache(verbose=verbose)
+    if levels is None:
+        levels = LOD_LEVELS
+
+    manifest = {'version': LOD_VERSION, 'levels': levels, 'sources': geo_cache.sources}
+    key = hashlib.md5(json.dumps(manifest, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:12]
+    cache_path = os.path.join(cache_dir, key)
+    manifest_path = os.path.join(cache_path, 'manifest.json')
+
+    if os.path.exists(manifest_path):
+        if verbose:
+            print(f"⚡ 지오메트리 LOD 캐시 사용: {cache_path}")
+        return {
+            level['name']: GeometryCache(
+                {name: np.load(os.path.join(cache_path, level['name'], f'{name}.npy'), mmap_mode='r')
+                 for name in _ARRAY_NAMES},
+                geo_cache.properties, geo_cache.sources)
+            for level in levels
+        }
+
+    lod = build_lod(geo_cache, levels, verbose=verbose)
+    for name, level_cache in lod.items():
+        level_path = os.path.join(cache_path, name)
+        os.makedirs(level_path, exist_ok=True)
+        for array_name in _ARRAY_NAMES:
+            np.save(os.path.join(level_path, f'{array_name}.npy'), getattr(level_cache, array_name))
+    # 매니페스트는 마지막에 기록 (중간에 실패하면 다음 실행에서 재생성)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return lod
+
+
+# 줌 변경 시 GeoJson/TopoJson 레이어의 지오메트리를 해당 단계로 교체하는 스크립트
+# 세밀한 단계는 TopoJSON으로 <script type="application/json">에 담아 두고 처음 필요할 때 파싱
+LOD_SWAP_SCRIPT = """
+{% macro script(this, kwargs) %}
+(function() {
+    const geoLayer = {{ this.geojson_name }};
+    const mapObj = {{ this.map_name }};
+    const levels = {{ this.levels }};
+    const baseFeatures = geoLayer.getLayers().map(layer => layer.feature);
+    const geometries = [baseFeatures.map(feature => feature.geometry)];
+    let stored = null;
+    let current = 0;
+
+    function levelFor(zoom) {
+        let index = 0;
+        levels.forEach(function(level, i) { if (zoom >= level.min_zoom) index = i; });
+        return index;
+    }
+
+    function load(index) {
+        if (!geometries[index]) {
+            if (stored === null) stored = JSON.parse(document.getElementById('{{ this.data_id }}').textContent);
+            const topology = stored[levels[index].name];
+            const object = topology.objects[Object.keys(topology.objects)[0]];
+            geometries[index] = topojson.feature(topology, object).features.map(feature => feature.geometry);
+        }
+        return geometries[index];
+    }
+
+    function swap() {
+        const index = levelFor(mapObj.getZoom());
+        if (index === current) return;
+        const level = load(index);
+        geoLayer.clearLayers();
+        geoLayer.addData(baseFeatures.map((feature, i) => ({
+            type: 'Feature', id: feature.id, properties: feature.properties, geometry: level[i]
+        })));
+        // folium.TopoJson 레이어는 스타일을 properties.style로 전달
+        geoLayer.eachLayer(function(layer) {
+            if (layer.feature.properties.style) layer.setStyle(layer.feature.properties.style);
+        });
+        current = index;
+        geoLayer.fire('lodchange', {level: levels[index].name});
+    }
+
+    mapObj.on('zoomend', swap);
+    swap();
+})();
+{% endmacro %}
+"""
+
+
+def add_lod_swap(m, geo_layer, lod):
+    """
+    geo_layer(가장 거친 단계로 만든 folium.GeoJson/TopoJson)에 줌별 지오메트리 교체 추가
+    교체 후 'lodchange' 이벤트 발생 (setStyle로 스타일을 바꾸는 지도는 이 이벤트에서 다시 적용)
+    Args:
+        m (folium.Map): 지도
+        geo_layer (folium.GeoJson | folium.TopoJson): 지도에 추가된 행정동 레이어
+        lod (dict): 단계 이름 → TopoJSON (topojson_export.load_lod_topojson 결과)
+    """
+    levels = [level for level in LOD_LEVELS if level['name'] in lod]
+    data_id = f"{geo_layer.get_name()}_lod"
+    finer = {level['name']: lod[level['name']] for level in levels[1:]}
+    m.get_root().html.add_child(Element(
+        f'<script type="application/json" id="{data_id}">{json.dumps(finer, separators=(",", ":"))}</script>'
+    ))
+    # 세밀한 단계 디코딩용 topojson-client (folium.TopoJson과 같은 라이브러리, 같은 이름이면 한 번만 포함)
+    m.get_root().header.add_child(JavascriptLink(TopoJson.default_js[0][1]), name=TopoJson.default_js[0][0])
+
+    macro = MacroElement()
+    macro._template = Template(LOD_SWAP_SCRIPT)
+    macro.geojson_name = geo_layer.get_name()
+    macro.map_name = m.get_name()
+    macro.levels = json.dumps([{'name': level['name'], 'min_zoom': level['min_zoom']} for level in levels])
+    macro.data_id = data_id
+    m.add_child(macro)
+
+
+def main():
+    """LOD 생성 후 단계별 좌표 수, GeoJSON 크기, 공유 경계 일치 여부 출력"""
+    import time
+
+    cache = load_geometry_cache(verbose=False)
+    start = time.time()
+    lod = build_lod(cache)
+    print(f"⏱️ LOD 생성: {time.time() - start:.1f}초")
+
+    full_size = len(json.dumps([cache.geometry(i) for i in range(len(cache))], separators=(',', ':')))
+    print(f"📦 원본 지오메트리 JSON: {full_size / 1e6:.1f}MB")
+    for name, level_cache in lod.items():
+        size = len(json.dumps([level_cache.geometry(i) for i in range(len(level_cache))], separators=(',', ':')))
+        print(f"   - {name}: {size / 1e6:.2f}MB ({size / full_size:.1%})")
+
+    # 공유 경계 확인: 단계별로 각 무방향 간선을 쓰는 링이 1개(외곽) 또는 2개(공유)인지
+    for name, level_cache in lod.items():
+        coords = np.asarray(level_cache.coords)
+        ring_offsets = np.asarray(level_cache.ring_offsets)
+        ring_ids = np.repeat(np.arange(len(ring_offsets) - 1), np.diff(ring_offsets))
+        same_ring = ring_ids[1:] == ring_ids[:-1]
+        a, b = coords[:-1][same_ring], coords[1:][same_ring]
+        swap = (a[:, 0] > b[:, 0]) | ((a[:, 0] == b[:, 0]) & (a[:, 1] > b[:, 1]))
+        edges = np.where(swap[:, None], np.hstack([b, a]), np.hstack([a, b]))
+        counts = np.unique(edges, axis=0, return_counts=True)[1]
+        print(f"   - {name}: 간선 {len(counts):,}개 (공유 {int((counts == 2).sum()):,}개), "
+              f"3개 이상 링이 공유하는 간선 {int((counts > 2).sum())}개")
+    return lod
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+취약지수 등급 계산
+주거취약/수도인프라/사회취약/강수량/통합 지수의 구간 경계와 라벨을 한곳에 모아
+np.digitize로 컬럼(배열) 전체를 한 번에 등급화
+"""
+
+import numpy as np
+import pandas as pd
+
+GRADE_LABELS = ['매우 낮음', '낮음', '보통', '높음', '매우 높음']
+
+# 지수별 등급 구간 (bins[i-1] 이상 bins[i] 미만 → i등급, 마지막 경계 이상은 최고 등급)
+GRADE_SCALES = {
+    # 70/50/30/10 기준으로 5등급
+    '주거취약': {'bins': [0, 10, 30, 50, 70, 100], 'labels': GRADE_LABELS},
+    # 80/60/40 기준으로 4등급
+    '수도인프라': {'bins': [0, 40, 60, 80, 100], 'labels': GRADE_LABELS[:4]},
+    # 25/50/75 기준으로 4등급
+    '사회취약': {'bins': [0, 25, 50, 75, 100], 'labels': GRADE_LABELS[:4]},
+    # 30/60/80 기준으로 4등급
+    '강수량': {'bins': [0, 30, 60, 80, 100], 'labels': GRADE_LABELS[:4]},
+    # 85/70/50/30 기준으로 5등급
+    '통합': {'bins': [0, 30, 50, 70, 85, 100], 'labels': GRADE_LABELS}
+}
+
+
+def grade_values(values, bins):
+    """
+    값 → 등급 번호 (1부터 시작)
+    결측값은 1등급, 첫 경계 미만은 1등급, 마지막 구간 경계 이상은 len(bins) - 1등급
+    Args:
+        values: 스칼라, 리스트, np.ndarray 또는 pd.Series
+        bins (list): 등급 구간 경계
+    Returns:
+        입력이 pd.Series면 같은 인덱스의 Series, 아니면 np.ndarray (int64)
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    grades = np.digitize(arr, np.asarray(bins[1:-1], dtype=np.float64)).astype(np.int64) + 1
+    grades[np.isnan(arr)] = 1
+    if isinstance(values, pd.Series):
+        return pd.Series(grades, index=values.index, name=values.name)
+    return grades
+
+
+def grade_labels(grades, labels=GRADE_LABELS, default='보통'):
+    """
+    등급 번호 → 라벨 (범주형)
+    labels 범위를 벗어난 등급은 default
+    Returns:
+        입력이 pd.Series면 category Series, 아니면 pd.Categorical
+    """
+    codes = np.asarray(grades, dtype=np.int64)
+    categories = list(dict.fromkeys(list(labels) + [default]))
+    lookup = np.full(len(labels) + 2, categories.index(default), dtype=np.int8)
+    lookup[1:len(labels) + 1] = np.arange(len(labels))
+    # 범위를 벗어난 등급은 맨 끝 칸(default)으로 보냄
+    positions = np.where((codes >= 1) & (codes <= len(labels)), codes, len(labels) + 1)
+    labeled = pd.Categorical.from_codes(lookup[positions], categories=categories)
+    if isinstance(grades, pd.Series):
+        return pd.Series(labeled, index=grades.index)
+    return labeled
+
+
+def assign_grades(values, scale):
+    """
+    지수 값 → (등급 번호, 등급 라벨)
+    Args:
+        values: 지수 컬럼 또는 배열
+        scale (str): GRADE_SCALES의 지수 이름 ('주거취약', '수도인프라', '사회취약', '강수량', '통합')
+    """
+    config = GRADE_SCALES[scale]
+    grades = grade_values(values, config['bins'])
+    return grades, grade_labels(grades, config['labels'])
+
+
+def _legacy_calculate_grade(value, bins):
+    """기존 create_fixed_integrated_map.calculate_grade (비교용)"""
+    if pd.isna(value):
+        return 1
+    for i in range(1, len(bins)):
+        if value < bins[i]:
+            return i
+    return len(bins) - 1
+
+
+def _legacy_grade_label(grade, labels):
+    """기존 create_fixed_integrated_map.get_grade_label (비교용)"""
+    return dict(enumerate(labels, start=1)).get(grade, "보통")
+
+
+def main(scale_factor=100, seed=42):
+    """
+    읍면동 테이블을 scale_factor배로 늘린 합성 데이터에서
+    기존 apply 방식과 결과를 비교하고 실행 시간 측정
+    """
+    import time
+
+    social_data = pd.read_csv('data/processed/사회취약지수표.csv', encoding='utf-8-sig')
+    n_rows = len(social_data) * scale_factor
+    rng = np.random.default_rng(seed)
+    table = pd.DataFrame({scale: rng.uniform(-5, 105, n_rows) for scale in GRADE_SCALES})
+    # 결측값과 구간 경계값도 포함
+    for scale, config in GRADE_SCALES.items():
+        table.loc[rng.choice(n_rows, n_rows // 100, replace=False), scale] = np.nan
+        table.loc[rng.choice(n_rows, n_rows // 100, replace=False), scale] = rng.choice(config['bins'], n_rows // 100)
+    print(f"📊 합성 읍면동 테이블: {n_rows:,}행 × {len(GRADE_SCALES)}개 지수 (원본 {len(social_data):,}행 × {scale_factor})")
+
+    start = time.time()
+    legacy = {}
+    for scale, config in GRADE_SCALES.items():
+        grades = table[scale].apply(lambda x: _legacy_calculate_grade(x, config['bins']))
+        legacy[scale] = (grades, grades.apply(lambda x: _legacy_grade_label(x, config['labels'])))
+    legacy_time = time.time() - start
+
+    start = time.time()
+    vectorized = {scale: assign_grades(table[scale], scale) for scale in GRADE_SCALES}
+    vectorized_time = time.time() - start
+
+    mismatches = 0
+    for scale in GRADE_SCALES:
+        old_grades, old_labels = legacy[scale]
+        new_grades, new_labels = vectorized[scale]
+        mismatches += int((old_grades != new_grades).sum())
+        mismatches += int((old_labels != new_labels.astype(str)).sum())
+
+    print(f"기존 apply: {legacy_time:.2f}초, np.digitize: {vectorized_time:.3f}초 "
+          f"({legacy_time / max(vectorized_time, 1e-9):.0f}배)")
+    print(f"불일치 {mismatches}개")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    main()
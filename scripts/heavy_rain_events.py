@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+호우특보 이벤트 테이블
+heavy_rain/호우재난_*.csv는 특보 하나를 두 행(발생시간 행 + 지점 행)으로 저장하므로,
+한 번의 순차 읽기로 두 행을 짝지어 이벤트 단위로 만들고
+타입이 지정된 이벤트 테이블(Parquet)로 저장하여 지점/계절/연도별 집계에 사용
+"""
+
+import csv
+import json
+import os
+import re
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from csv_ingest import read_csv, sniff_encoding
+from geo_cache import file_fingerprint
+
+ALERT_SOURCE = 'data/raw/heavy_rain/호우재난_2.csv'
+CACHE_DIR = 'data/cache/heavy_rain'
+SUMMER_TABLE_PATH = 'data/processed/20~24_여름.csv'
+PERCENTILE_TABLE_PATH = 'data/processed/여름_강수량_호우_백분위.csv'
+
+ALERT_KINDS = ['호우주의보', '호우경보']
+SEASONS = {
+    12: '겨울', 1: '겨울', 2: '겨울',
+    3: '봄', 4: '봄', 5: '봄',
+    6: '여름', 7: '여름', 8: '여름',
+    9: '가을', 10: '가을', 11: '가을'
+}
+SEASON_ORDER = ['봄', '여름', '가을', '겨울']
+
+# 특보 지점 → 강수량 테이블 지점 (수작업 집계와 동일하게 북춘천/북강릉으로 합산)
+STATION_ALIASES = {
+    101: ('북춘천', 93),
+    105: ('북강릉', 104)
+}
+
+STATION_PATTERN = re.compile(r'^(?P<name>.+?)\((?P<code>\d+)\)$')
+
+EVENT_SCHEMA = pa.schema([
+    ('재난', pa.dictionary(pa.int8(), pa.string())),
+    ('발생시간', pa.timestamp('s')),
+    ('연도', pa.int16()),
+    ('월', pa.int8()),
+    ('계절', pa.dictionary(pa.int8(), pa.string())),
+    ('지점번호', pa.int16()),
+    ('지점명', pa.dictionary(pa.int16(), pa.string())),
+    ('지점정보', pa.dictionary(pa.int16(), pa.string()))
+])
+
+
+def normalize_station(text, aliases=STATION_ALIASES):
+    """
+    지점 문자열 정규화
+    '제주(184)', ' 제주 ( 184 ) ', '세종(예)(239)' → ('제주', 184), ('세종', 239)
+    '기타'나 빈 값 등 지점번호가 없으면 None
+    aliases: 지점번호 → 합산할 (지점명, 지점번호) (강수량 지점처럼 합산하지 않으면 빈 dict)
+    """
+    text = re.sub(r'\s+', '', unicodedata.normalize('NFKC', text or ''))
+    match = STATION_PATTERN.match(text)
+    if not match:
+        return None
+    # 지점명 안의 부가 표기 제거 (예: 세종(예) → 세종)
+    name = re.sub(r'\(.*?\)', '', match.group('name'))
+    code = int(match.group('code'))
+    return aliases.get(code, (name, code))
+
+
+def iter_alert_events(path=ALERT_SOURCE, encoding=None):
+    """
+    호우특보 CSV를 한 행씩 읽으며 (재난, 발생시간, 지점명, 지점번호) 이벤트 생성
+    - 두 행 형식: 발생시간 행 다음의 발생시간이 빈 행에서 지점을 읽음
+    - 한 행 형식(호우재난_4.csv): 발생시간 행에 지점이 있으면 바로 이벤트
+    지점이 '기타'인 특보는 건너뜀 (인코딩 기본값: csv_ingest.sniff_encoding 판별 결과)
+    """
+    if encoding is None:
+        encoding = sniff_encoding(path)
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        reader = csv.reader(f)
+        next(reader)
+        pending = None
+        for line_no, row in enumerate(reader, start=2):
+            if not row:
+                continue
+            kind, occurred, place = (row + ['', ''])[:3]
+            if occurred:
+                if pending is not None:
+                    raise ValueError(f"{path}:{pending[2]}: 지점 행 없이 다음 특보가 시작됨")
+                station = normalize_station(place)
+                if station is not None:
+                    yield kind, occurred, station[0], station[1]
+                else:
+                    pending = (kind, occurred, line_no)
+            else:
+                if pending is None:
+                    raise ValueError(f"{path}:{line_no}: 발생시간 행 없이 지점 행이 나타남")
+                if pending[0] != kind:
+                    raise ValueError(f"{path}:{line_no}: 짝 행의 재난 구분이 다름 ({pending[0]} / {kind})")
+                station = normalize_station(place)
+                if station is not None:
+                    yield pending[0], pending[1], station[0], station[1]
+                pending = None
+        if pending is not None:
+            raise ValueError(f"{path}:{pending[2]}: 마지막 특보의 지점 행이 없음")
+
+
+def _event_batch(events):
+    """이벤트 튜플 묶음 → Arrow RecordBatch"""
+    kinds, occurred, names, codes = zip(*events)
+    occurred = pd.to_datetime(pd.Series(occurred), format='%Y-%m-%d %H:%M')
+    months = occurred.dt.month.to_numpy()
+    codes = np.asarray(codes, dtype=np.int16)
+    labels = [f"{name}({code})" for name, code in zip(names, codes)]
+    return pa.RecordBatch.from_arrays([
+        pa.array(kinds).dictionary_encode().cast(EVENT_SCHEMA.field('재난').type),
+        pa.array(occurred.to_numpy().astype('datetime64[s]')),
+        pa.array(occurred.dt.year.to_numpy().astype(np.int16)),
+        pa.array(months.astype(np.int8)),
+        pa.array([SEASONS[m] for m in months]).dictionary_encode().cast(EVENT_SCHEMA.field('계절').type),
+        pa.array(codes),
+        pa.array(names).dictionary_encode().cast(EVENT_SCHEMA.field('지점명').type),
+        pa.array(labels).dictionary_encode().cast(EVENT_SCHEMA.field('지점정보').type)
+    ], schema=EVENT_SCHEMA)
+
+
+def write_event_store(source=ALERT_SOURCE, out_path=None, chunk_size=50000):
+    """
+    특보 CSV를 chunk_size 이벤트 단위로 Parquet에 기록 (원본 크기와 무관하게 일정한 메모리 사용)
+    Returns:
+        int: 기록한 이벤트 수
+    """
+    if out_path is None:
+        out_path = os.path.join(CACHE_DIR, 'events.parquet')
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+    n_events = 0
+    buffer = []
+    with pq.ParquetWriter(out_path, EVENT_SCHEMA) as writer:
+        for event in iter_alert_events(source):
+            buffer.append(event)
+            if len(buffer) >= chunk_size:
+                writer.write_batch(_event_batch(buffer))
+                n_events += len(buffer)
+                buffer = []
+        if buffer:
+            writer.write_batch(_event_batch(buffer))
+            n_events += len(buffer)
+    return n_events
+
+
+def load_alert_events(source=ALERT_SOURCE, cache_dir=CACHE_DIR, verbose=True):
+    """
+    호우특보 이벤트 테이블 로드 (원본 CSV가 바뀌었으면 재생성)
+    Returns:
+        pd.DataFrame: 재난, 발생시간, 연도, 월, 계절, 지점번호, 지점명, 지점정보
+    """
+    table_path = os.path.join(cache_dir, 'events.parquet')
+    manifest_path = os.path.join(cache_dir, 'events.json')
+    fingerprint = {'source': file_fingerprint(source)}
+
+    fresh = False
+    if os.path.exists(manifest_path) and os.path.exists(table_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            fresh = json.load(f) == fingerprint
+
+    if fresh:
+        if verbose:
+            print(f"⚡ 호우특보 이벤트 캐시 사용: {table_path}")
+    else:
+        n_events = write_event_store(source, table_path)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(fingerprint, f, ensure_ascii=False, indent=2)
+        if verbose:
+            print(f"✅ 호우특보 이벤트 테이블 생성: {n_events}건 → {table_path}")
+    return pd.read_parquet(table_path)
+
+
+def count_alerts(events, by=('지점정보',), years=None, seasons=None, distinct_days=True):
+    """
+    특보 횟수 집계
+    Args:
+        events (pd.DataFrame): load_alert_events 결과
+        by (tuple): 집계 기준 컬럼 (예: ('지점정보',), ('지점정보', '연도'), ('계절',))
+        years (list): 포함할 연도 (None이면 전체)
+        seasons (list): 포함할 계절 (None이면 전체)
+        distinct_days (bool): 같은 날 같은 종류의 특보는 1회로 계산 (수작업 집계 기준)
+    Returns:
+        pd.DataFrame: by 기준 행, 호우주의보/호우경보/호우특보(합계) 컬럼
+    """
+    mask = np.ones(len(events), dtype=bool)
+    if years is not None:
+        mask &= events['연도'].isin(years).to_numpy()
+    if seasons is not None:
+        mask &= events['계절'].isin(seasons).to_numpy()
+    subset = events[mask]
+
+    keys = list(by) + ['재난']
+    if distinct_days:
+        subset = subset.assign(발생일=subset['발생시간'].dt.normalize())
+        subset = subset.drop_duplicates(subset=keys + ['발생일'])
+
+    counts = subset.groupby(keys, observed=True).size().unstack('재난', fill_value=0)
+    counts = counts.reindex(columns=ALERT_KINDS, fill_value=0)
+    counts.columns = list(counts.columns)
+    counts['호우특보'] = counts[ALERT_KINDS].sum(axis=1)
+    return counts
+
+
+def update_alert_columns(summer_table, events, years=range(2020, 2025)):
+    """20~24_여름 테이블의 호우주의보/호우경보/호우특보 컬럼을 이벤트 테이블로 다시 계산"""
+    counts = count_alerts(events, years=list(years))
+    table = summer_table.copy()
+    for col in counts.columns:
+        table[col] = table['지점정보'].map(counts[col]).fillna(0).astype(int)
+    return table
+
+
+def build_percentile_table(summer_table, rain_weight=0.5, alert_weight=0.5, period='2020~2024'):
+    """
+    여름_강수량_호우_백분위 테이블 생성 (period: 기간 컬럼 이름의 연도 범위)
+    - 강수량_정규화: 5년 총 강수량 최소-최대 정규화
+    - 호우_정규화: 지점 호우특보 수 / 전체 호우특보 수
+    - 백분위: 통합점수 순위 / 지점 수 × 100 (통합점수 내림차순 정렬, 마지막 행은 합계)
+    """
+    year_cols = [c for c in summer_table.columns if re.fullmatch(r'\d{4}강수량\(mm\)', c)]
+    total_rain = summer_table[f'{period}강수량 총합 (mm)']
+    alerts = summer_table['호우특보']
+
+    table = summer_table[['지점정보'] + year_cols].copy()
+    table[f'{period}강수량(mm)'] = total_rain
+    table[f'{period} 호우주의보 개수'] = alerts
+    table['강수량_정규화'] = (total_rain - total_rain.min()) / (total_rain.max() - total_rain.min())
+    table['호우_정규화'] = alerts / alerts.sum()
+    table['통합점수'] = rain_weight * table['강수량_정규화'] + alert_weight * table['호우_정규화']
+    table['백분위(강수량 0.5, 호우 * 0.5)'] = table['통합점수'].rank(pct=True) * 100
+    table = table.sort_values('통합점수', ascending=False, kind='stable').reset_index(drop=True)
+
+    total_row = {col: np.nan for col in table.columns}
+    total_row[f'{period} 호우주의보 개수'] = alerts.sum()
+    total_row['호우_정규화'] = table['호우_정규화'].sum()
+    return pd.concat([table, pd.DataFrame([total_row])], ignore_index=True)
+
+
+def _format_number(x):
+    """기존 CSV(엑셀 저장)와 같은 숫자 표기 (유효 자릿수 10자리, 끝의 0 제거)"""
+    if pd.isna(x):
+        return ''
+    if float(x).is_integer():
+        return str(int(x))
+    decimals = max(10 - len(str(int(abs(x)))), 0)
+    return f"{x:.{decimals}f}".rstrip('0').rstrip('.')
+
+
+def write_table(table, path):
+    """기존 처리 데이터와 같은 형식(cp949)으로 저장"""
+    formatted = table.copy()
+    for col in formatted.columns:
+        if pd.api.types.is_numeric_dtype(formatted[col]):
+            formatted[col] = formatted[col].map(_format_number)
+    formatted.to_csv(path, index=False, encoding='cp949')
+
+
+def main():
+    """이벤트 테이블을 만들고 20~24_여름 / 여름_강수량_호우_백분위의 호우 컬럼 재생성"""
+    start = time.time()
+    events = load_alert_events()
+    print(f"   이벤트 {len(events)}건, 지점 {events['지점정보'].nunique()}개 ({time.time() - start:.2f}초)")
+
+    summer_table = read_csv(SUMMER_TABLE_PATH, 'summer_rainfall')
+    updated = update_alert_columns(summer_table, events)
+    changed = (updated[['호우주의보', '호우경보', '호우특보']] != summer_table[['호우주의보', '호우경보', '호우특보']]).any(axis=1)
+    print(f"📊 기존 수작업 집계와 다른 지점: {changed.sum()}개")
+    for _, row in summer_table[changed].iterrows():
+        new = updated.loc[row.name]
+        print(f"   - {row['지점정보']}: 주의보 {row['호우주의보']}→{new['호우주의보']}, "
+              f"경보 {row['호우경보']}→{new['호우경보']}, 특보 {row['호우특보']}→{new['호우특보']}")
+
+    percentile_table = build_percentile_table(updated)
+    write_table(updated, SUMMER_TABLE_PATH)
+    write_table(percentile_table, PERCENTILE_TABLE_PATH)
+    print(f"✅ 재생성 완료 ({time.time() - start:.2f}초): {SUMMER_TABLE_PATH}, {PERCENTILE_TABLE_PATH}")
+
+    print("\n📅 계절별 호우특보 (2020~2024, 일 단위)")
+    print(count_alerts(events, by=('계절',)).reindex(SEASON_ORDER).fillna(0).astype(int).to_string())
+    print("\n📅 연도별 호우특보 (일 단위)")
+    print(count_alerts(events, by=('연도',)).to_string())
+
+
+if __name__ == "__main__":
+    main()
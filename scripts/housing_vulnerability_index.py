@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+주거취약지수 계산
+시도별 자연재해 위험지구 수와 노후주택비율(processed_data.csv)을 가중 합산한 뒤
+0~100으로 정규화하여 results/yunjin/housing_vulnerability_analysis.csv 생성
+"""
+
+from csv_ingest import read_csv
+from grading import grade_labels, grade_values
+
+DATA_PATH = 'data/processed/processed_data.csv'
+OUTPUT_PATH = 'results/yunjin/housing_vulnerability_analysis.csv'
+
+# 기본 가중치 (전체 위험지구 수, 가등급 위험지구 수, 노후주택비율)
+HOUSING_WEIGHTS = {
+    'total_risk': 0.4,
+    'high_risk': 0.3,
+    'aged_housing_ratio': 0.3
+}
+
+# 취약등급 (30/50/70 기준으로 4등급)
+HOUSING_LEVEL_BINS = [0, 30, 50, 70, 100]
+HOUSING_LEVEL_LABELS = ['낮음', '보통', '높음', '매우 높음']
+
+
+def calculate_housing_vulnerability(df, weights=None):
+    """
+    주거취약지수 계산
+    Args:
+        df (pd.DataFrame): processed_data.csv (region, total_risk, high_risk, aged_housing_ratio, ...)
+        weights (dict): 컬럼별 가중치 (기본값: HOUSING_WEIGHTS)
+    Returns:
+        pd.DataFrame: region, vulnerability_normalized, vulnerability_level, total_risk, high_risk,
+                      aged_housing_ratio (취약지수 내림차순)
+    """
+    if weights is None:
+        weights = HOUSING_WEIGHTS
+
+    score = sum(df[col] * weight for col, weight in weights.items())
+    result = df[['region']].copy()
+    result['vulnerability_normalized'] = (score - score.min()) / (score.max() - score.min()) * 100
+    result['vulnerability_level'] = grade_labels(
+        grade_values(result['vulnerability_normalized'], HOUSING_LEVEL_BINS), HOUSING_LEVEL_LABELS
+    ).astype(str)
+    for col in ['total_risk', 'high_risk', 'aged_housing_ratio']:
+        result[col] = df[col]
+    return result.sort_values('vulnerability_normalized', ascending=False).reset_index(drop=True)
+
+
+def main(data_path=DATA_PATH, output_path=OUTPUT_PATH, weights=None):
+    """processed_data.csv → 주거취약지수 결과 저장"""
+    print("=== 주거취약지수 계산 ===")
+    df = read_csv(data_path)
+    result = calculate_housing_vulnerability(df, weights)
+    result.to_csv(output_path, index=False, encoding='utf-8-sig')
+    print(f"✅ 주거취약지수 저장: {output_path} ({len(result)}개 시도)")
+    print(result[['region', 'vulnerability_normalized', 'vulnerability_level']].head().to_string(index=False))
+    return result
+
+
+if __name__ == "__main__":
+    main()
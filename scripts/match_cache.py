@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+행정동 매칭 결과 캐시
+GeoJSON 행정동 (sidonm, sggnm, adm_nm)별로 원본 테이블의 어느 행에 어떤 단계로 매칭되었는지를
+입력 지문(원본 테이블 키 컬럼 + 매칭 코드 해시)과 함께 data/cache/match/에 저장
+- 지문이 같으면 저장된 결과를 재사용하고 새로 나타난 이름만 매칭
+- 원본 테이블이나 매칭 코드가 바뀌면 해당 데이터셋 결과 전체를 다시 매칭
+"""
+
+import hashlib
+import inspect
+import json
+import marshal
+import os
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = 'data/cache/match'
+CACHE_VERSION = 1
+
+KEY_COLUMNS = ['sidonm', 'sggnm', 'adm_nm']
+NO_MATCH = -1
+
+
+def match_fingerprint(tables=(), code=(), extra=None):
+    """
+    매칭 입력 지문
+    Args:
+        tables: 매칭에 쓰는 원본 테이블(DataFrame, 키 컬럼만 넘기는 것을 권장) 또는 키 목록
+        code: 매칭 코드 (파일 경로, 모듈 또는 함수 → 소스 해시)
+        extra: 그 밖의 설정값 (JSON 직렬화 가능)
+    Returns:
+        (str 지문, dict 구성 요소)
+    """
+    components = {'version': CACHE_VERSION, 'tables': [], 'code': {}, 'extra': extra}
+    for table in tables:
+        if isinstance(table, pd.DataFrame):
+            digest = hashlib.sha1(pd.util.hash_pandas_object(table, index=False).to_numpy().tobytes())
+            digest.update('\x1f'.join(map(str, table.columns)).encode('utf-8'))
+        else:
+            digest = hashlib.sha1('\x1e'.join(map(str, table)).encode('utf-8'))
+        components['tables'].append(digest.hexdigest())
+    for item in code:
+        if isinstance(item, str):
+            with open(item, 'r', encoding='utf-8') as f:
+                name, source = item, f.read()
+        else:
+            name = getattr(item, '__qualname__', item.__name__)
+            try:
+                source = inspect.getsource(item)
+            except OSError:
+                # 소스 파일이 없는 함수 (exec로 정의 등) → 바이트코드 해시
+                source = marshal.dumps(item.__code__).hex()
+        components['code'][name] = hashlib.sha1(source.encode('utf-8')).hexdigest()
+    fingerprint = hashlib.sha1(json.dumps(components, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    return fingerprint.hexdigest(), components
+
+
+class MatchCache:
+    """
+    데이터셋 하나의 행정동 매칭 결과
+    - 행: sidonm, sggnm, adm_nm, position(원본 행 위치, 실패 -1), stage(매칭 단계), source(매칭된 원본 행 이름), fingerprint
+    - 데이터셋 이름이 같은 스크립트끼리 결과를 공유 (지문이 다르면 재사용하지 않음)
+    """
+
+    def __init__(self, dataset, fingerprint, components=None, cache_dir=CACHE_DIR):
+        self.dataset = dataset
+        self.fingerprint = fingerprint
+        self.components = components
+        self.path = os.path.join(cache_dir, f'{dataset}.parquet')
+        self.manifest_path = os.path.join(cache_dir, f'{dataset}.json')
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._dirty = False
+
+        if os.path.exists(self.path):
+            table = pd.read_parquet(self.path)
+            valid = table['fingerprint'] == fingerprint
+            self.stale = int((~valid).sum())
+            self._dirty = self.stale > 0
+            table = table[valid]
+            stages = table['stage'].astype(object).where(table['stage'].notna(), None)
+            for sidonm, sggnm, adm_nm, position, stage, source in zip(
+                    table['sidonm'], table['sggnm'], table['adm_nm'], table['position'], stages, table['source']):
+                self.entries[(sidonm, sggnm, adm_nm)] = (int(position), stage, source)
+
+    def get(self, key):
+        """(sidonm, sggnm, adm_nm) → (position, stage, source) 또는 None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key, position, stage, source=None):
+        self.entries[key] = (int(position), stage, source)
+        self._dirty = True
+
+    def resolve_batch(self, keys, resolve):
+        """
+        행정동 일괄 매칭 (캐시에 없는 키만 resolve 호출)
+        Args:
+            keys (pd.DataFrame): KEY_COLUMNS 컬럼
+            resolve: 미매칭 키 DataFrame(KEY_COLUMNS) → (행 위치 배열, 매칭 단계 배열, 원본 행 이름 배열)
+        Returns:
+            (np.ndarray 행 위치, np.ndarray 매칭 단계) - keys와 같은 순서
+        """
+        tuples = list(zip(*(keys[c].tolist() for c in KEY_COLUMNS)))
+        unique = list(dict.fromkeys(tuples))
+        missing = [key for key in unique if key not in self.entries]
+        self.hits += len(unique) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            positions, stages, sources = resolve(pd.DataFrame(missing, columns=KEY_COLUMNS))
+            for key, position, stage, source in zip(missing, positions, stages, sources):
+                self.put(key, position, stage, source)
+
+        positions = np.fromiter((self.entries[key][0] for key in tuples), dtype=np.int64, count=len(tuples))
+        stages = np.empty(len(tuples), dtype=object)
+        stages[:] = [self.entries[key][1] for key in tuples]
+        return positions, stages
+
+    def save(self):
+        """새 결과가 있거나 오래된 결과를 버렸으면 저장"""
+        if not self._dirty:
+            return
+        rows = [key + entry for key, entry in self.entries.items()]
+        table = pd.DataFrame(rows, columns=KEY_COLUMNS + ['position', 'stage', 'source'])
+        table['position'] = table['position'].astype(np.int64)
+        table['source'] = table['source'].astype(object).where(table['source'].notna(), None)
+        table['fingerprint'] = self.fingerprint
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        table.to_parquet(self.path, index=False)
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({'dataset': self.dataset, 'fingerprint': self.fingerprint,
+                       'components': self.components, 'entries': len(table)}, f, ensure_ascii=False, indent=2)
+        self._dirty = False
+
+    def summary(self):
+        return (f"매칭 캐시 '{self.dataset}': 재사용 {self.hits:,}개, 신규 매칭 {self.misses:,}개"
+                + (f", 오래된 결과 {self.stale:,}개 폐기" if self.stale else ""))
+
+
+def main():
+    """수도인프라지수 매칭을 캐시 없이 / 캐시로 두 번 실행하여 결과와 시간 비교"""
+    import tempfile
+    import time
+
+    import region_resolver
+    from geo_cache import load_geometry_cache
+    from region_resolver import SewerRegionResolver
+
+    sewer_data = pd.read_csv('results/yunjin/sewer_infrastructure_analysis_summary.csv')
+    sewer_data_unique = sewer_data.drop_duplicates(subset=['시도', '행정구역명']).copy()
+    sewer_data_unique['시도'] = sewer_data_unique['시도'].astype(str)
+    sewer_data_unique['행정구역명'] = sewer_data_unique['행정구역명'].astype(str)
+
+    cache = load_geometry_cache(verbose=False)
+    keys = pd.DataFrame(cache.properties).reindex(columns=KEY_COLUMNS).fillna('').astype(str)
+
+    def resolve(frame):
+        resolver = SewerRegionResolver(sewer_data_unique)
+        # 시도명을 제외한 행정구역명 (create_fixed_integrated_map.extract_sgg_name과 동일)
+        sggnms = [' '.join(adm_nm.split()[1:]) or adm_nm for adm_nm in frame['adm_nm']]
+        positions, stages = resolver.resolve_batch(frame['sidonm'].tolist(), sggnms)
+        names = sewer_data_unique['행정구역명'].to_numpy()
+        return positions, stages, [names[p] if p != NO_MATCH else None for p in positions]
+
+    start = time.time()
+    expected, expected_stages, _ = resolve(keys)
+    plain_time = time.time() - start
+
+    fingerprint, components = match_fingerprint([sewer_data_unique[['시도', '행정구역명']]],
+                                                [region_resolver])
+    with tempfile.TemporaryDirectory() as cache_dir:
+        timings = []
+        for _ in range(2):
+            start = time.time()
+            match_cache = MatchCache('sewer_summary', fingerprint, components, cache_dir)
+            positions, stages = match_cache.resolve_batch(keys, resolve)
+            match_cache.save()
+            timings.append(time.time() - start)
+            print(f"   {match_cache.summary()}")
+
+    same = np.array_equal(positions, expected) and list(stages) == list(expected_stages)
+    print(f"캐시 없이: {plain_time:.3f}초, 첫 실행(캐시 생성): {timings[0]:.3f}초, 재실행: {timings[1]:.3f}초")
+    print(f"비교 대상 {len(keys)}개 행정동, 결과 일치: {same}")
+    return same
+
+
+if __name__ == "__main__":
+    main()
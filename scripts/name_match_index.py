@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+지도 노트북 매칭 함수(find_matching_data_ultimate)의 느슨한 매칭 색인
+create_sewer_map_visualization_notebook.py / create_housing_vulnerability_map_notebook.py가
+만드는 노트북의 6~9단계(포함 관계 → 60% 글자 일치 → 단어 → 부분 문자열)를
+mapping_dict 키 전체 선형 탐색 대신 색인 조회로 처리 (결과와 우선순위는 기존과 동일)
+- 6단계 (이름 ⊂ 키): 키 전체의 일반화 접미사 오토마톤
+- 6단계 (키 ⊂ 이름), 8·9단계: 이름의 부분 문자열 해시 조회
+- 7단계: 글자 역색인으로 키별 공통 글자 수를 한 번에 계산
+여러 키가 조건을 만족하면 기존 선형 탐색처럼 mapping_dict 삽입 순서상 첫 키를 반환
+"""
+
+import numpy as np
+
+# 7단계 유사도 기준 (공통 글자 수 >= min(이름 길이, 키 길이) * 0.6)
+SIMILARITY_RATIO = 0.6
+
+# 9단계 부분 문자열 최소 길이
+MIN_SUBSTRING = 2
+
+NO_MATCH = np.iinfo(np.int64).max
+
+# 매칭 단계 라벨 (노트북 find_matching_data_ultimate의 6~9단계)
+STAGE_CONTAINS = '포함'
+STAGE_SIMILAR = '유사도'
+STAGE_WORD = '단어'
+STAGE_SUBSTRING = '부분문자열'
+
+
+class _SuffixAutomaton:
+    """여러 문자열의 일반화 접미사 오토마톤 (상태별로 해당 부분 문자열을 포함하는 첫 문자열 순번)"""
+
+    def __init__(self, strings):
+        self.next = [{}]
+        self.link = [-1]
+        self.length = [0]
+        first = [NO_MATCH]
+        for order, text in enumerate(strings):
+            state = 0
+            for char in text:
+                state = self._extend(state, char, first)
+                if first[state] > order:
+                    first[state] = order
+        # 접미사 링크의 부모 상태 문자열은 자식 상태 문자열의 접미사 → 긴 상태부터 최소 순번 전파
+        for state in sorted(range(1, len(self.length)), key=self.length.__getitem__, reverse=True):
+            parent = self.link[state]
+            if first[state] < first[parent]:
+                first[parent] = first[state]
+        self.first = first
+
+    def _new_state(self, length, link, transitions, first):
+        self.next.append(transitions)
+        self.link.append(link)
+        self.length.append(length)
+        first.append(NO_MATCH)
+        return len(self.length) - 1
+
+    def _clone(self, source, length, first):
+        return self._new_state(length, self.link[source], dict(self.next[source]), first)
+
+    def _redirect(self, state, char, old, new):
+        while state != -1 and self.next[state].get(char) == old:
+            self.next[state][char] = new
+            state = self.link[state]
+
+    def _extend(self, last, char, first):
+        nxt, length = self.next, self.length
+        if char in nxt[last]:
+            # 같은 전이가 이미 있는 경우 (앞선 문자열과 공유하는 접두사)
+            target = nxt[last][char]
+            if length[target] == length[last] + 1:
+                return target
+            clone = self._clone(target, length[last] + 1, first)
+            self._redirect(last, char, target, clone)
+            self.link[target] = clone
+            return clone
+
+        current = self._new_state(length[last] + 1, 0, {}, first)
+        state = last
+        while state != -1 and char not in nxt[state]:
+            nxt[state][char] = current
+            state = self.link[state]
+        if state != -1:
+            target = nxt[state][char]
+            if length[state] + 1 == length[target]:
+                self.link[current] = target
+            else:
+                clone = self._clone(target, length[state] + 1, first)
+                self._redirect(state, char, target, clone)
+                self.link[target] = self.link[current] = clone
+        return current
+
+    def first_containing(self, text):
+        """text를 부분 문자열로 포함하는 첫 문자열 순번 (없으면 NO_MATCH)"""
+        state = 0
+        for char in text:
+            state = self.next[state].get(char)
+            if state is None:
+                return NO_MATCH
+        return self.first[state]
+
+
+class NameMatchIndex:
+    """
+    mapping_dict 키에 대한 느슨한 매칭 색인
+    Args:
+        mapping_dict (dict): 노트북의 create_comprehensive_mapping_dict 결과 (키 = 이름 문자열)
+    fuzzy_key(name)은 기존 6~9단계가 반환하던 키를 반환 (없으면 None)
+    """
+
+    def __init__(self, mapping_dict, similarity=SIMILARITY_RATIO, min_substring=MIN_SUBSTRING):
+        self.keys = [key for key in mapping_dict if isinstance(key, str)]
+        self.order = {key: i for i, key in enumerate(self.keys)}
+        self.similarity = similarity
+        self.min_substring = min_substring
+        self.automaton = _SuffixAutomaton(self.keys)
+
+        # 글자 → 키 순번 역색인 (키마다 서로 다른 글자만)
+        postings = {}
+        for i, key in enumerate(self.keys):
+            for char in set(key):
+                postings.setdefault(char, []).append(i)
+        self.postings = {char: np.asarray(ids, dtype=np.int64) for char, ids in postings.items()}
+        self.key_lengths = np.asarray([len(key) for key in self.keys], dtype=np.int64)
+        self._cache = {}
+
+    def _first_substring(self, name, min_len):
+        """name의 부분 문자열(min_len 글자 이상) 중 키인 것의 최소 순번"""
+        best = NO_MATCH
+        for i in range(len(name)):
+            for j in range(i + min_len, len(name) + 1):
+                pos = self.order.get(name[i:j], NO_MATCH)
+                if pos < best:
+                    best = pos
+        return best
+
+    def contains(self, name):
+        """6단계: name ⊂ 키 또는 키 ⊂ name인 첫 키 순번"""
+        return min(self.automaton.first_containing(name), self._first_substring(name, 0))
+
+    def similar(self, name):
+        """7단계: 공통 글자 수 >= min(len(name), len(키)) * similarity인 첫 키 순번"""
+        if not self.keys:
+            return NO_MATCH
+        chars = [self.postings[char] for char in set(name) if char in self.postings]
+        shared = np.bincount(np.concatenate(chars), minlength=len(self.keys)) if chars else \
+            np.zeros(len(self.keys), dtype=np.int64)
+        matched = np.flatnonzero(shared >= np.minimum(len(name), self.key_lengths) * self.similarity)
+        return int(matched[0]) if len(matched) else NO_MATCH
+
+    def word_or_substring(self, name):
+        """8단계(공백 단위 단어) → 9단계(min_substring 글자 이상, 앞쪽·짧은 것 우선) (키, 단계)"""
+        for word in name.split():
+            if word in self.order:
+                return word, STAGE_WORD
+        for i in range(len(name) - 1):
+            for j in range(i + self.min_substring, len(name) + 1):
+                if name[i:j] in self.order:
+                    return name[i:j], STAGE_SUBSTRING
+        return None, None
+
+    def fuzzy_match(self, name):
+        """6~9단계 순서로 매칭 → (키, 단계), 없으면 (None, None)"""
+        if name in self._cache:
+            return self._cache[name]
+        pos = self.contains(name)
+        if pos != NO_MATCH:
+            match = self.keys[pos], STAGE_CONTAINS
+        else:
+            pos = self.similar(name)
+            match = (self.keys[pos], STAGE_SIMILAR) if pos != NO_MATCH else self.word_or_substring(name)
+        self._cache[name] = match
+        return match
+
+    def fuzzy_key(self, name):
+        """6~9단계 순서로 매칭된 키 (없으면 None)"""
+        return self.fuzzy_match(name)[0]
+
+
+def _legacy_fuzzy_key(name, mapping_dict):
+    """기존 노트북 6~9단계 선형 탐색 (회귀 확인용)"""
+    for key in mapping_dict.keys():
+        if name in key or key in name:
+            return key
+    for key in mapping_dict.keys():
+        if len(set(name) & set(key)) >= min(len(name), len(key)) * 0.6:
+            return key
+    for word in name.split():
+        if word in mapping_dict:
+            return word
+    for i in range(len(name) - 1):
+        for j in range(i + 2, len(name) + 1):
+            if name[i:j] in mapping_dict:
+                return name[i:j]
+    return None
+
+
+def _notebook_mapping_dict(names, suffixes):
+    """노트북 create_comprehensive_mapping_dict와 같은 키 구성 (값 = 행 순번)"""
+    import re
+
+    mapping_dict = {}
+    for pos, name in enumerate(names):
+        mapping_dict[name] = pos
+        normalized = re.sub(r'[^가-힣a-zA-Z0-9]', '', name)
+        if normalized:
+            mapping_dict[normalized] = pos
+        for suffix in suffixes:
+            if name.endswith(suffix):
+                mapping_dict[name[:-len(suffix)]] = pos
+        mapping_dict[name.replace(' ', '')] = pos
+        clean_name = re.sub(r'[^가-힣]', '', name)
+        if clean_name != name:
+            mapping_dict[clean_name] = pos
+        for word in name.split():
+            if len(word) > 1:
+                mapping_dict[word] = pos
+        for i in range(len(name) - 2):
+            for j in range(i + 3, len(name) + 1):
+                mapping_dict[name[i:j]] = pos
+    return mapping_dict
+
+
+def main():
+    """두 노트북의 mapping_dict로 전체 행정동 sggnm/adm_nm을 매칭하여 기존 선형 탐색과 비교"""
+    import time
+
+    import pandas as pd
+    from geo_cache import load_geometry_cache
+
+    cache = load_geometry_cache(verbose=False)
+    queries = [str(p.get(field, '')) for p in cache.properties for field in ('sggnm', 'adm_nm')]
+    queries = [q for q in queries if q]
+
+    sewer = pd.read_csv('data/processed/sewer_infrastructure_analysis.csv')
+    housing = pd.read_csv('results/yunjin/housing_vulnerability_analysis.csv')
+    cases = {
+        '하수도 인프라 노트북': _notebook_mapping_dict(
+            sorted(sewer['행정구역명'].dropna().astype(str).unique()), ['시', '군', '구']),
+        '주거취약지수 노트북': _notebook_mapping_dict(
+            housing['region'].dropna().astype(str).tolist(), ['시', '도', '특별자치시', '광역시'])
+    }
+
+    ok = True
+    for label, mapping_dict in cases.items():
+        start = time.time()
+        legacy = [_legacy_fuzzy_key(q, mapping_dict) for q in queries]
+        legacy_time = time.time() - start
+
+        start = time.time()
+        index = NameMatchIndex(mapping_dict)
+        build_time = time.time() - start
+        start = time.time()
+        indexed = [index.fuzzy_key(q) for q in queries]
+        query_time = time.time() - start
+
+        mismatches = sum(a != b for a, b in zip(legacy, indexed))
+        ok = ok and mismatches == 0
+        print(f"📊 {label}: 키 {len(mapping_dict):,}개, 질의 {len(queries):,}개")
+        print(f"   기존 선형 탐색: {legacy_time:.2f}초, 색인 생성 {build_time:.3f}초 + 조회 {query_time:.3f}초")
+        print(f"   불일치 {mismatches}개")
+    return ok
+
+
+if __name__ == "__main__":
+    main()
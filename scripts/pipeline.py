@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+분석 파이프라인 실행기
+단계별 입력 파일/코드/파라미터의 내용 해시를 기록해 두고,
+바뀐 단계와 그 하위 단계만 다시 실행 (서로 독립인 단계는 별도 프로세스에서 병렬 실행)
+
+사용법 (프로젝트 루트에서):
+    python scripts/pipeline.py                  # 오래된 단계만 실행
+    python scripts/pipeline.py fixed_map        # 지정 단계와 그 상위 단계만
+    python scripts/pipeline.py --dry-run        # 실행할 단계만 출력
+    python scripts/pipeline.py --force sewer_index
+"""
+
+import argparse
+import ast
+import contextlib
+import glob
+import hashlib
+import json
+import os
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from housing_vulnerability_index import HOUSING_WEIGHTS
+from sewer_infrastructure_index import SEWER_WEIGHTS
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SCRIPTS_DIR)
+STATE_DIR = 'data/cache/pipeline'
+
+SEWER_PROCESSED_PATH = 'data/processed/sewer_infrastructure_processed.csv'
+SEWER_SUMMARY_PATH = 'results/yunjin/sewer_infrastructure_analysis_summary.csv'
+HOUSING_RESULT_PATH = 'results/yunjin/housing_vulnerability_analysis.csv'
+SOCIAL_DATA_PATH = 'data/processed/202506_읍면동_사회취약계층표.csv'
+SUMMER_TABLE_PATH = 'data/processed/20~24_여름.csv'
+RAINFALL_PERCENTILE_PATH = 'data/processed/여름_강수량_호우_백분위.csv'
+GEOJSON_INPUTS = ['data/raw/hangjeongdong_*.geojson']
+
+
+
+# ---------------------------
+# 단계별 실행 함수 (작업 프로세스에서 호출)
+# ---------------------------
+def run_preprocess_sewer():
+    from preprocess_sewer_data import preprocess_sewer_data
+    preprocess_sewer_data()
+
+
+def run_sewer_index(weights):
+    import pandas as pd
+    from sewer_infrastructure_index import SewerInfrastructureIndex
+
+    sewer_index = SewerInfrastructureIndex(SEWER_PROCESSED_PATH)
+    # preprocess_sewer_data에서 정제가 끝난 데이터 (세종 포함)를 그대로 사용
+    sewer_index.df = pd.read_csv(SEWER_PROCESSED_PATH, encoding='utf-8-sig')
+    sewer_index.processed_df = sewer_index.df.copy()
+    summary = sewer_index.calculate_infrastructure_index(weights)
+    summary['등급_숫자'] = summary['인프라_등급'].cat.codes + 1
+    summary.to_csv(SEWER_SUMMARY_PATH, index=False, encoding='utf-8-sig')
+    print(f"✅ 하수도 인프라 지수 저장: {SEWER_SUMMARY_PATH} ({len(summary)}개 행)")
+
+
+def run_housing_index(weights):
+    from housing_vulnerability_index import main
+    main(output_path=HOUSING_RESULT_PATH, weights=weights)
+
+
+def run_heavy_rain():
+    from heavy_rain_events import main
+    main()
+
+
+def run_geometry_cache():
+    from geo_cache import load_geometry_cache
+    load_geometry_cache()
+
+
+def run_geometry_lod():
+    from geometry_lod import load_geometry_lod
+    from topojson_export import load_lod_topojson
+    load_geometry_lod()
+    load_lod_topojson()
+
+
+def run_weight_sensitivity(n_samples):
+    from weight_sensitivity import main
+    main(n_samples=n_samples)
+
+
+def run_vector_tiles():
+    from vector_tiles import main
+    main()
+
+
+def run_crosswalk():
+    from region_crosswalk import load_crosswalk
+    load_crosswalk()
+
+
+def run_script(path):
+    """최상위 코드로 작성된 스크립트를 __main__으로 실행"""
+    runpy.run_path(path, run_name='__main__')
+
+
+# ---------------------------
+# 단계 정의
+# - inputs: 읽는 파일 (glob 가능), outputs: 생성 파일
+# - code: 진입 스크립트 (scripts/ 안의 모듈을 최상위 import로 따라가 소스 파일 전체를 자동으로 구함), params: 실행 함수 인자
+# - after: 파일로 드러나지 않는 선행 단계 (예: 지오메트리 캐시)
+# 선행 관계는 다른 단계의 outputs를 inputs로 읽는지로 자동 결정
+# ---------------------------
+STAGES = [
+    {
+        'name': 'preprocess_sewer',
+        'run': run_preprocess_sewer,
+        'code': ['scripts/preprocess_sewer_data.py'],
+        'inputs': ['data/raw/Sewer_Coverage_Rate.csv'],
+        'outputs': [SEWER_PROCESSED_PATH]
+    },
+    {
+        'name': 'sewer_index',
+        'run': run_sewer_index,
+        'params': {'weights': SEWER_WEIGHTS},
+        'code': ['scripts/sewer_infrastructure_index.py'],
+        'inputs': [SEWER_PROCESSED_PATH],
+        'outputs': [SEWER_SUMMARY_PATH]
+    },
+    {
+        'name': 'housing_index',
+        'run': run_housing_index,
+        'params': {'weights': HOUSING_WEIGHTS},
+        'code': ['scripts/housing_vulnerability_index.py'],
+        'inputs': ['data/processed/processed_data.csv'],
+        'outputs': [HOUSING_RESULT_PATH]
+    },
+    {
+        'name': 'heavy_rain',
+        'run': run_heavy_rain,
+        'code': ['scripts/heavy_rain_events.py'],
+        'inputs': ['data/raw/heavy_rain/호우재난_2.csv', SUMMER_TABLE_PATH],
+        'outputs': [SUMMER_TABLE_PATH, RAINFALL_PERCENTILE_PATH]
+    },
+    {
+        'name': 'geometry_cache',
+        'run': run_geometry_cache,
+        'code': ['scripts/geo_cache.py'],
+        'inputs': GEOJSON_INPUTS,
+        'outputs': []
+    },
+    {
+        'name': 'geometry_lod',
+        'run': run_geometry_lod,
+        'code': ['scripts/geometry_lod.py', 'scripts/topojson_export.py'],
+        'inputs': GEOJSON_INPUTS,
+        'after': ['geometry_cache'],
+        'outputs': []
+    },
+    {
+        'name': 'crosswalk',
+        'run': run_crosswalk,
+        'code': ['scripts/region_crosswalk.py'],
+        'inputs': ['data/raw/KIKcd_H.20250714_processed.xlsx'] + GEOJSON_INPUTS,
+        'after': ['geometry_cache'],
+        'outputs': []
+    },
+    {
+        'name': 'fixed_map',
+        'run': run_script,
+        'params': {'path': 'scripts/create_fixed_integrated_map.py'},
+        'code': ['scripts/create_fixed_integrated_map.py'],
+        'inputs': [HOUSING_RESULT_PATH, SEWER_SUMMARY_PATH, SOCIAL_DATA_PATH, RAINFALL_PERCENTILE_PATH,
+                   'data/raw/weather_rain/*.csv', 'data/raw/KIKcd_H.20250714_processed.xlsx'] + GEOJSON_INPUTS,
+        'after': ['geometry_cache', 'geometry_lod', 'crosswalk'],
+        'outputs': ['results/integrated_housing_sewer_social_map_fixed.html',
+                    'results/integrated_vulnerability_scores.csv']
+    },
+    {
+        'name': 'enhanced_map',
+        'run': run_script,
+        'params': {'path': 'scripts/create_enhanced_map.py'},
+        'code': ['scripts/create_enhanced_map.py'],
+        'inputs': [HOUSING_RESULT_PATH, SEWER_SUMMARY_PATH, SOCIAL_DATA_PATH, RAINFALL_PERCENTILE_PATH,
+                   'data/raw/weather_rain/*.csv'] + GEOJSON_INPUTS,
+        'after': ['geometry_cache', 'geometry_lod'],
+        'outputs': ['results/enhanced_vulnerability_map.html', 'results/housing_map.html',
+                    'results/sewer_map.html', 'results/social_map.html', 'results/rainfall_map.html']
+    },
+    {
+        'name': 'integrated_map',
+        'run': run_script,
+        'params': {'path': 'scripts/create_integrated_vulnerability_map.py'},
+        'code': ['scripts/create_integrated_vulnerability_map.py'],
+        'inputs': [HOUSING_RESULT_PATH, SEWER_SUMMARY_PATH, SOCIAL_DATA_PATH,
+                   'data/raw/KIKcd_H.20250714_processed.xlsx'] + GEOJSON_INPUTS,
+        'after': ['geometry_cache', 'crosswalk'],
+        'outputs': ['results/integrated_vulnerability_map.html']
+    },
+    {
+        'name': 'weight_sensitivity',
+        'run': run_weight_sensitivity,
+        'params': {'n_samples': 100_000},
+        'code': ['scripts/weight_sensitivity.py'],
+        'inputs': ['results/integrated_vulnerability_scores.csv'],
+        'outputs': ['results/weight_sensitivity.csv', 'results/weight_sensitivity.json']
+    },
+    {
+        'name': 'vector_tiles',
+        'run': run_vector_tiles,
+        'code': ['scripts/vector_tiles.py'],
+        'inputs': ['results/integrated_vulnerability_scores.csv'] + GEOJSON_INPUTS,
+        'after': ['geometry_lod'],
+        'outputs': ['results/vector_tiles/metadata.json', 'results/vector_tiles/index.html']
+    },
+    {
+        'name': 'report',
+        'run': run_script,
+        'params': {'path': 'scripts/create_analysis_report.py'},
+        'code': ['scripts/create_analysis_report.py'],
+        'inputs': [HOUSING_RESULT_PATH, SEWER_SUMMARY_PATH, SOCIAL_DATA_PATH, RAINFALL_PERCENTILE_PATH,
+                   'results/weight_sensitivity.csv', 'results/weight_sensitivity.json',
+                   'data/raw/weather_rain/*.csv'] + GEOJSON_INPUTS,
+        'after': ['geometry_cache'],
+        'outputs': ['results/vulnerability_analysis_report.html']
+    }
+]
+
+STAGE_INDEX = {stage['name']: stage for stage in STAGES}
+
+
+# ---------------------------
+# 내용 해시
+# ---------------------------
+def expand_paths(patterns):
+    """glob 패턴을 실제 파일 목록으로 확장 (정렬, 중복 제거)"""
+    paths = []
+    for pattern in patterns:
+        matched = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(p for p in matched if p not in paths)
+    return paths
+
+
+class FileHasher:
+    """
+    파일 내용 해시 (sha256)
+    크기/수정 시각이 같으면 이전 실행의 해시를 재사용하여 큰 파일을 매번 다시 읽지 않음
+    """
+
+    def __init__(self, memo=None):
+        self.memo = memo or {}
+
+    def __call__(self, path):
+        if not os.path.exists(path):
+            return None
+        st = os.stat(path)
+        cached = self.memo.get(path)
+        if cached and cached['size'] == st.st_size and cached['mtime_ns'] == st.st_mtime_ns:
+            return cached['sha256']
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.memo[path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest.hexdigest()}
+        return digest.hexdigest()
+
+
+def _local_imports(path):
+    """모듈 최상위(함수/클래스 밖)에서 import하는 scripts/ 안의 모듈 경로"""
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = []
+    pending = list(tree.body)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.append(node.module)
+        elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            # if/try/with 안의 import도 모듈 로드 시 실행됨
+            pending.extend(ast.iter_child_nodes(node))
+    scripts_dir = os.path.dirname(path)
+    paths = [os.path.join(scripts_dir, name.split('.')[0] + '.py') for name in names]
+    return [p for p in paths if os.path.exists(p)]
+
+
+def code_closure(entries):
+    """진입 스크립트와 최상위 import로 닿는 scripts/ 안의 모든 소스 파일 (정렬)"""
+    seen = set()
+    pending = list(entries)
+    while pending:
+        path = os.path.normpath(pending.pop())
+        if path in seen or not os.path.exists(path):
+            continue
+        seen.add(path)
+        pending.extend(_local_imports(path))
+    return sorted(seen)
+
+
+def stage_signature(stage, hasher):
+    """단계 입력/코드/파라미터 전체의 해시"""
+    payload = {
+        'name': stage['name'],
+        'params': stage.get('params', {}),
+        'code': {p: hasher(p) for p in code_closure(stage.get('code', []))},
+        'inputs': {p: hasher(p) for p in expand_paths(stage['inputs'])}
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def output_hashes(stage, hasher):
+    return {p: hasher(p) for p in stage['outputs']}
+
+
+def is_up_to_date(stage, record, hasher):
+    """기록된 입력 해시와 현재 입력이 같고, 출력이 그때 그대로 남아 있으면 최신"""
+    if record is None:
+        return False
+    if record['signature'] != stage_signature(stage, hasher):
+        return False
+    current = output_hashes(stage, hasher)
+    return all(h is not None for h in current.values()) and current == record['outputs']
+
+
+# ---------------------------
+# 선행 관계
+# ---------------------------
+def stage_dependencies(stages=STAGES):
+    """단계 이름 → 선행 단계 이름 집합 (다른 단계의 출력을 입력으로 읽거나 after에 지정)"""
+    producers = {}
+    for stage in stages:
+        for path in stage['outputs']:
+            producers[path] = stage['name']
+
+    deps = {}
+    for stage in stages:
+        upstream = set(stage.get('after', []))
+        for path in expand_paths(stage['inputs']):
+            producer = producers.get(path)
+            # 자기 출력을 다시 읽는 단계(예: heavy_rain의 20~24_여름.csv)는 제외
+            if producer is not None and producer != stage['name']:
+                upstream.add(producer)
+        deps[stage['name']] = upstream
+    return deps
+
+
+def topological_order(deps):
+    """선행 단계가 항상 먼저 오도록 정렬 (같은 단계에서는 STAGES 정의 순서)"""
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"단계 순환 참조: {name}")
+        visiting.add(name)
+        for upstream in sorted(deps[name], key=list(deps).index):
+            visit(upstream)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in deps:
+        visit(name)
+    return order
+
+
+def select_stages(targets, deps):
+    """지정 단계와 그 상위 단계 전체 (targets가 비어 있으면 모든 단계)"""
+    if not targets:
+        return set(deps)
+    unknown = [t for t in targets if t not in deps]
+    if unknown:
+        raise ValueError(f"알 수 없는 단계: {', '.join(unknown)} (가능: {', '.join(deps)})")
+    selected = set()
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected.add(name)
+            stack.extend(deps[name])
+    return selected
+
+
+# ---------------------------
+# 실행
+# ---------------------------
+def _execute_stage(name, log_path):
+    """작업 프로세스: 단계 실행 (출력은 단계별 로그 파일로)"""
+    os.chdir(ROOT_DIR)
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    stage = STAGE_INDEX[name]
+    start = time.time()
+    with open(log_path, 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            stage['run'](**stage.get('params', {}))
+        except BaseException:
+            traceback.print_exc()
+            raise
+    return time.time() - start
+
+
+def load_state(state_dir=STATE_DIR):
+    path = os.path.join(state_dir, 'state.json')
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'stages': {}, 'files': {}}
+
+
+def save_state(state, state_dir=STATE_DIR):
+    os.makedirs(state_dir, exist_ok=True)
+    path = os.path.join(state_dir, 'state.json')
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def run_pipeline(targets=None, force=(), max_workers=None, dry_run=False, state_dir=STATE_DIR):
+    """
+    파이프라인 실행
+    Args:
+        targets (list): 실행할 단계 (None이면 전체, 지정 시 상위 단계 포함)
+        force (iterable): 최신 여부와 관계없이 다시 실행할 단계
+        max_workers (int): 동시에 실행할 프로세스 수
+        dry_run (bool): 실행하지 않고 오래된 단계만 출력
+    Returns:
+        dict: 단계 이름 → 'skipped' / 'done' / 'failed' / 'blocked' / 'stale'(dry_run)
+    """
+    os.chdir(ROOT_DIR)
+    deps = stage_dependencies()
+    selected = select_stages(targets, deps)
+    force = set(force)
+    state = load_state(state_dir)
+    hasher = FileHasher(state.get('files'))
+    log_dir = os.path.join(state_dir, 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+
+    status = {}
+    running = {}
+    order = [name for name in topological_order(deps) if name in selected]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            # 위상 순서로 훑으므로 건너뛴 단계의 하위 단계도 같은 차례에 판정됨
+            for name in order:
+                if name in status or name in running.values():
+                    continue
+                upstream = [status.get(d) for d in deps[name] & selected]
+                if any(s in ('failed', 'blocked') for s in upstream):
+                    status[name] = 'blocked'
+                    print(f"⛔ {name}: 선행 단계 실패로 건너뜀")
+                    continue
+                if not all(s in ('skipped', 'done', 'stale') for s in upstream):
+                    continue
+
+                stage = STAGE_INDEX[name]
+                # 선행 단계가 다시 실행돼도 출력 내용이 같으면 입력 해시가 같으므로 건너뜀
+                if name not in force and 'stale' not in upstream and \
+                        is_up_to_date(stage, state['stages'].get(name), hasher):
+                    status[name] = 'skipped'
+                    print(f"⏭️  {name}: 최신")
+                elif dry_run:
+                    status[name] = 'stale'
+                    print(f"🔸 {name}: 실행 필요")
+                else:
+                    log_path = os.path.join(log_dir, f'{name}.log')
+                    running[pool.submit(_execute_stage, name, log_path)] = name
+                    print(f"▶️  {name}: 실행 중 (로그: {log_path})")
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                stage = STAGE_INDEX[name]
+                try:
+                    elapsed = future.result()
+                except Exception as e:
+                    status[name] = 'failed'
+                    state['stages'].pop(name, None)
+                    print(f"❌ {name}: 실패 ({type(e).__name__}: {e})")
+                    continue
+                # 실행 후의 입력 기준으로 기록 (자기 입력을 갱신하는 단계도 다음 실행에서 최신)
+                state['stages'][name] = {
+                    'signature': stage_signature(stage, hasher),
+                    'outputs': output_hashes(stage, hasher),
+                    'finished_at': time.strftime('%Y-%m-%d %H:%M:%S')
+                }
+                state['files'] = hasher.memo
+                save_state(state, state_dir)
+                status[name] = 'done'
+                print(f"✅ {name}: 완료 ({elapsed:.1f}초)")
+
+    state['files'] = hasher.memo
+    if not dry_run:
+        save_state(state, state_dir)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description='분석 파이프라인 실행 (바뀐 단계만 다시 실행)')
+    parser.add_argument('targets', nargs='*', help='실행할 단계 (기본: 전체)')
+    parser.add_argument('--force', action='store_true', help='지정 단계를 최신 여부와 관계없이 다시 실행')
+    parser.add_argument('--dry-run', action='store_true', help='실행하지 않고 오래된 단계만 출력')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='동시에 실행할 프로세스 수')
+    parser.add_argument('--list', action='store_true', help='단계와 선행 관계 출력')
+    args = parser.parse_args()
+
+    if args.list:
+        for name, upstream in stage_dependencies().items():
+            print(f"{name} ← {', '.join(sorted(upstream)) or '-'}")
+        return
+
+    force = (args.targets or list(STAGE_INDEX)) if args.force else ()
+    start = time.time()
+    status = run_pipeline(args.targets, force=force, max_workers=args.jobs, dry_run=args.dry_run)
+    counts = {s: list(status.values()).count(s) for s in set(status.values())}
+    print(f"\n🏁 파이프라인 종료 ({time.time() - start:.1f}초): "
+          + ', '.join(f"{s} {c}개" for s, c in sorted(counts.items())))
+    if 'failed' in counts or 'blocked' in counts:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,10 @@
 """
 하수도 인프라 데이터 전처리 스크립트
 """
-import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 import os
+from csv_ingest import read_csv
 
 def preprocess_sewer_data():
     """
@@ -15,7 +15,7 @@ def preprocess_sewer_data():
     
     # 데이터 로드
     print("1. 데이터 로드 중...")
-    df = pd.read_csv('data/raw/Sewer_Coverage_Rate.csv', encoding='utf-8')
+    df = read_csv('data/raw/Sewer_Coverage_Rate.csv', 'sewer_coverage')
     print(f"   원본 데이터: {len(df)}개 행, {len(df.columns)}개 컬럼")
     
     # 필요한 컬럼만 선택
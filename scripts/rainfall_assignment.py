@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+기상관측 지점 → 행정동 강수량 할당
+weather_rain/*.csv의 지점 좌표(경도/위도)로 KD-tree를 만들어
+모든 행정동(adm_cd2) 대표점의 근접 지점과 역거리가중(IDW) 가중치를 한 번에 계산
+(최근접 지점 할당 또는 IDW 보간에 사용)
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from csv_ingest import read_csv
+from geo_cache import file_fingerprint, load_geometry_cache
+
+WEATHER_DIR = 'data/raw/weather_rain'
+CACHE_DIR = 'data/cache/rainfall'
+
+# 위경도 → 근사 평면 좌표(km) 변환 상수 (한반도 중심 위도 기준)
+KM_PER_DEG_LAT = 110.57
+KM_PER_DEG_LON = 111.32 * np.cos(np.radians(36.5))
+
+
+def to_km(lon, lat):
+    """위경도를 거리 계산용 평면 좌표(km)로 변환"""
+    return np.column_stack([np.asarray(lon) * KM_PER_DEG_LON, np.asarray(lat) * KM_PER_DEG_LAT])
+
+
+def station_files(weather_dir=WEATHER_DIR):
+    """좌표가 포함된 계절별 강수량 파일 목록 (연도/계절 순)"""
+    return sorted(glob.glob(os.path.join(weather_dir, '*.csv')))
+
+
+def load_station_coords(weather_dir=WEATHER_DIR):
+    """
+    지점별 좌표 테이블 (지점정보, 경도, 위도)
+    지점 이전 등으로 좌표가 바뀐 경우 가장 최근 파일의 좌표 사용
+    """
+    frames = []
+    for path in station_files(weather_dir):
+        df = read_csv(path, 'weather_rain')
+        if '경도' not in df.columns or '위도' not in df.columns:
+            continue
+        frames.append(df[['지점정보', '경도', '위도']])
+
+    coords = pd.concat(frames, ignore_index=True).dropna()
+    return coords.drop_duplicates(subset='지점정보', keep='last').reset_index(drop=True)
+
+
+def build_station_weights(centroids, adm_codes, stations, k=4, power=2):
+    """
+    행정동별 근접 지점 가중치 테이블 생성
+    Args:
+        centroids (np.ndarray): 행정동 대표점 (경도, 위도)
+        adm_codes (array): 행정동코드 (adm_cd2)
+        stations (pd.DataFrame): 지점정보, 경도, 위도
+        k (int): 행정동마다 보관할 근접 지점 수
+        power (float): 역거리가중 지수
+    Returns:
+        pd.DataFrame: adm_cd2, 지점정보, 거리_km, 가중치 (행정동당 k행, 가까운 순)
+    """
+    k = min(k, len(stations))
+    tree = cKDTree(to_km(stations['경도'], stations['위도']))
+    dist, idx = tree.query(to_km(centroids[:, 0], centroids[:, 1]), k=k)
+    dist = dist.reshape(len(centroids), k)
+    idx = idx.reshape(len(centroids), k)
+
+    # 지점과 거의 겹치는 행정동은 해당 지점 값이 지배하도록 최소 거리 제한
+    inv = 1.0 / np.maximum(dist, 1e-6) ** power
+    weights = inv / inv.sum(axis=1, keepdims=True)
+
+    return pd.DataFrame({
+        'adm_cd2': np.repeat(np.asarray(adm_codes).astype(str), k),
+        '지점정보': stations['지점정보'].to_numpy()[idx.ravel()],
+        '거리_km': dist.ravel(),
+        '가중치': weights.ravel()
+    })
+
+
+def load_station_weights(k=4, power=2, geo_cache=None,
+                         weather_dir=WEATHER_DIR, cache_dir=CACHE_DIR, verbose=True):
+    """
+    adm_cd2 → 근접 지점 가중치 테이블 로드 (지오메트리/지점 파일이 바뀌었으면 재계산)
+    """
+    if geo_cache is None:
+        geo_cache = load_geometry_cache(verbose=verbose)
+
+    table_path = os.path.join(cache_dir, f'weights_k{k}_p{power}.csv')
+    manifest_path = os.path.join(cache_dir, f'weights_k{k}_p{power}.json')
+    fingerprint = {
+        'geometry': geo_cache.sources,
+        'stations': [file_fingerprint(p) for p in station_files(weather_dir)]
+    }
+
+    if os.path.exists(manifest_path) and os.path.exists(table_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == fingerprint:
+                if verbose:
+                    print(f"⚡ 강수량 지점 가중치 캐시 사용: {table_path}")
+                return pd.read_csv(table_path, dtype={'adm_cd2': str}, encoding='utf-8-sig')
+
+    stations = load_station_coords(weather_dir)
+    weights = build_station_weights(geo_cache.centroids(), geo_cache.adm_cd2, stations, k=k, power=power)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    weights.to_csv(table_path, index=False, encoding='utf-8-sig')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprint, f, ensure_ascii=False, indent=2)
+    if verbose:
+        print(f"✅ 강수량 지점 가중치 계산: {len(stations)}개 지점 → {weights['adm_cd2'].nunique()}개 행정동")
+    return weights
+
+
+def interpolate_by_region(weights, station_values):
+    """
+    지점 값을 행정동 값으로 역거리가중 평균
+    값이 없는 지점은 제외하고 남은 가중치로 다시 정규화
+    Args:
+        weights (pd.DataFrame): load_station_weights 결과
+        station_values (pd.Series): 지점정보 → 값
+    Returns:
+        pd.Series: adm_cd2 → 값 (할당할 지점이 없으면 NaN)
+    """
+    values = weights['지점정보'].map(station_values)
+    valid = values.notna()
+    w = weights['가중치'].where(valid, 0)
+    numerator = (values.fillna(0) * w).groupby(weights['adm_cd2'], sort=False).sum()
+    denominator = w.groupby(weights['adm_cd2'], sort=False).sum()
+    return numerator / denominator.replace(0, np.nan)
+
+
+def nearest_station_by_region(weights, station_values):
+    """
+    행정동별로 값이 있는 가장 가까운 지점
+    Returns:
+        pd.Series: adm_cd2 → 지점정보 (없으면 NaN)
+    """
+    has_value = weights['지점정보'].isin(station_values.index[station_values.notna()])
+    ranked = weights[has_value].sort_values(['adm_cd2', '거리_km'], kind='stable')
+    return ranked.drop_duplicates(subset='adm_cd2').set_index('adm_cd2')['지점정보']
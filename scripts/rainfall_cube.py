@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+계절별 강수량 큐브 (지점 × 연도 × 계절)
+data/raw/weather_rain/{연도}_{계절}.csv 전체를 한 번 읽어 (지점 수, 연도 수, 4) 배열과
+지점 좌표로 묶고 data/cache/rainfall_cube/에 .npz로 저장
+- 지점정보는 heavy_rain_events.normalize_station으로 정규화 ('세종(예)(239)' → '세종(239)')
+- 관측이 없는 지점/연도/계절은 NaN
+- 다년 평균, 평년 대비 편차, 지점 간 백분위, 계절별 순위를 배열 연산으로 계산
+- rainfall_index_tables(): 임의 계절/연도 구간의 20~24_여름 / 여름_강수량_호우_백분위 형태 테이블 생성
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+from csv_ingest import read_csv
+from geo_cache import file_fingerprint
+from heavy_rain_events import (ALERT_KINDS, SEASON_ORDER, build_percentile_table,
+                               count_alerts, load_alert_events, normalize_station)
+
+WEATHER_DIR = 'data/raw/weather_rain'
+CACHE_DIR = 'data/cache/rainfall_cube'
+CUBE_VERSION = 1
+
+FILE_PATTERN = re.compile(r'^(?P<year>\d{4})_(?P<season>봄|여름|가을|겨울)\.csv$')
+
+
+class RainfallCube:
+    """
+    지점 × 연도 × 계절 강수량
+    - stations: 지점정보 ('이름(번호)', 지점번호 순)
+    - codes: 지점번호
+    - lon, lat: 지점 좌표 (가장 최근 파일 기준, 없으면 NaN)
+    - years: 연도
+    - seasons: 계절 이름 (SEASON_ORDER)
+    - values: (지점 수, 연도 수, 계절 수) float64 강수량(mm)
+    """
+
+    def __init__(self, stations, codes, lon, lat, years, values, seasons=SEASON_ORDER):
+        self.stations = np.asarray(stations, dtype=str)
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.seasons = list(seasons)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.index = {station: i for i, station in enumerate(self.stations)}
+
+    def __len__(self):
+        return len(self.stations)
+
+    def _year_index(self, years):
+        if years is None:
+            return np.arange(len(self.years))
+        position = {year: i for i, year in enumerate(self.years.tolist())}
+        missing = [year for year in years if year not in position]
+        if missing:
+            raise KeyError(f"큐브에 없는 연도: {missing} (범위: {self.years.min()}~{self.years.max()})")
+        return np.array([position[year] for year in years], dtype=np.int64)
+
+    def _season_index(self, seasons):
+        if seasons is None:
+            return np.arange(len(self.seasons))
+        if isinstance(seasons, str):
+            seasons = [seasons]
+        return np.array([self.seasons.index(season) for season in seasons], dtype=np.int64)
+
+    def select(self, years=None, seasons=None):
+        """(지점 수, 선택 연도 수, 선택 계절 수) 부분 배열"""
+        return self.values[:, self._year_index(years)][:, :, self._season_index(seasons)]
+
+    def period_totals(self, years=None, seasons=None):
+        """
+        지점 × 연도별 선택 계절 합계 (지점 수, 연도 수)
+        선택한 계절 중 하나라도 관측이 없으면 그 연도는 NaN
+        """
+        return self.select(years, seasons).sum(axis=2)
+
+    def total(self, years=None, seasons=None):
+        """지점별 기간 합계 (관측된 연도만 합산, 관측이 전혀 없으면 NaN)"""
+        totals = self.period_totals(years, seasons)
+        observed = ~np.isnan(totals)
+        return np.where(observed.any(axis=1), np.nansum(totals, axis=1), np.nan)
+
+    def mean(self, years=None, seasons=None):
+        """지점별 다년 평균 (관측된 연도 평균)"""
+        totals = self.period_totals(years, seasons)
+        count = (~np.isnan(totals)).sum(axis=1)
+        return np.where(count > 0, np.nansum(totals, axis=1) / np.maximum(count, 1), np.nan)
+
+    def anomaly(self, years=None, seasons=None, baseline_years=None):
+        """지점 × 연도별 편차 (선택 계절 합계 - 기준 연도 평균), (지점 수, 연도 수)"""
+        baseline = self.mean(baseline_years, seasons)
+        return self.period_totals(years, seasons) - baseline[:, None]
+
+    def percentile_rank(self, values=None, years=None, seasons=None):
+        """
+        지점 간 백분위 순위 (pd.Series.rank(pct=True) × 100과 같은 규칙, 0번 축 = 지점)
+        values가 없으면 기간 합계(total) 기준
+        """
+        if values is None:
+            values = self.total(years, seasons)
+        values = np.asarray(values, dtype=np.float64)
+        ranks = rankdata(values, axis=0, nan_policy='omit')
+        counts = (~np.isnan(values)).sum(axis=0)
+        return ranks / np.where(counts > 0, counts, np.nan) * 100
+
+    def ranks(self, years=None, seasons=None):
+        """연도 × 계절별 지점 순위 (1 = 가장 많은 강수량, 동률은 최소 순위, 관측 없음은 0)"""
+        values = self.select(years, seasons)
+        ranks = rankdata(-values, axis=0, method='min', nan_policy='omit')
+        return np.where(np.isnan(values), 0, ranks).astype(np.int64)
+
+    def percentiles(self, q, years=None, seasons=None):
+        """연도 × 계절별 지점 강수량 분위수 (q: 0~100, 결과 모양 = q 모양 + (연도 수, 계절 수))"""
+        return np.nanpercentile(self.select(years, seasons), q, axis=0)
+
+    def to_frame(self):
+        """지점정보, 경도, 위도, 연도, 계절, 강수량(mm) 긴 형식 (관측값만)"""
+        s, y, k = np.nonzero(~np.isnan(self.values))
+        return pd.DataFrame({
+            '지점정보': self.stations[s],
+            '경도': self.lon[s],
+            '위도': self.lat[s],
+            '연도': self.years[y],
+            '계절': np.asarray(self.seasons)[k],
+            '강수량(mm)': self.values[s, y, k]
+        })
+
+
+def cube_files(weather_dir=WEATHER_DIR):
+    """(연도, 계절, 경로) 목록 (이름 형식이 맞는 파일만)"""
+    files = []
+    for name in sorted(os.listdir(weather_dir)):
+        match = FILE_PATTERN.match(name)
+        if match:
+            files.append((int(match.group('year')), match.group('season'), os.path.join(weather_dir, name)))
+    return files
+
+
+def read_season_file(path, year, season):
+    """
+    계절별 강수량 파일 하나 → 지점명, 지점번호, 경도, 위도, 연도, 계절, 값 (지점번호가 없는 행 제외)
+    """
+    df = read_csv(path, 'weather_rain')
+    # 좌표 없는 형식 (예: 2024_여름.csv의 '2024강수량(mm)')
+    value_col = '강수량(mm)' if '강수량(mm)' in df.columns else f'{year}강수량(mm)'
+    stations = [normalize_station(text, aliases={}) for text in df['지점정보'].fillna('')]
+    valid = np.array([station is not None for station in stations])
+    return pd.DataFrame({
+        '지점명': [station[0] for station in stations if station is not None],
+        '지점번호': [station[1] for station in stations if station is not None],
+        '경도': df['경도'].to_numpy()[valid] if '경도' in df.columns else np.nan,
+        '위도': df['위도'].to_numpy()[valid] if '위도' in df.columns else np.nan,
+        '연도': year,
+        '계절': season,
+        '값': df[value_col].to_numpy()[valid]
+    })
+
+
+def build_rainfall_cube(weather_dir=WEATHER_DIR):
+    """계절별 강수량 파일 전체 → RainfallCube"""
+    frames = [read_season_file(path, year, season) for year, season, path in cube_files(weather_dir)]
+    long = pd.concat(frames, ignore_index=True)
+
+    # 지점번호별 가장 최근 파일의 이름/좌표
+    latest = long.sort_values(['연도', '계절'], key=lambda col: col.map(SEASON_ORDER.index) if col.name == '계절' else col,
+                              kind='stable')
+    names = latest.drop_duplicates('지점번호', keep='last').set_index('지점번호')['지점명']
+    coords = latest.dropna(subset=['경도', '위도']).drop_duplicates('지점번호', keep='last').set_index('지점번호')
+    codes = np.sort(long['지점번호'].unique())
+    years = np.sort(long['연도'].unique())
+
+    values = np.full((len(codes), len(years), len(SEASON_ORDER)), np.nan)
+    s = np.searchsorted(codes, long['지점번호'].to_numpy())
+    y = np.searchsorted(years, long['연도'].to_numpy())
+    k = long['계절'].map(SEASON_ORDER.index).to_numpy()
+    values[s, y, k] = long['값'].to_numpy()
+
+    return RainfallCube(
+        stations=[f"{names[code]}({code})" for code in codes],
+        codes=codes,
+        lon=coords['경도'].reindex(codes).to_numpy(),
+        lat=coords['위도'].reindex(codes).to_numpy(),
+        years=years,
+        values=values
+    )
+
+
+def save_rainfall_cube(cube, path):
+    """RainfallCube → .npz"""
+    np.savez(path, stations=cube.stations, codes=cube.codes, lon=cube.lon, lat=cube.lat,
+             years=cube.years, seasons=np.asarray(cube.seasons), values=cube.values)
+
+
+def open_rainfall_cube(path):
+    """.npz → RainfallCube"""
+    with np.load(path) as data:
+        return RainfallCube(data['stations'], data['codes'], data['lon'], data['lat'],
+                            data['years'], data['values'], seasons=data['seasons'].tolist())
+
+
+def load_rainfall_cube(weather_dir=WEATHER_DIR, cache_dir=CACHE_DIR, verbose=True):
+    """계절별 강수량 큐브 로드 (지점 파일이 바뀌었으면 재생성)"""
+    cube_path = os.path.join(cache_dir, 'cube.npz')
+    manifest_path = os.path.join(cache_dir, 'cube.json')
+    fingerprint = {'version': CUBE_VERSION, 'files': [file_fingerprint(path) for _, _, path in cube_files(weather_dir)]}
+
+    if os.path.exists(manifest_path) and os.path.exists(cube_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == fingerprint:
+                if verbose:
+                    print(f"⚡ 강수량 큐브 캐시 사용: {cube_path}")
+                return open_rainfall_cube(cube_path)
+
+    cube = build_rainfall_cube(weather_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_rainfall_cube(cube, cube_path)
+    # 매니페스트는 마지막에 기록 (중간에 실패하면 다음 실행에서 재생성)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprint, f, ensure_ascii=False, indent=2)
+    if verbose:
+        print(f"✅ 강수량 큐브 생성: 지점 {len(cube)}개 × 연도 {len(cube.years)}개 × 계절 {len(cube.seasons)}개 → {cube_path}")
+    return cube
+
+
+def rainfall_index_tables(cube, events=None, years=None, seasons=('여름',), rain_weight=0.5, alert_weight=0.5):
+    """
+    계절/연도 구간별 강수량·호우특보 테이블과 백분위 지수 테이블
+    Args:
+        cube (RainfallCube): 강수량 큐브
+        events (pd.DataFrame): heavy_rain_events.load_alert_events 결과 (기본값: 캐시에서 로드)
+        years (list): 연도 구간 (기본값: 큐브 전체)
+        seasons: 포함할 계절 (기본값: 여름)
+    Returns:
+        (pd.DataFrame, pd.DataFrame): 20~24_여름 형태 테이블, 여름_강수량_호우_백분위 형태 테이블
+    """
+    if events is None:
+        events = load_alert_events(verbose=False)
+    years = cube.years.tolist() if years is None else list(years)
+    seasons = [seasons] if isinstance(seasons, str) else list(seasons)
+    period = f"{years[0]}~{years[-1]}"
+
+    totals = cube.period_totals(years, seasons)
+    observed = ~np.isnan(totals).all(axis=1)
+    table = pd.DataFrame(totals[observed], columns=[f'{year}강수량(mm)' for year in years])
+    table.insert(0, '지점정보', cube.stations[observed])
+    table[f'{period}강수량 총합 (mm)'] = cube.total(years, seasons)[observed]
+    table[f'{period}강수량 평균 (mm)'] = cube.mean(years, seasons)[observed]
+
+    counts = count_alerts(events, years=years, seasons=seasons)
+    for col in ALERT_KINDS + ['호우특보']:
+        table[col] = table['지점정보'].map(counts[col]).fillna(0).astype(int)
+    return table, build_percentile_table(table, rain_weight, alert_weight, period=period)
+
+
+def main(write=False):
+    """
+    큐브 생성/질의 시간 확인, 수작업 20~24_여름 테이블과 원자료 비교
+    write=True면 큐브 기준으로 20~24_여름 / 여름_강수량_호우_백분위 테이블을 다시 기록
+    """
+    import time
+
+    from heavy_rain_events import PERCENTILE_TABLE_PATH, SUMMER_TABLE_PATH, write_table
+
+    start = time.time()
+    cube = build_rainfall_cube()
+    print(f"🌧️ 강수량 큐브: 지점 {len(cube)}개 × 연도 {len(cube.years)}개 × 계절 {len(cube.seasons)}개 "
+          f"({np.isnan(cube.values).mean():.1%} 결측), 생성 {(time.time() - start) * 1000:.0f}ms")
+    cube = load_rainfall_cube(verbose=False)
+
+    events = load_alert_events(verbose=False)
+    start = time.perf_counter()
+    summer, percentile = rainfall_index_tables(cube, events)
+    print(f"⚡ 여름 지수 테이블 생성: {(time.perf_counter() - start) * 1000:.1f}ms")
+    start = time.perf_counter()
+    for season in cube.seasons:
+        rainfall_index_tables(cube, events, seasons=season)
+    print(f"   계절별 지수 테이블 {len(cube.seasons)}개: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    start = time.perf_counter()
+    anomaly = cube.anomaly(seasons='여름')
+    ranks = cube.ranks()
+    quartiles = cube.percentiles([25, 50, 75])
+    print(f"   편차/순위/분위수 (전체 연도 × 계절): {(time.perf_counter() - start) * 1000:.1f}ms")
+    wettest = np.nanargmax(anomaly, axis=0)
+    for j, year in enumerate(cube.years):
+        print(f"   - {year} 여름: 중앙값 {quartiles[1, j, cube.seasons.index('여름')]:.1f}mm, "
+              f"평년 대비 최대 {cube.stations[wettest[j]]} {anomaly[wettest[j], j]:+.1f}mm, "
+              f"1위 {cube.stations[ranks[:, j, cube.seasons.index('여름')] == 1][0]}")
+
+    # 수작업 테이블의 연도별 값과 원자료 비교
+    manual = read_csv(SUMMER_TABLE_PATH, 'summer_rainfall').set_index('지점정보')
+    generated = summer.set_index('지점정보')
+    for year in cube.years:
+        col = f'{year}강수량(mm)'
+        diff = (manual[col] - generated[col].reindex(manual.index)).abs() > 0.05
+        print(f"   {col}: 수작업 테이블과 다른 지점 {int(diff.sum())}개")
+
+    if write:
+        write_table(summer, SUMMER_TABLE_PATH)
+        write_table(percentile, PERCENTILE_TABLE_PATH)
+        print(f"✅ 재생성 완료: {SUMMER_TABLE_PATH}, {PERCENTILE_TABLE_PATH}")
+    return cube
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+강수량·호우특보 증분 반영 (연도 추가 시 전체 재계산 없이 백분위 지수 갱신)
+새 weather_rain/{연도}_{계절}.csv, heavy_rain/호우재난_*.csv만 읽어
+지점별 누적값(강수량 합계/관측 연수, 호우주의보/경보 일수)과 정렬 배열을 갱신하고,
+값이 바뀐 지점의 통합점수/백분위/강수량등급과 그 지점을 쓰는 행정동만 다시 계산
+- 상태는 data/cache/rainfall_state/에 저장 (이미 반영한 파일은 지문이 같으면 건너뜀)
+- 호우특보는 (지점, 특보 종류, 날짜) 키의 정렬 배열로 중복 제거 (같은 특보를 담은 파일을 다시 넣어도 0건)
+- 특보는 추가만 반영 (원본에서 삭제된 특보는 full=True로 다시 만들어야 반영)
+- 결과는 heavy_rain_events.build_percentile_table과 같은 정의 (5년 → 누적 기간, window로 최근 N년만 사용 가능)
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from csv_ingest import read_csv
+from geo_cache import file_fingerprint
+from grading import assign_grades
+from heavy_rain_events import ALERT_KINDS, SEASONS, build_percentile_table, iter_alert_events
+from rainfall_assignment import interpolate_by_region
+from rainfall_cube import FILE_PATTERN, WEATHER_DIR, cube_files, read_season_file
+
+ALERT_DIR = 'data/raw/heavy_rain'
+STATE_DIR = 'data/cache/rainfall_state'
+STATE_VERSION = 1
+INDEX_COL = '백분위(강수량 0.5, 호우 * 0.5)'
+
+# 호우특보 중복 제거 키: (지점번호 × 특보 종류 수 + 종류) × DAY_SPAN + 1970-01-01 기준 일수
+DAY_SPAN = 1_000_000
+
+
+def alert_files(alert_dir=ALERT_DIR):
+    """호우특보 이벤트 파일 목록 (호우재난_*.csv)"""
+    return sorted(os.path.join(alert_dir, name) for name in os.listdir(alert_dir)
+                  if name.startswith('호우재난_') and name.endswith('.csv'))
+
+
+def _replace_sorted(sorted_values, old_values, new_values):
+    """정렬 배열에서 old_values를 빼고 new_values를 넣은 정렬 배열 (NaN은 무시)"""
+    old_values = np.sort(old_values[~np.isnan(old_values)])
+    new_values = np.sort(new_values[~np.isnan(new_values)])
+    if len(old_values):
+        sorted_values = np.delete(sorted_values, np.searchsorted(sorted_values, old_values) +
+                                  _duplicate_offsets(old_values))
+    return np.insert(sorted_values, np.searchsorted(sorted_values, new_values), new_values)
+
+
+def _duplicate_offsets(sorted_values):
+    """정렬된 값에서 같은 값의 몇 번째인지 (같은 값을 여러 개 지울 때 위치를 하나씩 밀기 위함)"""
+    if len(sorted_values) == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.r_[True, sorted_values[1:] != sorted_values[:-1]]
+    first = np.maximum.accumulate(np.where(starts, np.arange(len(sorted_values)), 0))
+    return np.arange(len(sorted_values)) - first
+
+
+class RainfallIndexState:
+    """
+    지점별 강수량·호우특보 누적 상태
+    - codes / names: 지점번호 / 지점명 (지점 축, 새 지점은 뒤에 추가)
+    - years: 연도 축 (새 연도는 정렬 위치에 추가)
+    - rain: (지점, 연도, 계절) 강수량, 관측 없음은 NaN
+    - alerts: (지점, 연도, 특보 종류) 일수
+    - alert_keys: 반영한 특보 키 정렬 배열
+    - rain_sum / rain_count / alert_sum: 기간(window) 연도의 지점별 누적값
+    - sorted_rain / sorted_scores: 지수 대상 지점의 기간 강수량 / 통합점수 정렬 배열
+    - scores / percentile / grades: 지점별 통합점수 / 백분위 / 강수량등급 (지수 대상이 아니면 NaN / 0)
+    """
+
+    def __init__(self, seasons=('여름',), window=None, rain_weight=0.5, alert_weight=0.5):
+        self.seasons = list(seasons)
+        self.window = window
+        self.rain_weight = rain_weight
+        self.alert_weight = alert_weight
+        self.sources = {}
+        self.codes = np.zeros(0, dtype=np.int64)
+        self.names = []
+        self.years = np.zeros(0, dtype=np.int64)
+        self.rain = np.zeros((0, 0, len(self.seasons)))
+        self.alerts = np.zeros((0, 0, len(ALERT_KINDS)), dtype=np.int64)
+        self.alert_keys = np.zeros(0, dtype=np.int64)
+        self.rain_sum = np.zeros(0)
+        self.rain_count = np.zeros(0, dtype=np.int64)
+        self.alert_sum = np.zeros(0, dtype=np.int64)
+        self.sorted_rain = np.zeros(0)
+        self.sorted_scores = np.zeros(0)
+        self.scores = np.zeros(0)
+        self.percentile = np.zeros(0)
+        self.grades = np.zeros(0, dtype=np.int64)
+        self.window_years = []
+        self.index = {}
+        # 기간 강수량 (지수 대상이 아니면 NaN)
+        self._totals = np.zeros(0)
+        # (지점, 연도, [강수량, 관측 여부, 특보 일수]): 누적값에 더해 둔 연도별 기여분
+        self.counted = np.zeros((0, 0, 3))
+
+    @property
+    def stations(self):
+        """지점정보 ('이름(번호)')"""
+        return np.array([f"{name}({code})" for name, code in zip(self.names, self.codes)], dtype=str)
+
+    @property
+    def period(self):
+        """기간 라벨 (예: '2020~2024')"""
+        return f"{self.window_years[0]}~{self.window_years[-1]}" if self.window_years else ''
+
+    # ---------------------------
+    # 축 확장
+    # ---------------------------
+    def _station_positions(self, codes, names):
+        """지점번호 → 지점 축 위치 (처음 보는 지점은 추가)"""
+        new = [(code, name) for code, name in dict(zip(codes, names)).items() if code not in self.index]
+        if new:
+            n_new = len(new)
+            for code, name in new:
+                self.index[code] = len(self.names)
+                self.names.append(name)
+            self.codes = np.r_[self.codes, [code for code, _ in new]].astype(np.int64)
+            self.rain = np.concatenate([self.rain, np.full((n_new,) + self.rain.shape[1:], np.nan)])
+            self.alerts = np.concatenate([self.alerts, np.zeros((n_new,) + self.alerts.shape[1:], dtype=np.int64)])
+            self.counted = np.concatenate([self.counted, np.zeros((n_new,) + self.counted.shape[1:])])
+            self.rain_sum = np.r_[self.rain_sum, np.zeros(n_new)]
+            self.rain_count = np.r_[self.rain_count, np.zeros(n_new, dtype=np.int64)]
+            self.alert_sum = np.r_[self.alert_sum, np.zeros(n_new, dtype=np.int64)]
+            self.scores = np.r_[self.scores, np.full(n_new, np.nan)]
+            self.percentile = np.r_[self.percentile, np.full(n_new, np.nan)]
+            self.grades = np.r_[self.grades, np.zeros(n_new, dtype=np.int64)]
+        return np.array([self.index[code] for code in codes], dtype=np.int64)
+
+    def _year_positions(self, years):
+        """연도 → 연도 축 위치 (처음 보는 연도는 정렬 위치에 추가)"""
+        new = np.setdiff1d(np.unique(years), self.years)
+        if len(new):
+            at = np.searchsorted(self.years, new)
+            self.years = np.insert(self.years, at, new)
+            self.rain = np.insert(self.rain, at, np.nan, axis=1)
+            self.alerts = np.insert(self.alerts, at, 0, axis=1)
+            self.counted = np.insert(self.counted, at, 0, axis=1)
+        return np.searchsorted(self.years, years)
+
+    def _rain_years(self):
+        """기간 연도 (선택 계절이 모두 관측된 지점이 있는 연도, window면 최근 N년)"""
+        observed = ~np.isnan(self.rain.sum(axis=2)).all(axis=0) if len(self.codes) else np.zeros(0, dtype=bool)
+        years = self.years[observed].tolist()
+        return years[-self.window:] if self.window else years
+
+    # ---------------------------
+    # 반영
+    # ---------------------------
+    def add_rainfall(self, frame):
+        """
+        read_season_file 결과 반영 (같은 연도/계절 값은 덮어씀)
+        Returns:
+            np.ndarray: 누적값이 바뀐 연도
+        """
+        frame = frame[frame['계절'].isin(self.seasons)]
+        if frame.empty:
+            return np.zeros(0, dtype=np.int64)
+        s = self._station_positions(frame['지점번호'].tolist(), frame['지점명'].tolist())
+        # 강수량 파일의 지점명을 우선 사용 (특보에서 먼저 추가된 지점 포함)
+        for i, name in zip(s.tolist(), frame['지점명'].tolist()):
+            self.names[i] = name
+        y = self._year_positions(frame['연도'].to_numpy())
+        k = frame['계절'].map(self.seasons.index).to_numpy()
+        self.rain[s, y, k] = frame['값'].to_numpy(dtype=np.float64)
+        return np.unique(self.years[y])
+
+    def add_alerts(self, events):
+        """
+        특보 이벤트 (재난, 발생시간, 지점명, 지점번호) 반영 (선택 계절만, 이미 반영한 날짜 키는 제외)
+        Returns:
+            (int, np.ndarray): 새로 반영한 특보 일수, 누적값이 바뀐 연도
+        """
+        kinds, occurred, names, codes = (list(column) for column in zip(*events)) if events else ([], [], [], [])
+        occurred = pd.to_datetime(pd.Series(occurred, dtype=str), format='%Y-%m-%d %H:%M')
+        kind = pd.Series(kinds, dtype=str).map({k: i for i, k in enumerate(ALERT_KINDS)}).to_numpy()
+        season = occurred.dt.month.map(SEASONS).to_numpy()
+        keep = ~pd.isna(kind) & np.isin(season, self.seasons)
+        if not keep.any():
+            return 0, np.zeros(0, dtype=np.int64)
+
+        codes = np.asarray(codes, dtype=np.int64)[keep]
+        kind = kind[keep].astype(np.int64)
+        days = occurred[keep].dt.normalize().to_numpy().astype('datetime64[D]').astype(np.int64)
+        keys, first = np.unique((codes * len(ALERT_KINDS) + kind) * DAY_SPAN + days, return_index=True)
+        at = np.searchsorted(self.alert_keys, keys)
+        seen = np.zeros(len(keys), dtype=bool)
+        if len(self.alert_keys):
+            seen = (at < len(self.alert_keys)) & (self.alert_keys[np.minimum(at, len(self.alert_keys) - 1)] == keys)
+        if seen.all():
+            return 0, np.zeros(0, dtype=np.int64)
+        new_keys, rows = keys[~seen], first[~seen]
+        self.alert_keys = np.insert(self.alert_keys, at[~seen], new_keys)
+
+        s = self._station_positions(codes[rows].tolist(), np.asarray(names, dtype=object)[keep][rows].tolist())
+        y = self._year_positions(occurred[keep].dt.year.to_numpy()[rows])
+        np.add.at(self.alerts, (s, y, kind[rows]), 1)
+        return len(new_keys), np.unique(self.years[y])
+
+    def refresh(self, previous_years, changed_years):
+        """
+        누적값과 지수 갱신 (바뀐 연도 / 기간에 들어오거나 빠진 연도만 더하고 뺌)
+        Args:
+            previous_years (list): 반영 전 기간 연도
+            changed_years (np.ndarray): 값이 바뀐 연도
+        Returns:
+            np.ndarray: 통합점수/백분위/등급이 바뀐 지점 위치
+        """
+        self.window_years = self._rain_years()
+        old, new = set(previous_years), set(self.window_years)
+        touched = sorted(set(np.asarray(changed_years).tolist()) & (old | new) | (old ^ new))
+        if not touched:
+            return np.zeros(0, dtype=np.int64)
+
+        # 연도별로 이전 기여분을 빼고 새 기여분을 더함 (기간에서 빠진 연도는 새 기여분 0)
+        j = np.searchsorted(self.years, touched)
+        after = np.zeros((len(self.codes), len(touched), 3))
+        entering = np.isin(touched, list(new))
+        totals = self.rain[:, j[entering]].sum(axis=2)
+        after[:, entering, 0] = np.nan_to_num(totals)
+        after[:, entering, 1] = ~np.isnan(totals)
+        after[:, entering, 2] = self.alerts[:, j[entering]].sum(axis=2)
+        before = self.counted[:, j]
+        # 강수량은 연도 순서대로 더함 (처음부터 반영한 결과와 같은 부동소수점 합계)
+        for year in range(len(touched)):
+            self.rain_sum += after[:, year, 0] - before[:, year, 0]
+        self.rain_count += (after[:, :, 1] - before[:, :, 1]).sum(axis=1).astype(np.int64)
+        self.alert_sum += (after[:, :, 2] - before[:, :, 2]).sum(axis=1).astype(np.int64)
+        self.counted[:, j] = after
+        return self._rescore()
+
+    def _rescore(self):
+        """통합점수 → 정렬 배열 → 백분위/등급 (지수 대상: 기간 강수량이 있는 지점)"""
+        in_index = self.rain_count > 0
+        totals = np.where(in_index, self.rain_sum, np.nan)
+        previous_totals = np.r_[self._totals, np.full(len(totals) - len(self._totals), np.nan)]
+        moved = ~((totals == previous_totals) | (np.isnan(totals) & np.isnan(previous_totals)))
+        self.sorted_rain = _replace_sorted(self.sorted_rain, previous_totals[moved], totals[moved])
+        self._totals = totals
+
+        low, high = self.sorted_rain[0], self.sorted_rain[-1]
+        alerts = np.where(in_index, self.alert_sum, 0)
+        alert_total = alerts.sum()
+        scores = (self.rain_weight * (totals - low) / (high - low)
+                  + self.alert_weight * alerts / alert_total)
+
+        # 정규화 기준(최소/최대/전체 특보 수)이 그대로면 값이 바뀐 지점의 점수만 달라짐
+        rescored = ~((scores == self.scores) | (np.isnan(scores) & np.isnan(self.scores)))
+        self.sorted_scores = _replace_sorted(self.sorted_scores, self.scores[rescored], scores[rescored])
+        self.scores = scores
+
+        # 평균 순위 (pd.Series.rank(pct=True)와 같은 동률 처리)
+        left = np.searchsorted(self.sorted_scores, scores, 'left')
+        right = np.searchsorted(self.sorted_scores, scores, 'right')
+        percentile = np.where(in_index, (left + right + 1) / 2 / len(self.sorted_scores) * 100, np.nan)
+        grades = np.where(in_index, assign_grades(percentile, '강수량')[0], 0)
+
+        changed = rescored | ~((percentile == self.percentile) | (np.isnan(percentile) & np.isnan(self.percentile)))
+        self.percentile, self.grades = percentile, grades
+        return np.flatnonzero(changed)
+
+    # ---------------------------
+    # 결과
+    # ---------------------------
+    def station_index(self, stations=None):
+        """
+        지점별 기간 강수량/호우특보/통합점수/백분위/등급
+        Args:
+            stations: 지점 위치 (기본값: 지수 대상 지점 전체)
+        """
+        if stations is None:
+            stations = np.flatnonzero(self.rain_count > 0)
+        return pd.DataFrame({
+            f'{self.period}강수량(mm)': self._totals[stations],
+            f'{self.period} 호우주의보 개수': self.alert_sum[stations],
+            '통합점수': self.scores[stations],
+            INDEX_COL: self.percentile[stations],
+            '강수량등급': self.grades[stations]
+        }, index=pd.Index(self.stations[stations], name='지점정보'))
+
+    def to_tables(self):
+        """20~24_여름 / 여름_강수량_호우_백분위 형태 테이블 (heavy_rain_events.write_table로 저장)"""
+        stations = np.flatnonzero(self.rain_count > 0)
+        j = np.searchsorted(self.years, self.window_years)
+        totals = self.rain[stations][:, j].sum(axis=2)
+        table = pd.DataFrame(totals, columns=[f'{year}강수량(mm)' for year in self.window_years])
+        table.insert(0, '지점정보', self.stations[stations])
+        table[f'{self.period}강수량 총합 (mm)'] = self._totals[stations]
+        table[f'{self.period}강수량 평균 (mm)'] = self._totals[stations] / self.rain_count[stations]
+        counts = self.alerts[stations][:, j].sum(axis=1)
+        for i, kind in enumerate(ALERT_KINDS):
+            table[kind] = counts[:, i]
+        table['호우특보'] = counts.sum(axis=1)
+        return table, build_percentile_table(table, self.rain_weight, self.alert_weight, period=self.period)
+
+    # ---------------------------
+    # 저장
+    # ---------------------------
+    def _config(self):
+        return {'version': STATE_VERSION, 'seasons': self.seasons, 'window': self.window,
+                'rain_weight': self.rain_weight, 'alert_weight': self.alert_weight}
+
+    def save(self, state_dir=STATE_DIR):
+        """상태 저장 (배열은 .npz, 설정/반영한 파일 지문은 매니페스트에 마지막으로 기록)"""
+        os.makedirs(state_dir, exist_ok=True)
+        np.savez(os.path.join(state_dir, 'state.npz'),
+                 codes=self.codes, names=np.asarray(self.names, dtype=str), years=self.years,
+                 rain=self.rain, alerts=self.alerts, alert_keys=self.alert_keys, counted=self.counted,
+                 rain_sum=self.rain_sum, rain_count=self.rain_count, alert_sum=self.alert_sum,
+                 sorted_rain=self.sorted_rain, sorted_scores=self.sorted_scores, totals=self._totals,
+                 scores=self.scores, percentile=self.percentile, grades=self.grades)
+        with open(os.path.join(state_dir, 'state.json'), 'w', encoding='utf-8') as f:
+            json.dump(dict(self._config(), window_years=self.window_years, sources=self.sources),
+                      f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, state_dir=STATE_DIR, **config):
+        """저장된 상태 로드 (없거나 설정이 다르면 빈 상태)"""
+        state = cls(**config)
+        manifest_path = os.path.join(state_dir, 'state.json')
+        state_path = os.path.join(state_dir, 'state.npz')
+        if not (os.path.exists(manifest_path) and os.path.exists(state_path)):
+            return state
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if {key: manifest.get(key) for key in state._config()} != state._config():
+            return state
+
+        with np.load(state_path) as data:
+            for key in ['codes', 'years', 'rain', 'alerts', 'alert_keys', 'counted', 'rain_sum', 'rain_count',
+                        'alert_sum', 'sorted_rain', 'sorted_scores', 'scores', 'percentile', 'grades']:
+                setattr(state, key, data[key])
+            state.names = data['names'].tolist()
+            state._totals = data['totals']
+        state.index = {int(code): i for i, code in enumerate(state.codes)}
+        state.window_years = manifest['window_years']
+        state.sources = manifest['sources']
+        return state
+
+
+
+def _new_sources(state, paths):
+    """지문이 바뀌었거나 처음 보는 파일"""
+    return [path for path in paths if state.sources.get(os.path.normpath(path)) != file_fingerprint(path)]
+
+
+def ingest(weather_paths=None, alert_paths=None, state_dir=STATE_DIR, full=False, save=True, **config):
+    """
+    새 강수량/호우특보 파일만 상태에 반영
+    Args:
+        weather_paths (list): 계절별 강수량 파일 (기본값: weather_rain의 {연도}_{계절}.csv 전체)
+        alert_paths (list): 호우특보 파일 (기본값: heavy_rain의 호우재난_*.csv 전체)
+        full (bool): 저장된 상태를 무시하고 처음부터 반영
+        config: RainfallIndexState 설정 (seasons, window, rain_weight, alert_weight)
+    Returns:
+        (RainfallIndexState, np.ndarray, dict): 상태, 지수가 바뀐 지점 위치, 반영 요약
+    """
+    if weather_paths is None:
+        weather_paths = [path for _, _, path in cube_files(WEATHER_DIR)]
+    if alert_paths is None:
+        alert_paths = alert_files()
+
+    state = RainfallIndexState(**config) if full else RainfallIndexState.load(state_dir, **config)
+    previous_years = list(state.window_years)
+    changed_years = []
+    summary = {'rain_files': 0, 'alert_files': 0, 'alert_days': 0}
+
+    for path in _new_sources(state, weather_paths):
+        match = FILE_PATTERN.match(os.path.basename(path))
+        if match is None:
+            raise ValueError(f"{path}: 계절별 강수량 파일 이름이 아님 ({{연도}}_{{계절}}.csv)")
+        year, season = int(match.group('year')), match.group('season')
+        changed_years.append(state.add_rainfall(read_season_file(path, year, season)))
+        state.sources[os.path.normpath(path)] = file_fingerprint(path)
+        summary['rain_files'] += 1
+
+    for path in _new_sources(state, alert_paths):
+        n_days, years = state.add_alerts(list(iter_alert_events(path)))
+        changed_years.append(years)
+        state.sources[os.path.normpath(path)] = file_fingerprint(path)
+        summary['alert_files'] += 1
+        summary['alert_days'] += n_days
+
+    changed_years = np.unique(np.concatenate(changed_years)) if changed_years else np.zeros(0, dtype=np.int64)
+    affected = state.refresh(previous_years, changed_years)
+    if save and (summary['rain_files'] or summary['alert_files']):
+        state.save(state_dir)
+    return state, affected, summary
+
+
+def refresh_regions(region_values, weights, station_values, stations):
+    """
+    바뀐 지점을 근접 지점으로 쓰는 행정동만 다시 보간
+    Args:
+        region_values (pd.Series): adm_cd2 → 기존 강수량지수
+        weights (pd.DataFrame): rainfall_assignment.load_station_weights 결과
+        station_values (pd.Series): 지점정보 → 갱신된 지수
+        stations: 값이 바뀐 지점정보
+    Returns:
+        (pd.Series, pd.Index): 갱신된 adm_cd2 → 지수, 다시 계산한 adm_cd2
+    """
+    regions = pd.Index(weights.loc[weights['지점정보'].isin(stations), 'adm_cd2'].unique())
+    subset = weights[weights['adm_cd2'].isin(regions)]
+    updated = region_values.copy()
+    updated.loc[regions] = interpolate_by_region(subset, station_values).reindex(regions)
+    return updated, regions
+
+
+def main(state_dir='data/cache/rainfall_state_demo'):
+    """
+    2020~2023 여름 + 호우재난_2.csv로 상태를 만든 뒤 2024 여름 파일을 증분 반영하여
+    원자료 전체 재계산(rainfall_cube.rainfall_index_tables) 결과·시간과 비교
+    """
+    from heavy_rain_events import ALERT_SOURCE, load_alert_events
+    from rainfall_assignment import load_station_weights
+    from rainfall_cube import build_rainfall_cube, rainfall_index_tables
+
+    summers = [path for _, season, path in cube_files(WEATHER_DIR) if season == '여름']
+    start = time.perf_counter()
+    state, _, summary = ingest(summers[:-1], [ALERT_SOURCE], state_dir=state_dir, full=True)
+    print(f"🌧️ 초기 상태 ({state.period}): 강수량 파일 {summary['rain_files']}개, 특보 {summary['alert_days']}일, "
+          f"{(time.perf_counter() - start) * 1000:.0f}ms")
+    before = state.station_index()
+
+    start = time.perf_counter()
+    state, affected, summary = ingest(summers, [ALERT_SOURCE], state_dir=state_dir)
+    incremental_time = time.perf_counter() - start
+    print(f"⚡ 증분 반영 ({state.period}): 새 강수량 파일 {summary['rain_files']}개, "
+          f"지수가 바뀐 지점 {len(affected)}개, {incremental_time * 1000:.1f}ms")
+
+    start = time.perf_counter()
+    cube = build_rainfall_cube()
+    _, expected = rainfall_index_tables(cube, load_alert_events(verbose=False), years=state.window_years)
+    full_time = time.perf_counter() - start
+    expected = expected.dropna(subset=['지점정보']).set_index('지점정보')
+    actual = state.station_index()
+    diff = (actual[INDEX_COL] - expected[INDEX_COL].reindex(actual.index)).abs().max()
+    print(f"   원자료 전체 재계산: {full_time * 1000:.1f}ms, 지점 {len(expected)}개 / {len(actual)}개, "
+          f"백분위 최대 차이 {diff:.2e}")
+
+    start = time.perf_counter()
+    _, repeated, summary = ingest(summers, alert_files(), state_dir=state_dir)
+    print(f"   같은 특보를 담은 파일 {summary['alert_files']}개 추가 반영: 새 특보 {summary['alert_days']}일, "
+          f"바뀐 지점 {len(repeated)}개 ({(time.perf_counter() - start) * 1000:.1f}ms)")
+
+    weights = load_station_weights(verbose=False)
+    old_regions = interpolate_by_region(weights, before[INDEX_COL])
+    start = time.perf_counter()
+    new_regions, regions = refresh_regions(old_regions, weights, actual[INDEX_COL],
+                                           state.stations[affected])
+    refresh_time = time.perf_counter() - start
+    full_regions = interpolate_by_region(weights, actual[INDEX_COL])
+    print(f"   행정동 강수량지수: {len(regions)}개 / {len(old_regions)}개 다시 계산 ({refresh_time * 1000:.1f}ms), "
+          f"전체 보간과 최대 차이 {(new_regions - full_regions).abs().max():.2e}")
+    grades_changed = (assign_grades(new_regions, '강수량')[0] != assign_grades(old_regions, '강수량')[0]).sum()
+    print(f"   강수량등급이 바뀐 행정동: {grades_changed}개")
+
+    # 한 지점 값만 정정된 파일 (최소/최대가 그대로면 그 지점과 순위가 밀린 지점만 바뀜)
+    with tempfile.TemporaryDirectory() as tmp:
+        corrected = read_csv(summers[-1], 'weather_rain')
+        middle = int(np.argsort(corrected.iloc[:, -1].to_numpy())[len(corrected) // 2])
+        corrected.iloc[middle, -1] += 50
+        path = os.path.join(tmp, os.path.basename(summers[-1]))
+        corrected.to_csv(path, index=False, encoding='utf-8-sig')
+
+        start = time.perf_counter()
+        state, affected, _ = ingest(summers[:-1] + [path], [ALERT_SOURCE], state_dir=state_dir)
+        _, regions = refresh_regions(new_regions, weights, state.station_index()[INDEX_COL], state.stations[affected])
+        print(f"   정정 파일 반영 ({corrected.iloc[middle, 0]} +50mm): 지수가 바뀐 지점 {len(affected)}개, "
+              f"행정동 {len(regions)}개 다시 계산 ({(time.perf_counter() - start) * 1000:.1f}ms)")
+    return state
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+행정구역 코드 대응표 (adm_cd2 ↔ 시군구 코드 ↔ 시도 코드)
+KIKcd_H 행정동코드 파일과 행정동 GeoJSON으로 읍면동/시군구/시도 코드표를 한 번 만들어
+Parquet로 저장하고, 이후 데이터 결합은 이름 정규화 대신 정수 코드로 수행
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from geo_cache import file_fingerprint, load_geometry_cache
+from region_resolver import SIDO_FULL_NAMES
+
+KIKCD_PATH = 'data/raw/KIKcd_H.20250714_processed.xlsx'
+CACHE_DIR = 'data/cache/crosswalk'
+CACHE_VERSION = 1
+
+# 코드 자릿수 (adm_cd2 = 시도 2자리 + 시군구 3자리 + 읍면동 5자리)
+SGG_DIVISOR = 10 ** 5
+SIDO_DIVISOR = 10 ** 8
+SGG_SIDO_DIVISOR = 10 ** 3    # 시군구 코드(5자리) → 시도 코드
+
+# KIKcd_H에 없는 시도 명칭 (개편 후 명칭 → 대응표의 명칭)
+SIDO_NAME_ALIASES = {
+    '전북특별자치도': '전라북도',
+    '전북': '전라북도',
+    '강원': '강원특별자치도'
+}
+
+_TABLE_NAMES = ['dong', 'sgg', 'sido']
+
+
+def normalize_gu(names):
+    """시군구명 → 비교 키 (공백 제거, 예: '수원시 장안구' → '수원시장안구')"""
+    return pd.Series(names, dtype=object).fillna('').astype(str).str.replace(r'\s+', '', regex=True)
+
+
+def last_gu(names):
+    """시군구명의 마지막 단위 (예: '수원시 장안구' → '장안구')"""
+    return pd.Series(names, dtype=object).fillna('').astype(str).str.strip().str.split().str[-1].fillna('')
+
+
+def normalize_dong(names):
+    """읍면동명 → 비교 키 ('제1동' → '1동', 가운뎃점/마침표 제거)"""
+    s = pd.Series(names, dtype=object).fillna('').astype(str).str.strip()
+    s = s.str.replace(r'제(\d+)', r'\1', regex=True)
+    return s.str.replace(r'[.·ㆍ]', '', regex=True)
+
+
+def _sido_lineage(sido):
+    """
+    시도 코드 개편 계보 (예: 42 강원도 → 51 강원특별자치도)
+    말소일자와 같은 날 생성되고 이름 앞 두 글자가 같은 코드를 후속 코드로 간주
+    Returns:
+        dict: 이전 코드 → 후속 코드
+    """
+    successors = {}
+    abolished = sido[sido['abolished'] > 0]
+    for _, old in abolished.iterrows():
+        nxt = sido[(sido['created'] == old['abolished']) & (sido['sidonm'].str[:2] == old['sidonm'][:2])]
+        if len(nxt) == 1:
+            successors[int(old['sido_cd'])] = int(nxt['sido_cd'].iloc[0])
+    return successors
+
+
+def _canonical_sido(sido, geo_sido_codes):
+    """
+    시도 코드 → 기준 코드 (GeoJSON에서 쓰는 코드, 없으면 계보의 최신 코드)
+    """
+    successors = _sido_lineage(sido)
+    predecessors = {new: old for old, new in successors.items()}
+    canonical = {}
+    for code in sido['sido_cd'].astype(int):
+        # 계보의 첫 코드부터 끝 코드까지
+        first = code
+        while first in predecessors:
+            first = predecessors[first]
+        chain = [first]
+        while chain[-1] in successors:
+            chain.append(successors[chain[-1]])
+        in_geo = [c for c in chain if c in geo_sido_codes]
+        canonical[code] = in_geo[0] if in_geo else chain[-1]
+    return canonical
+
+
+def build_crosswalk(kikcd_path=KIKCD_PATH, geo_cache=None):
+    """
+    KIKcd_H + GeoJSON → 코드 대응표
+    Returns:
+        dict: 'dong', 'sgg', 'sido' DataFrame
+            dong: adm_cd2, sgg_cd, sido_cd, geo_cd2, geo_sido_cd, sidonm, sggnm, emdnm,
+                  key_gu, key_last_gu, key_dong, created, abolished, in_geo
+            sgg: sgg_cd, sido_cd, geo_sgg_cd, geo_sido_cd, sidonm, sggnm, key_gu, key_last_gu,
+                 created, abolished, in_geo
+            sido: sido_cd, geo_sido_cd, sidonm, created, abolished, in_geo
+        (created/abolished: 생성일자/말소일자 YYYYMMDD, 현행 코드는 abolished = 0)
+    """
+    if geo_cache is None:
+        geo_cache = load_geometry_cache(verbose=False)
+
+    raw = pd.read_excel(kikcd_path)
+    raw = raw[~raw['시도명'].astype(str).str.endswith('출장소')].copy()
+    # 세종특별자치시는 시군구가 없으므로 GeoJSON과 같이 '세종시'로 채움
+    is_sejong = (raw['시도명'] == '세종특별자치시') & (raw['행정동코드'] % SIDO_DIVISOR != 0)
+    raw.loc[is_sejong & raw['시군구명'].isna(), '시군구명'] = '세종시'
+
+    code = raw['행정동코드'].astype(np.int64)
+    base = pd.DataFrame({
+        'adm_cd2': code,
+        'sgg_cd': (code // SGG_DIVISOR).astype(np.int32),
+        'sido_cd': (code // SIDO_DIVISOR).astype(np.int16),
+        'sidonm': raw['시도명'].astype(str),
+        'sggnm': raw['시군구명'],
+        'emdnm': raw['읍면동명'],
+        'created': raw['생성일자'].astype(np.int32),
+        'abolished': raw['말소일자'].fillna(0).astype(np.int32)
+    })
+
+    is_sido = (base['adm_cd2'] % SIDO_DIVISOR == 0) & base['sggnm'].isna()
+    is_sgg = base['sggnm'].notna() & base['emdnm'].isna()
+    is_dong = base['emdnm'].notna()
+
+    geo_codes = set(np.asarray(geo_cache.adm_cd2).astype(np.int64).tolist())
+    geo_sgg = {c // SGG_DIVISOR for c in geo_codes}
+    geo_sido = {c // SIDO_DIVISOR for c in geo_codes}
+
+    sido = base.loc[is_sido, ['sido_cd', 'sidonm', 'created', 'abolished']].reset_index(drop=True)
+    canonical = _canonical_sido(sido, geo_sido)
+    sido['geo_sido_cd'] = sido['sido_cd'].map(canonical).astype(np.int16)
+    sido['in_geo'] = sido['sido_cd'].isin(geo_sido)
+
+    def to_canonical(codes, divisor, known):
+        """시도 부분만 기준 시도 코드로 바꾼 코드 (대응표에 있을 때만)"""
+        codes = np.asarray(codes, dtype=np.int64)
+        prefix = codes // divisor
+        mapped = pd.Series(prefix).map(canonical).fillna(pd.Series(prefix)).to_numpy(np.int64)
+        swapped = mapped * divisor + codes % divisor
+        return np.where(np.isin(swapped, list(known)), swapped, codes)
+
+    sgg = base.loc[is_sgg, ['sgg_cd', 'sido_cd', 'sidonm', 'sggnm', 'created', 'abolished']].reset_index(drop=True)
+    sgg['geo_sgg_cd'] = to_canonical(sgg['sgg_cd'], SGG_SIDO_DIVISOR, set(sgg['sgg_cd']))
+    sgg['geo_sido_cd'] = (sgg['geo_sgg_cd'] // SGG_SIDO_DIVISOR).astype(np.int16)
+    sgg['key_gu'] = normalize_gu(sgg['sggnm']).to_numpy()
+    sgg['key_last_gu'] = last_gu(sgg['sggnm']).to_numpy()
+    sgg['in_geo'] = sgg['sgg_cd'].isin(geo_sgg)
+
+    dong = base.loc[is_dong].reset_index(drop=True)
+    dong['geo_cd2'] = to_canonical(dong['adm_cd2'], SIDO_DIVISOR, set(dong['adm_cd2']))
+    dong['geo_sido_cd'] = (dong['geo_cd2'] // SIDO_DIVISOR).astype(np.int16)
+    dong['key_gu'] = normalize_gu(dong['sggnm']).to_numpy()
+    dong['key_last_gu'] = last_gu(dong['sggnm']).to_numpy()
+    dong['key_dong'] = normalize_dong(dong['emdnm']).to_numpy()
+    dong['in_geo'] = dong['adm_cd2'].isin(geo_codes)
+
+    tables = {'dong': dong, 'sgg': sgg, 'sido': sido}
+    for table in tables.values():
+        for column in ('sidonm', 'sggnm', 'emdnm', 'key_gu', 'key_last_gu', 'key_dong'):
+            if column in table.columns:
+                table[column] = table[column].astype('category')
+    return tables
+
+
+class RegionCrosswalk:
+    """
+    행정구역 코드 대응표
+    - dong / sgg / sido: build_crosswalk 테이블
+    - 이름 → 코드 변환은 모두 기준 코드(GeoJSON에서 쓰는 시도 코드 체계)로 반환, 찾지 못하면 -1
+    - 같은 이름의 코드가 여러 개면 현행 코드, 그다음 최근 생성 코드 우선
+    """
+
+    def __init__(self, tables):
+        self.dong = tables['dong']
+        self.sgg = tables['sgg']
+        self.sido = tables['sido']
+
+        # 시도명(정식/약칭/옛 명칭) → 기준 시도 코드
+        names = dict(zip(self.sido['sidonm'].astype(str), self.sido['geo_sido_cd'].astype(int)))
+        for short, full in list(SIDO_FULL_NAMES.items()) + list(SIDO_NAME_ALIASES.items()):
+            if full in names and short not in names:
+                names[short] = names[full]
+        self.sido_index = names
+
+        self._sgg_keys = {
+            column: self._preferred(self.sgg, ['geo_sido_cd', column], 'geo_sgg_cd')
+            for column in ('key_gu', 'key_last_gu')
+        }
+        self._dong_keys = {
+            column: self._preferred(self.dong, ['geo_sido_cd', column, 'key_dong'], 'geo_cd2')
+            for column in ('key_gu', 'key_last_gu')
+        }
+        # 시군구명이 없는 읍면동용: 시도 안에서 이름이 하나의 코드로만 대응하는 읍면동
+        # (현행 코드끼리 먼저 비교하고, 현행 코드가 없는 이름은 말소 코드까지 비교)
+        by_gu = self._dong_keys['key_gu'].reset_index()
+        current = set(self.dong.loc[self.dong['abolished'] == 0, 'geo_cd2'])
+        by_gu['is_current'] = by_gu['geo_cd2'].isin(current)
+        has_current = by_gu.groupby(['geo_sido_cd', 'key_dong'])['is_current'].transform('any')
+        by_gu = by_gu[by_gu['is_current'] | ~has_current]
+        unique = by_gu.groupby(['geo_sido_cd', 'key_dong'])['geo_cd2'].agg(['nunique', 'first'])
+        self._dong_by_name = unique.loc[unique['nunique'] == 1, 'first']
+
+    def _preferred(self, table, keys, code_column):
+        """키별 대표 코드 (현행 → 최근 생성 순, 키가 겹치면 한 코드만 유지)"""
+        frame = table[[*keys, code_column, 'abolished', 'created']].copy()
+        frame['geo_sido_cd'] = frame['geo_sido_cd'].astype(np.int64)
+        for key in keys[1:]:
+            frame[key] = frame[key].astype(str)
+        frame['is_current'] = frame['abolished'] == 0
+        frame = frame.sort_values(['is_current', 'created']).drop_duplicates(keys, keep='last')
+        return frame.set_index(keys)[code_column]
+
+    def sido_codes(self, sido_names):
+        """시도명 → 기준 시도 코드 (np.ndarray int64)"""
+        names = pd.Series(sido_names, dtype=object).fillna('').astype(str).str.strip()
+        return names.map(self.sido_index).fillna(-1).to_numpy(np.int64)
+
+    def _lookup(self, index, *columns):
+        keys = pd.MultiIndex.from_arrays(columns)
+        return index.reindex(keys).fillna(-1).to_numpy(np.int64)
+
+    def sgg_codes(self, sido_names, sgg_names):
+        """(시도명, 시군구명) → 기준 시군구 코드 (전체 이름 → 마지막 단위 이름 순으로 조회)"""
+        sido = self.sido_codes(sido_names)
+        codes = self._lookup(self._sgg_keys['key_gu'], sido, normalize_gu(sgg_names).to_numpy())
+        missing = codes < 0
+        if missing.any():
+            codes[missing] = self._lookup(self._sgg_keys['key_last_gu'], sido[missing],
+                                          last_gu(pd.Series(sgg_names, dtype=object)[missing]).to_numpy())
+        return codes
+
+    def dong_codes(self, sido_names, sgg_names, dong_names):
+        """(시도명, 시군구명, 읍면동명) → 기준 행정동코드 (adm_cd2)"""
+        sido = self.sido_codes(sido_names)
+        key_dong = normalize_dong(dong_names).to_numpy()
+        codes = self._lookup(self._dong_keys['key_gu'], sido, normalize_gu(sgg_names).to_numpy(), key_dong)
+        missing = codes < 0
+        if missing.any():
+            codes[missing] = self._lookup(self._dong_keys['key_last_gu'], sido[missing],
+                                          last_gu(pd.Series(sgg_names, dtype=object)[missing]).to_numpy(),
+                                          key_dong[missing])
+        blank = (codes < 0) & (normalize_gu(sgg_names).to_numpy() == '')
+        if blank.any():
+            codes[blank] = self._lookup(self._dong_by_name, sido[blank], key_dong[blank])
+        return codes
+
+    def canonical_codes(self, adm_cd2):
+        """행정동코드 → 기준 행정동코드 (예: 51110... → 42110...), 대응표에 없으면 그대로"""
+        codes = np.asarray(pd.to_numeric(pd.Series(adm_cd2), errors='coerce').fillna(-1), dtype=np.int64)
+        mapping = pd.Series(self.dong['geo_cd2'].to_numpy(), index=self.dong['adm_cd2'].to_numpy())
+        return pd.Series(codes).map(mapping).fillna(pd.Series(codes)).to_numpy(np.int64)
+
+    @staticmethod
+    def sgg_of(adm_cd2):
+        """행정동코드 → 시군구 코드"""
+        return np.asarray(adm_cd2, dtype=np.int64) // SGG_DIVISOR
+
+    @staticmethod
+    def sido_of(adm_cd2):
+        """행정동코드 → 시도 코드"""
+        return np.asarray(adm_cd2, dtype=np.int64) // SIDO_DIVISOR
+
+    def active_on(self, date):
+        """기준일(YYYYMMDD)에 유효한 읍면동 코드 행"""
+        dong = self.dong
+        return dong[(dong['created'] <= date) & ((dong['abolished'] == 0) | (dong['abolished'] > date))]
+
+
+def load_crosswalk(kikcd_path=KIKCD_PATH, cache_dir=CACHE_DIR, geo_cache=None, verbose=True):
+    """
+    코드 대응표 로드 (KIKcd_H/GeoJSON 파일이 바뀌었으면 재생성)
+    Returns:
+        RegionCrosswalk
+    """
+    if geo_cache is None:
+        geo_cache = load_geometry_cache(verbose=verbose)
+
+    manifest_path = os.path.join(cache_dir, 'manifest.json')
+    fingerprint = {
+        'version': CACHE_VERSION,
+        'kikcd': file_fingerprint(kikcd_path),
+        'geometry': geo_cache.sources
+    }
+    paths = {name: os.path.join(cache_dir, f'{name}.parquet') for name in _TABLE_NAMES}
+
+    if os.path.exists(manifest_path) and all(os.path.exists(p) for p in paths.values()):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == fingerprint:
+                if verbose:
+                    print(f"⚡ 행정구역 코드 대응표 캐시 사용: {cache_dir}")
+                return RegionCrosswalk({name: pd.read_parquet(p) for name, p in paths.items()})
+
+    tables = build_crosswalk(kikcd_path, geo_cache)
+    os.makedirs(cache_dir, exist_ok=True)
+    for name, path in paths.items():
+        tables[name].to_parquet(path, index=False)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprint, f, ensure_ascii=False, indent=2)
+    if verbose:
+        print(f"✅ 행정구역 코드 대응표 생성: 읍면동 {len(tables['dong']):,}개, "
+              f"시군구 {len(tables['sgg']):,}개, 시도 {len(tables['sido'])}개 → {cache_dir}")
+    return RegionCrosswalk(tables)
+
+
+def main():
+    """대응표 생성 후 사회취약계층표/수도인프라 결과의 이름 → 코드 변환 확인"""
+    import time
+
+    crosswalk = load_crosswalk()
+    print(f"📋 읍면동 {len(crosswalk.dong):,}개 (GeoJSON 포함 {int(crosswalk.dong['in_geo'].sum()):,}개), "
+          f"시군구 {len(crosswalk.sgg):,}개, 시도 {len(crosswalk.sido)}개")
+
+    social = pd.read_csv('data/processed/202506_읍면동_사회취약계층표.csv')
+    start = time.time()
+    codes = crosswalk.dong_codes(social['시도명'], social['시군구명'], social['읍면동명'])
+    elapsed = time.time() - start
+    agree = int((codes == social['행정동코드'].to_numpy()).sum())
+    print(f"🔗 사회취약계층표 이름 → 행정동코드: {agree:,}/{len(social):,}개 일치 ({elapsed * 1000:.0f}ms)")
+
+    sewer = pd.read_csv('results/yunjin/sewer_infrastructure_analysis_summary.csv')
+    sgg = crosswalk.sgg_codes(sewer['시도'], sewer['행정구역명'])
+    dong = crosswalk.dong_codes(sewer['시도'], [''] * len(sewer), sewer['행정구역명'])
+    print(f"🔗 수도인프라 결과 {len(sewer):,}행: 시군구 코드 {int((sgg >= 0).sum()):,}행, "
+          f"읍면동 코드 {int(((sgg < 0) & (dong >= 0)).sum()):,}행, 미대응 {int(((sgg < 0) & (dong < 0)).sum()):,}행")
+    return agree == len(social)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+시군구명 기반 수도인프라지수 매칭기
+create_fixed_integrated_map.py의 6단계 유연 매칭(flexible_sewer_mapping)을
+해시 조회와 시도별 역색인으로 미리 컴파일하여 전체 행정동을 한 번에 매칭
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+# 시도명 정규화 (약칭 → 정식 명칭)
+SIDO_FULL_NAMES = {
+    '서울': '서울특별시',
+    '부산': '부산광역시',
+    '대구': '대구광역시',
+    '인천': '인천광역시',
+    '광주': '광주광역시',
+    '대전': '대전광역시',
+    '울산': '울산광역시',
+    '세종': '세종특별자치시',
+    '경기': '경기도',
+    '강원': '강원도',
+    '충북': '충청북도',
+    '충남': '충청남도',
+    '전북': '전라북도',
+    '전남': '전라남도',
+    '경북': '경상북도',
+    '경남': '경상남도',
+    '제주': '제주특별자치도'
+}
+
+# 시군구명 정규화 패턴 (구분자 추가 등)
+SGG_NAME_PATTERNS = {
+    # 구분자 추가
+    '수원시장안구': '수원시 장안구',
+    '수원시권선구': '수원시 권선구',
+    '수원시팔달구': '수원시 팔달구',
+    '수원시영통구': '수원시 영통구',
+    '성남시수정구': '성남시 수정구',
+    '성남시중원구': '성남시 중원구',
+    '성남시분당구': '성남시 분당구',
+    '안양시만안구': '안양시 만안구',
+    '안양시동안구': '안양시 동안구',
+    '부천시원미구': '부천시 원미구',
+    '부천시소사구': '부천시 소사구',
+    '부천시오정구': '부천시 오정구',
+    '광명시': '광명시',
+    '평택시': '평택시',
+    '동두천시': '동두천시',
+    '안산시상록구': '안산시 상록구',
+    '안산시단원구': '안산시 단원구',
+    '고양시덕양구': '고양시 덕양구',
+    '고양시일산동구': '고양시 일산동구',
+    '고양시일산서구': '고양시 일산서구',
+    '과천시': '과천시',
+    '구리시': '구리시',
+    '남양주시': '남양주시',
+    '오산시': '오산시',
+    '시흥시': '시흥시',
+    '군포시': '군포시',
+    '의왕시': '의왕시',
+    '하남시': '하남시',
+    '용인시처인구': '용인시 처인구',
+    '용인시기흥구': '용인시 기흥구',
+    '용인시수지구': '용인시 수지구',
+    '파주시': '파주시',
+    '이천시': '이천시',
+    '안성시': '안성시',
+    '김포시': '김포시',
+    '화성시': '화성시',
+    '광주시': '광주시',
+    '여주시': '여주시',
+    '부천시': '부천시',
+    '고양시': '고양시',
+    '안산시': '안산시',
+    '용인시': '용인시',
+
+    # 시도명 정규화
+    '세종시': '세종특별자치시',
+}
+
+# 매칭 단계 라벨 (flexible_sewer_mapping의 1~6단계)
+STAGE_EXACT = '정확'
+STAGE_SIDO = '시도정규화'
+STAGE_NORMALIZED = '시군구정규화'
+STAGE_SUBSTRING = '부분일치'
+STAGE_SEJONG = '세종'
+STAGE_KEYWORD = '키워드'
+MATCH_STAGES = [STAGE_EXACT, STAGE_SIDO, STAGE_NORMALIZED, STAGE_SUBSTRING, STAGE_SEJONG, STAGE_KEYWORD]
+
+
+def normalize_sgg_name(sgg_name):
+    """시군구명을 정규화하여 매핑을 개선"""
+    if not sgg_name:
+        return sgg_name
+    return SGG_NAME_PATTERNS.get(sgg_name, sgg_name)
+
+
+def clean_sgg_name(name):
+    """부분 매칭용: 공백과 행정단위 글자(시/구/군/읍/면/동) 제거"""
+    return name.replace(' ', '').replace('시', '').replace('구', '').replace('군', '').replace('읍', '').replace('면', '').replace('동', '')
+
+
+def sgg_keywords(name):
+    """키워드 매칭용: 시/구/군을 구분자로 분리"""
+    return name.replace('시', ' ').replace('구', ' ').replace('군', ' ').split()
+
+
+def _substrings(s):
+    """빈 문자열을 포함한 모든 부분 문자열"""
+    subs = {''}
+    for i in range(len(s)):
+        for j in range(i + 1, len(s) + 1):
+            subs.add(s[i:j])
+    return subs
+
+
+def _put_min(index, key, pos):
+    """key별로 가장 앞선 행 위치만 유지"""
+    if key not in index or pos < index[key]:
+        index[key] = pos
+
+
+def flexible_sewer_mapping(sidonm, sggnm, sewer_dict, sewer_data_unique, return_stage=False):
+    """
+    유연한 수도인프라지수 매핑 함수 (기존 행 단위 구현)
+    SewerRegionResolver의 회귀 비교 기준으로 유지
+    """
+    def result(row, stage):
+        return (row, stage) if return_stage else row
+
+    if not sggnm:
+        return result(None, None)
+
+    # 시도명 매핑 적용
+    mapped_sido = SIDO_FULL_NAMES.get(sidonm, sidonm)
+
+    # 1단계: 정확한 매칭 시도 (원본 시도명)
+    exact_key = (sidonm, sggnm)
+    if exact_key in sewer_dict:
+        return result(sewer_dict[exact_key], STAGE_EXACT)
+
+    # 2단계: 매핑된 시도명으로 정확한 매칭 시도
+    if mapped_sido != sidonm:
+        mapped_key = (mapped_sido, sggnm)
+        if mapped_key in sewer_dict:
+            return result(sewer_dict[mapped_key], STAGE_SIDO)
+
+    # 3단계: 정규화된 시군구명으로 매칭
+    normalized_sggnm = normalize_sgg_name(sggnm)
+    normalized_key = (mapped_sido, normalized_sggnm)
+    if normalized_key in sewer_dict:
+        return result(sewer_dict[normalized_key], STAGE_NORMALIZED)
+
+    # 4단계: 부분 단어 매칭 (시군구명에 포함된 키워드로 검색)
+    sggnm_clean = clean_sgg_name(sggnm)
+
+    # 데이터에서 해당 시도의 모든 행정구역명 확인
+    sido_data = sewer_data_unique[sewer_data_unique['시도'] == mapped_sido]
+
+    for _, row in sido_data.iterrows():
+        data_sggnm = str(row['행정구역명'])
+        data_sggnm_clean = clean_sgg_name(data_sggnm)
+
+        # 부분 매칭 시도 (양방향)
+        if (sggnm_clean in data_sggnm_clean or data_sggnm_clean in sggnm_clean or
+            sggnm in data_sggnm or data_sggnm in sggnm):
+            return result(row.to_dict(), STAGE_SUBSTRING)
+
+    # 5단계: 세종특별자치시 특별 처리
+    if mapped_sido == '세종특별자치시':
+        # 세종시 데이터 찾기 (시군구명에 '세종'이 포함된 경우)
+        for _, row in sewer_data_unique.iterrows():
+            if '세종' in str(row['행정구역명']):
+                return result(row.to_dict(), STAGE_SEJONG)
+
+    # 6단계: 시군구명에서 주요 키워드만 추출하여 매칭
+    # 예: "수원시 장안구" -> "장안", "수원"
+    sggnm_parts = sgg_keywords(sggnm)
+
+    for _, row in sido_data.iterrows():
+        data_sggnm_parts = sgg_keywords(str(row['행정구역명']))
+
+        # 공통 키워드가 있는지 확인
+        common_parts = set(sggnm_parts) & set(data_sggnm_parts)
+        if len(common_parts) > 0:
+            return result(row.to_dict(), STAGE_KEYWORD)
+
+    return result(None, None)
+
+
+class SewerRegionResolver:
+    """
+    수도인프라지수 테이블용 시군구명 매칭기
+    모든 정규화 키를 미리 계산해 두고, 기존 6단계 매칭과 같은 행/단계를 반환
+    (행 위치는 sewer_data_unique 기준, 매칭 실패는 -1)
+    """
+
+    def __init__(self, sewer_data_unique):
+        self.data = sewer_data_unique
+        self.records = sewer_data_unique.to_dict(orient='records')
+
+        sidos = sewer_data_unique['시도'].astype(str).tolist()
+        names = sewer_data_unique['행정구역명'].astype(str).tolist()
+
+        # 1~3단계: (시도, 행정구역명) → 행 위치
+        self.exact_index = {}
+        # 4단계: 시도별 [원본명/정제명 → 첫 행], [원본명/정제명의 부분 문자열 → 첫 행]
+        self.name_index = {}
+        self.clean_index = {}
+        self.name_sub_index = {}
+        self.clean_sub_index = {}
+        # 6단계: 시도별 키워드 역색인
+        self.keyword_index = {}
+        # 5단계: 전체 테이블에서 '세종'이 포함된 첫 행
+        self.sejong_pos = -1
+
+        for pos, (sido, name) in enumerate(zip(sidos, names)):
+            _put_min(self.exact_index, (sido, name), pos)
+
+            clean = clean_sgg_name(name)
+            _put_min(self.name_index.setdefault(sido, {}), name, pos)
+            _put_min(self.clean_index.setdefault(sido, {}), clean, pos)
+
+            name_subs = self.name_sub_index.setdefault(sido, {})
+            for sub in _substrings(name):
+                _put_min(name_subs, sub, pos)
+            clean_subs = self.clean_sub_index.setdefault(sido, {})
+            for sub in _substrings(clean):
+                _put_min(clean_subs, sub, pos)
+
+            keywords = self.keyword_index.setdefault(sido, {})
+            for word in sgg_keywords(name):
+                _put_min(keywords, word, pos)
+
+            if self.sejong_pos < 0 and '세종' in name:
+                self.sejong_pos = pos
+
+    def _first_contained(self, index, text):
+        """text의 부분 문자열과 같은 키 중 가장 앞선 행 위치"""
+        best = -1
+        for sub in _substrings(text):
+            pos = index.get(sub)
+            if pos is not None and (best < 0 or pos < best):
+                best = pos
+        return best
+
+    def resolve(self, sidonm, sggnm):
+        """한 행정동 매칭 → (행 위치, 매칭 단계)"""
+        if not sggnm:
+            return -1, None
+
+        mapped_sido = SIDO_FULL_NAMES.get(sidonm, sidonm)
+
+        pos = self.exact_index.get((sidonm, sggnm))
+        if pos is not None:
+            return pos, STAGE_EXACT
+
+        if mapped_sido != sidonm:
+            pos = self.exact_index.get((mapped_sido, sggnm))
+            if pos is not None:
+                return pos, STAGE_SIDO
+
+        pos = self.exact_index.get((mapped_sido, normalize_sgg_name(sggnm)))
+        if pos is not None:
+            return pos, STAGE_NORMALIZED
+
+        # 4단계: 네 가지 포함 관계 중 하나라도 만족하는 첫 행
+        sggnm_clean = clean_sgg_name(sggnm)
+        candidates = [
+            self.clean_sub_index.get(mapped_sido, {}).get(sggnm_clean, -1),
+            self._first_contained(self.clean_index.get(mapped_sido, {}), sggnm_clean),
+            self.name_sub_index.get(mapped_sido, {}).get(sggnm, -1),
+            self._first_contained(self.name_index.get(mapped_sido, {}), sggnm),
+        ]
+        candidates = [c for c in candidates if c >= 0]
+        if candidates:
+            return min(candidates), STAGE_SUBSTRING
+
+        if mapped_sido == '세종특별자치시' and self.sejong_pos >= 0:
+            return self.sejong_pos, STAGE_SEJONG
+
+        keywords = self.keyword_index.get(mapped_sido, {})
+        candidates = [keywords[w] for w in sgg_keywords(sggnm) if w in keywords]
+        if candidates:
+            return min(candidates), STAGE_KEYWORD
+
+        return -1, None
+
+    def resolve_batch(self, sidonms, sggnms):
+        """
+        전체 행정동 일괄 매칭
+        Returns:
+            (np.ndarray 행 위치, np.ndarray 매칭 단계)
+        """
+        memo = {}
+        positions = np.full(len(sidonms), -1, dtype=np.int64)
+        stages = np.empty(len(sidonms), dtype=object)
+        for i, key in enumerate(zip(sidonms, sggnms)):
+            if key not in memo:
+                memo[key] = self.resolve(*key)
+            positions[i], stages[i] = memo[key]
+        return positions, stages
+
+    def row(self, pos):
+        """행 위치 → 행 딕셔너리 (실패 시 None)"""
+        return self.records[pos] if pos >= 0 else None
+
+
+def main():
+    """기존 flexible_sewer_mapping과 결과 비교 (회귀 확인)"""
+    import time
+    from geo_cache import load_geometry_cache
+
+    sewer_data = pd.read_csv('results/yunjin/sewer_infrastructure_analysis_summary.csv')
+    sewer_data_unique = sewer_data.drop_duplicates(subset=['시도', '행정구역명']).copy()
+    sewer_data_unique['시도'] = sewer_data_unique['시도'].astype(str)
+    sewer_data_unique['행정구역명'] = sewer_data_unique['행정구역명'].astype(str)
+    sewer_dict = sewer_data_unique.set_index(['시도', '행정구역명']).to_dict(orient='index')
+
+    cache = load_geometry_cache(verbose=False)
+    sidonms = [p.get('sidonm', '') for p in cache.properties]
+    # 시도명을 제외한 행정구역명 (create_fixed_integrated_map.extract_sgg_name과 동일)
+    sggnms = [' '.join(p.get('adm_nm', '').split()[1:]) or p.get('adm_nm', '') for p in cache.properties]
+
+    start = time.time()
+    legacy = [flexible_sewer_mapping(s, g, sewer_dict, sewer_data_unique, return_stage=True)
+              for s, g in zip(sidonms, sggnms)]
+    legacy_time = time.time() - start
+
+    start = time.time()
+    resolver = SewerRegionResolver(sewer_data_unique)
+    positions, stages = resolver.resolve_batch(sidonms, sggnms)
+    resolver_time = time.time() - start
+
+    mismatches = 0
+    for (row, stage), pos, new_stage in zip(legacy, positions, stages):
+        new_row = resolver.row(pos)
+        # 1~3단계 결과에는 인덱스 컬럼(시도, 행정구역명)이 없으므로 공통 컬럼만 비교
+        same_row = (row is None and new_row is None) or (
+            row is not None and new_row is not None and
+            all(row[c] == new_row[c] for c in row if c in new_row)
+        )
+        if not same_row or stage != new_stage:
+            mismatches += 1
+
+    print(f"기존 매칭: {legacy_time:.2f}초, 컴파일 매칭: {resolver_time:.3f}초")
+    print(f"비교 대상 {len(sggnms)}개 행정동, 불일치 {mismatches}개")
+    print(pd.Series(stages).value_counts(dropna=False).to_string())
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+지도용 지역 집계 (시도별 평균 / 지수별 상위 k개)
+행정동(또는 원천 데이터) 표 하나에서 시도 코드(pd.factorize)별 bincount로 모든 지수의 합계·개수를 한 번에 구하고,
+상위 k개는 전체 정렬 대신 np.partition으로 후보만 골라 정렬
+- 결과는 지도 HTML 템플릿이 쓰는 형태 그대로 ({'region', 'value'} 목록 / {시도: {'avg_*': 값}})
+- 같은 값은 원래 행 순서를 유지 (기존 list.sort 안정 정렬과 같은 순서)
+"""
+
+import numpy as np
+import pandas as pd
+
+TOP_K = 10
+TOTAL_LABEL = '전국'
+
+# 지도 템플릿의 시도별 통계 키 → 행정동 지수 열
+SIDO_STAT_COLUMNS = {
+    'avg_housing': '주거취약지수',
+    'avg_sewer': '수도인프라지수',
+    'avg_social': '사회취약지수',
+    'avg_rainfall': '강수량지수'
+}
+
+
+def top_k_positions(values, k=TOP_K, ascending=False, positive_only=False):
+    """
+    값 배열에서 상위 k개의 위치 (결측값 제외, 같은 값은 앞선 위치 우선)
+    Args:
+        values: 값 배열
+        ascending (bool): True면 낮은 값부터
+        positive_only (bool): True면 0보다 큰 값만 후보
+    Returns:
+        np.ndarray: 순서대로 정렬된 위치 (최대 k개)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    if positive_only:
+        valid &= values > 0
+    positions = np.flatnonzero(valid)
+    keys = values[positions] if ascending else -values[positions]
+
+    if len(positions) > k > 0:
+        # k번째 값 이하(동률 포함)만 남긴 뒤 정렬
+        kth = np.partition(keys, k - 1)[k - 1]
+        candidates = keys <= kth
+        positions, keys = positions[candidates], keys[candidates]
+    order = np.lexsort((positions, keys))[:k]
+    return positions[order]
+
+
+def top_k_records(frame, value_col, name_col, k=TOP_K, ascending=False, positive_only=False):
+    """표에서 상위 k개 → [{'region': 이름, 'value': 값}, ...]"""
+    positions = top_k_positions(frame[value_col].to_numpy(), k, ascending, positive_only)
+    names = frame[name_col].to_numpy()[positions].tolist()
+    values = frame[value_col].to_numpy()[positions].tolist()
+    return [{'region': name, 'value': value} for name, value in zip(names, values)]
+
+
+def top_k_table(frame, columns, name_col, k=TOP_K, positive_only=False):
+    """
+    여러 지수의 상위 k개를 한 번에
+    Args:
+        columns (dict): 결과 키 → 값 열 (예: {'housing': '주거취약지수'})
+    Returns:
+        dict: 결과 키 → [{'region', 'value'}, ...]
+    """
+    return {key: top_k_records(frame, column, name_col, k, positive_only=positive_only)
+            for key, column in columns.items()}
+
+
+def group_means(frame, group_col, columns=None, groups=None, total_label=TOTAL_LABEL, fill=0):
+    """
+    시도별 평균 (한 번의 그룹 코드화로 모든 지수의 합계·개수 계산)
+    Args:
+        frame (pd.DataFrame): 행정동별 지수
+        group_col (str): 시도 열
+        columns (dict): 결과 키 → 값 열 (기본값: SIDO_STAT_COLUMNS)
+        groups (list): 결과에 넣을 시도 순서 (기본값: 표에 나온 순서, 빈 이름 제외)
+        total_label (str): 전체 평균 키 (None이면 생략)
+        fill: 값이 없는 시도/지수의 평균
+    Returns:
+        dict: {시도: {결과 키: 평균}}
+    """
+    if columns is None:
+        columns = SIDO_STAT_COLUMNS
+    keys = frame[group_col].fillna('').astype(str).to_numpy()
+    codes, uniques = pd.factorize(keys)
+    if groups is None:
+        groups = [g for g in uniques if g]
+
+    # 시도 코드별 합계·개수 (지수 열마다 bincount 한 번)
+    values = frame[list(columns.values())].to_numpy(dtype=np.float64)
+    present = ~np.isnan(values)
+    sums = np.column_stack([np.bincount(codes, np.where(present[:, j], values[:, j], 0.0), len(uniques))
+                            for j in range(values.shape[1])])
+    counts = np.column_stack([np.bincount(codes, present[:, j], len(uniques)) for j in range(values.shape[1])])
+
+    def means(total, count):
+        return {key: float(total[j] / count[j]) if count[j] > 0 else fill for j, key in enumerate(columns)}
+
+    stats = {}
+    if total_label is not None:
+        stats[total_label] = means(sums.sum(axis=0), counts.sum(axis=0))
+    position = {g: i for i, g in enumerate(uniques)}
+    zero = np.zeros(len(columns))
+    for group in groups:
+        i = position.get(group)
+        stats[group] = means(zero, zero) if i is None else means(sums[i], counts[i])
+    return stats
+
+
+def main():
+    """행정동별 지수 결과로 기존 전체 정렬/시도별 반복 계산과 결과·시간 비교"""
+    import time
+
+    from weight_sensitivity import SCORES_PATH
+
+    table = pd.read_csv(SCORES_PATH, dtype={'adm_cd2': str}, encoding='utf-8-sig')
+    columns = dict(SIDO_STAT_COLUMNS, avg_integrated='통합취약도')
+    features = table.to_dict(orient='records')
+    print(f"📊 지역 집계: {len(table):,}개 행정동 × {len(columns)}개 지수")
+
+    start = time.time()
+    legacy_top = {}
+    for key, col in columns.items():
+        rows = [{'region': f['adm_nm'], 'value': f[col]} for f in features if f[col] > 0]
+        rows.sort(key=lambda x: x['value'], reverse=True)
+        legacy_top[key] = rows[:TOP_K]
+    sidos = [TOTAL_LABEL] + [s for s in pd.unique(table['sidonm']) if s]
+    legacy_stats = {}
+    for sido in sidos:
+        subset = features if sido == TOTAL_LABEL else [f for f in features if f['sidonm'] == sido]
+        legacy_stats[sido] = {key: sum(f[col] for f in subset) / len(subset) for key, col in columns.items()}
+    legacy_time = time.time() - start
+
+    start = time.time()
+    top = top_k_table(table, columns, 'adm_nm', positive_only=True)
+    stats = group_means(table, 'sidonm', columns)
+    new_time = time.time() - start
+
+    diff = max(abs(stats[s][k] - legacy_stats[s][k]) for s in sidos for k in columns)
+    print(f"   - 기존 (정렬 + 시도별 반복): {legacy_time * 1000:.1f}ms")
+    print(f"   - factorize/bincount + partition: {new_time * 1000:.1f}ms")
+    print(f"   - 상위 {TOP_K}개 일치: {'예' if top == legacy_top else '아니오'}, 시도 평균 최대 차이: {diff:.2e}")
+    return top, stats
+
+
+if __name__ == "__main__":
+    main()
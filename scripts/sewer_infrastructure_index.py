@@ -4,12 +4,21 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.preprocessing import MinMaxScaler
 import warnings
+from csv_ingest import read_csv
 warnings.filterwarnings('ignore')
 
 # 한글 폰트 설정
 plt.rcParams['font.family'] = 'NanumGothic'
 plt.rcParams['axes.unicode_minus'] = False
 
+# 하수도 인프라 지수 기본 가중치 (calculate_infrastructure_index, pipeline.py에서 사용)
+SEWER_WEIGHTS = {
+    '하수도설치율': 0.3,
+    '공공하수처리구역 인구보급률': 0.3,
+    '고도처리인구 보급률': 0.2,
+    '인구밀도_정규화': 0.2
+}
+
 class SewerInfrastructureIndex:
     """
     하수도 인프라 지수 계산 클래스
@@ -29,7 +38,7 @@ class SewerInfrastructureIndex:
     def load_data(self):
         """데이터 로드"""
         try:
-            self.df = pd.read_csv(self.data_path, encoding='utf-8')
+            self.df = read_csv(self.data_path)
             print(f"데이터 로드 완료: {len(self.df)}개 행, {len(self.df.columns)}개 컬럼")
             return True
         except Exception as e:
@@ -87,15 +96,10 @@ class SewerInfrastructureIndex:
         """
         하수도 인프라 지수 계산
         Args:
-            weights (dict): 각 지표별 가중치
+            weights (dict): 각 지표별 가중치 (기본값: SEWER_WEIGHTS)
         """
         if weights is None:
-            weights = {
-                '하수도설치율': 0.3,
-                '공공하수처리구역 인구보급률': 0.3,
-                '고도처리인구 보급률': 0.2,
-                '인구밀도_정규화': 0.2
-            }
+            weights = SEWER_WEIGHTS
         
         print("=== 하수도 인프라 지수 계산 ===")
         
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+행정동 인접 행렬 (공간 가중치)
+지오메트리 캐시의 모든 정점을 격자 좌표 정수 키(해시)로 바꿔 같은 키를 가진 행정동끼리만 짝지으므로
+폴리곤 쌍 교차 검사 없이 정점/간선 수에 비례하는 시간으로 인접 관계를 구함
+- queen: 정점을 하나라도 공유하면 인접
+- rook: 간선(연속한 두 정점)을 공유하면 인접
+- adm_cd2 순서의 scipy.sparse CSR 행렬로 data/cache/contiguity/에 저장 (지오메트리가 바뀌면 재생성)
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from geo_cache import load_geometry_cache
+
+CACHE_DIR = 'data/cache/contiguity'
+CACHE_VERSION = 1
+
+# 정점 키 격자 (소수 7자리 ≈ 1cm, 인접 행정동 경계는 같은 좌표를 공유)
+DECIMALS = 7
+CONTIGUITY_KINDS = ['queen', 'rook']
+
+
+def vertex_keys(coords, decimals=DECIMALS):
+    """좌표 → 격자 정수 키 (경도/위도 정수를 상위/하위 32비트에 배치)"""
+    q = np.round(np.asarray(coords, dtype=np.float64) * 10 ** decimals).astype(np.int64)
+    return (q[:, 0] << 32) | (q[:, 1] & 0xFFFFFFFF)
+
+
+def _shared_pairs(keys, owners, n_owners):
+    """
+    같은 키를 가진 서로 다른 소유자(행정동) 쌍 (i < j, 중복 제거)
+    키 정렬 후 같은 키 묶음 안에서 d칸 떨어진 행끼리 짝지음 (d는 가장 큰 묶음 크기까지)
+    """
+    # 키 순 정렬 후 (키, 소유자) 중복 제거
+    order = np.lexsort((owners, keys))
+    keys, owners = keys[order], owners[order]
+    first = np.r_[True, (keys[1:] != keys[:-1]) | (owners[1:] != owners[:-1])]
+    keys, owners = keys[first], owners[first]
+    pairs = []
+    d = 1
+    while d < len(keys):
+        same = keys[d:] == keys[:-d]
+        if not same.any():
+            break
+        pairs.append(np.column_stack([owners[:-d][same], owners[d:][same]]))
+        d += 1
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    codes = np.unique(pairs[:, 0] * n_owners + pairs[:, 1])
+    return np.column_stack([codes // n_owners, codes % n_owners])
+
+
+def contiguity_pairs(geo_cache, kind='queen', decimals=DECIMALS):
+    """
+    인접 행정동 쌍 (행정동 번호, i < j)
+    Args:
+        geo_cache (GeometryCache): 행정동 지오메트리
+        kind (str): 'queen' (정점 공유) 또는 'rook' (간선 공유)
+    """
+    if kind not in CONTIGUITY_KINDS:
+        raise ValueError(f"알 수 없는 인접 기준: {kind} (사용 가능: {', '.join(CONTIGUITY_KINDS)})")
+    start, end = geo_cache.feature_coord_ranges()
+    owners = np.repeat(np.arange(len(geo_cache)), end - start)
+    keys = vertex_keys(geo_cache.coords, decimals)
+    if kind == 'queen':
+        return _shared_pairs(keys, owners, len(geo_cache))
+
+    # 간선 키: 같은 링 안의 연속한 두 정점 번호를 방향 없이 묶음
+    _, vertex_ids = np.unique(keys, return_inverse=True)
+    is_start = np.ones(len(keys), dtype=bool)
+    is_start[np.asarray(geo_cache.ring_offsets[1:]) - 1] = False
+    a = vertex_ids[:-1][is_start[:-1]]
+    b = vertex_ids[1:][is_start[:-1]]
+    valid = a != b
+    lo, hi = np.minimum(a, b)[valid], np.maximum(a, b)[valid]
+    edge_keys = lo * (vertex_ids.max() + 1) + hi
+    return _shared_pairs(edge_keys, owners[:-1][is_start[:-1]][valid], len(geo_cache))
+
+
+class SpatialWeights:
+    """
+    adm_cd2 순서의 인접 행렬
+    - matrix: (행정동 수, 행정동 수) CSR, 인접하면 1 (대칭, 대각 0)
+    - adm_cd2: 행/열 순서의 행정동코드
+    """
+
+    def __init__(self, matrix, adm_cd2, kind):
+        self.matrix = matrix.tocsr()
+        self.adm_cd2 = np.asarray(adm_cd2, dtype=str)
+        self.kind = kind
+        self.index = {code: i for i, code in enumerate(self.adm_cd2)}
+
+    def __len__(self):
+        return len(self.adm_cd2)
+
+    def cardinalities(self):
+        """행정동별 이웃 수 (pd.Series, adm_cd2 인덱스)"""
+        return pd.Series(np.diff(self.matrix.indptr), index=self.adm_cd2, name='이웃수')
+
+    def islands(self):
+        """이웃이 없는 행정동코드"""
+        return self.adm_cd2[np.diff(self.matrix.indptr) == 0]
+
+    def neighbors(self, adm_cd2):
+        """인접 행정동코드 목록"""
+        i = self.index[str(adm_cd2)]
+        return self.adm_cd2[self.matrix.indices[self.matrix.indptr[i]:self.matrix.indptr[i + 1]]].tolist()
+
+    def row_standardized(self):
+        """행 합이 1인 가중치 행렬 (이웃이 없는 행은 0)"""
+        counts = np.diff(self.matrix.indptr)
+        scale = np.divide(1.0, counts, out=np.zeros(len(counts)), where=counts > 0)
+        return sparse.diags(scale) @ self.matrix
+
+    def lag(self, values):
+        """
+        공간 시차 (이웃 값의 평균, 값이 없는 이웃은 제외하고 이웃이 없으면 NaN)
+        Args:
+            values (pd.Series): adm_cd2 → 값
+        Returns:
+            pd.Series: adm_cd2 → 이웃 평균
+        """
+        x = values.reindex(self.adm_cd2).to_numpy(dtype=np.float64)
+        present = ~np.isnan(x)
+        sums = self.matrix @ np.where(present, x, 0.0)
+        counts = self.matrix @ present.astype(np.float64)
+        return pd.Series(np.divide(sums, counts, out=np.full(len(x), np.nan), where=counts > 0),
+                         index=self.adm_cd2, name=values.name)
+
+
+def build_spatial_weights(geo_cache, kind='queen', decimals=DECIMALS):
+    """지오메트리 캐시 → SpatialWeights (대칭 CSR)"""
+    pairs = contiguity_pairs(geo_cache, kind, decimals)
+    n = len(geo_cache)
+    rows = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    cols = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    matrix.sort_indices()
+    return SpatialWeights(matrix, geo_cache.adm_cd2, kind)
+
+
+def load_spatial_weights(kind='queen', geo_cache=None, cache_dir=CACHE_DIR, verbose=True):
+    """
+    adm_cd2 인접 행렬 로드 (지오메트리 파일이 바뀌었으면 재생성)
+    Args:
+        kind (str): 'queen' 또는 'rook'
+    """
+    matrix_path = os.path.join(cache_dir, f'{kind}.npz')
+    codes_path = os.path.join(cache_dir, f'{kind}_adm_cd2.npy')
+    manifest_path = os.path.join(cache_dir, f'{kind}.json')
+
+    if geo_cache is None:
+        geo_cache = load_geometry_cache(verbose=verbose)
+    fingerprint = {'version': CACHE_VERSION, 'kind': kind, 'decimals': DECIMALS, 'geometry': geo_cache.sources}
+
+    if os.path.exists(manifest_path) and os.path.exists(matrix_path) and os.path.exists(codes_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == fingerprint:
+                if verbose:
+                    print(f"⚡ 인접 행렬 캐시 사용: {matrix_path}")
+                return SpatialWeights(sparse.load_npz(matrix_path), np.load(codes_path), kind)
+
+    weights = build_spatial_weights(geo_cache, kind)
+    os.makedirs(cache_dir, exist_ok=True)
+    sparse.save_npz(matrix_path, weights.matrix, compressed=False)
+    np.save(codes_path, weights.adm_cd2)
+    # 매니페스트는 마지막에 기록 (중간에 실패하면 다음 실행에서 재생성)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprint, f, ensure_ascii=False, indent=2)
+    if verbose:
+        print(f"✅ {kind} 인접 행렬 생성: 행정동 {len(weights)}개, 인접 쌍 {weights.matrix.nnz // 2:,}개 → {matrix_path}")
+    return weights
+
+
+def main(n_check=300, seed=42):
+    """queen/rook 인접 행렬 생성·로드 시간, 정점 집합 직접 비교 결과와 이웃 수 분포 출력"""
+    import time
+
+    geo_cache = load_geometry_cache(verbose=False)
+    for kind in CONTIGUITY_KINDS:
+        start = time.perf_counter()
+        weights = build_spatial_weights(geo_cache, kind)
+        build_time = time.perf_counter() - start
+        load_spatial_weights(kind, geo_cache, verbose=False)
+        start = time.perf_counter()
+        weights = load_spatial_weights(kind, geo_cache, verbose=False)
+        load_time = time.perf_counter() - start
+        counts = weights.cardinalities()
+        print(f"🧭 {kind}: 생성 {build_time:.2f}초, 로드 {load_time * 1000:.1f}ms, 인접 쌍 {weights.matrix.nnz // 2:,}개, "
+              f"평균 이웃 {counts.mean():.2f}개 (최대 {counts.max()}), 이웃 없는 행정동 {len(weights.islands())}개")
+
+    # 일부 행정동을 골라 경계 상자가 겹치는 모든 행정동과 정점 집합을 직접 비교 (queen)
+    queen = load_spatial_weights('queen', geo_cache, verbose=False)
+    rook = load_spatial_weights('rook', geo_cache, verbose=False)
+    start_pos, end_pos = geo_cache.feature_coord_ranges()
+    coords = np.asarray(geo_cache.coords)
+    bounds = geo_cache.bounds()
+
+    def vertex_set(i):
+        return set(vertex_keys(coords[start_pos[i]:end_pos[i]]).tolist())
+
+    rng = np.random.default_rng(seed)
+    mismatched = 0
+    for i in rng.choice(len(geo_cache), min(n_check, len(geo_cache)), replace=False):
+        overlap = np.flatnonzero((bounds[:, 0] <= bounds[i, 2]) & (bounds[i, 0] <= bounds[:, 2])
+                                 & (bounds[:, 1] <= bounds[i, 3]) & (bounds[i, 1] <= bounds[:, 3]))
+        own = vertex_set(i)
+        expected = sorted(geo_cache.adm_cd2[j] for j in overlap if j != i and own & vertex_set(j))
+        mismatched += sorted(queen.neighbors(geo_cache.adm_cd2[i])) != expected
+    print(f"   행정동 {n_check}개 정점 집합 직접 비교 (queen): 불일치 {mismatched}개, "
+          f"rook ⊆ queen: {'예' if (rook.matrix > queen.matrix).nnz == 0 else '아니오'}")
+
+    sido = pd.Series([p.get('sidonm', '') for p in geo_cache.properties], index=geo_cache.adm_cd2)
+    rows, cols = queen.matrix.nonzero()
+    print(f"   시도 경계를 넘는 인접 쌍: {int((sido.to_numpy()[rows] != sido.to_numpy()[cols]).sum()) // 2}개")
+    return queen, rook
+
+
+if __name__ == "__main__":
+    main()
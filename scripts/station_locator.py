@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+기상관측 지점 → 행정동(adm_cd2) 위치 판정
+행정동 경계 상자로 STR-tree(Sort-Tile-Recursive로 묶은 정적 R-tree)를 만들어 지점마다 후보 행정동을 고르고,
+geo_cache의 평탄화 좌표 배열에서 후보의 모든 변에 대해 반직선 교차 횟수(짝홀 규칙)를 한 번에 계산
+- 구멍(내부 링)과 MultiPolygon도 같은 짝홀 규칙으로 처리
+- 해안선 바로 밖에 있는 지점은 tolerance_km 안의 가장 가까운 정점이 속한 행정동으로 할당 ('인접')
+- 시도 GeoJSON이 없는 지역의 지점은 STATION_SIDO의 지점번호 → 시도로 sidonm만 채움 ('시도 목록')
+- 결과 테이블(지점번호, 지점정보, 경도, 위도, adm_cd2, adm_nm, sidonm, sggnm, 판정)은 data/cache/stations/에 저장
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from geo_cache import file_fingerprint, load_geometry_cache
+from heavy_rain_events import normalize_station
+from rainfall_assignment import WEATHER_DIR, load_station_coords, station_files, to_km
+
+CACHE_DIR = 'data/cache/stations'
+CACHE_VERSION = 2
+NODE_CAPACITY = 16
+TOLERANCE_KM = 2.0
+
+# 한 번에 펼칠 (점, 변) 쌍 수 (메모리 상한)
+EDGE_CHUNK = 2_000_000
+
+REGION_COLUMNS = ['adm_cd2', 'adm_nm', 'sidonm', 'sggnm']
+
+# 지점번호 → 시도: 시도 GeoJSON이 없어 지오메트리로 판정할 수 없는 지점만 (현재 전라남도/경상북도 파일 없음)
+# 해당 GeoJSON이 추가되면 지오메트리 판정이 우선하고 이 목록은 쓰이지 않음
+STATION_SIDO = {
+    # 목포, 여수, 흑산도, 완도, 순천, 영광군, 보성군, 강진군, 장흥, 해남, 고흥, 광양시, 진도군
+    '전라남도': [165, 168, 169, 170, 174, 252, 258, 259, 260, 261, 262, 266, 268],
+    # 울릉도, 울진, 안동, 상주, 포항, 봉화, 영주, 문경, 청송군, 영덕, 의성, 구미, 영천, 경주시
+    '경상북도': [115, 130, 136, 137, 138, 271, 272, 273, 276, 277, 278, 279, 281, 283]
+}
+
+
+def _str_order(boxes, capacity):
+    """STR 순서: 중심 x로 세로 띠를 나누고 띠 안에서 중심 y로 정렬"""
+    n = len(boxes)
+    n_nodes = -(-n // capacity)
+    slice_size = capacity * int(np.ceil(np.sqrt(n_nodes)))
+    cx = (boxes[:, 0] + boxes[:, 2]) / 2
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2
+    by_x = np.argsort(cx, kind='stable')
+    slices = np.arange(n) // slice_size
+    return by_x[np.lexsort((cy[by_x], slices))]
+
+
+def _group_boxes(boxes, capacity):
+    """연속된 capacity개씩 묶은 노드의 (경계 상자, 자식 시작 위치, 자식 수)"""
+    starts = np.arange(0, len(boxes), capacity)
+    return (np.column_stack([np.minimum.reduceat(boxes[:, 0], starts), np.minimum.reduceat(boxes[:, 1], starts),
+                             np.maximum.reduceat(boxes[:, 2], starts), np.maximum.reduceat(boxes[:, 3], starts)]),
+            starts, np.minimum(capacity, len(boxes) - starts))
+
+
+def _contains(boxes, points):
+    return ((boxes[:, 0] <= points[:, 0]) & (points[:, 0] <= boxes[:, 2])
+            & (boxes[:, 1] <= points[:, 1]) & (points[:, 1] <= boxes[:, 3]))
+
+
+def _expand(parents, starts, counts):
+    """(부모 행, 자식 시작/개수) → 자식마다 한 행 (부모 행 위치, 자식 위치)"""
+    rows = np.repeat(np.arange(len(parents)), counts)
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    return rows, np.repeat(starts, counts) + np.arange(counts.sum()) - first
+
+
+class STRTree:
+    """
+    경계 상자 정적 R-tree (Sort-Tile-Recursive 묶음)
+    - items: 잎 순서의 원래 상자 번호
+    - levels: 위에서부터 노드별 (경계 상자, 자식 시작 위치, 자식 수), 맨 아래 노드의 자식은 items 위치
+    """
+
+    def __init__(self, bounds, capacity=NODE_CAPACITY):
+        self.bounds = np.asarray(bounds, dtype=np.float64)
+        self.items = _str_order(self.bounds, capacity) if len(self.bounds) else np.zeros(0, dtype=np.int64)
+        levels = []
+        boxes = self.bounds[self.items]
+        while len(boxes) > 1 or not levels:
+            node_boxes, starts, counts = _group_boxes(boxes, capacity) if len(boxes) else (
+                np.empty((0, 4)), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+            # 상위 단계도 STR 순서로 다시 묶음 (자식 범위는 노드와 함께 이동)
+            order = _str_order(node_boxes, capacity) if len(node_boxes) > capacity else np.arange(len(node_boxes))
+            levels.append((node_boxes[order], starts[order], counts[order]))
+            boxes = node_boxes[order]
+        self.levels = levels[::-1]
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def query_points(self, points):
+        """
+        점을 포함하는 경계 상자 후보
+        Args:
+            points (np.ndarray): (점 수, 2) 경도/위도
+        Returns:
+            (np.ndarray, np.ndarray): 후보 쌍의 점 번호, 상자 번호
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        point_ids = np.arange(len(points))
+        nodes = np.zeros(len(points), dtype=np.int64)
+        for boxes, starts, counts in self.levels:
+            if not len(boxes):
+                break
+            hit = _contains(boxes[nodes], points[point_ids])
+            point_ids, nodes = point_ids[hit], nodes[hit]
+            rows, nodes = _expand(nodes, starts[nodes], counts[nodes])
+            point_ids = point_ids[rows]
+        items = self.items[nodes] if len(self.items) else nodes
+        hit = _contains(self.bounds[items], points[point_ids])
+        return point_ids[hit], items[hit]
+
+
+class PolygonIndex:
+    """행정동 지오메트리 점 포함 판정 (STR-tree 후보 + 변 배열 반직선 교차)"""
+
+    def __init__(self, geo_cache, capacity=NODE_CAPACITY):
+        self.geo_cache = geo_cache
+        self.tree = STRTree(geo_cache.bounds(), capacity)
+        coords = np.asarray(geo_cache.coords)
+        # 링의 마지막 정점(= 첫 정점)에서 시작하는 변은 다음 링으로 넘어가므로 제외
+        is_start = np.ones(len(coords), dtype=bool)
+        is_start[np.asarray(geo_cache.ring_offsets[1:]) - 1] = False
+        self.edges = np.flatnonzero(is_start)
+        self.x0, self.y0 = coords[self.edges, 0], coords[self.edges, 1]
+        self.x1, self.y1 = coords[self.edges + 1, 0], coords[self.edges + 1, 1]
+        start, end = geo_cache.feature_coord_ranges()
+        self.edge_offsets = np.searchsorted(self.edges, np.r_[start, end[-1:] if len(end) else []])
+
+    def contains(self, point_ids, features, points):
+        """(점, 행정동) 쌍별 포함 여부 (경계 위의 점은 한쪽 행정동에만 포함)"""
+        inside = np.zeros(len(point_ids), dtype=bool)
+        counts = self.edge_offsets[features + 1] - self.edge_offsets[features]
+        # 변이 많은 행정동이 몰려도 (점, 변) 쌍이 EDGE_CHUNK 안팎이 되도록 나누어 계산
+        chunk = (np.cumsum(counts) - counts) // EDGE_CHUNK
+        splits = np.r_[0, np.flatnonzero(np.diff(chunk)) + 1, len(features)]
+        for lo, hi in zip(splits[:-1], splits[1:]):
+            rows, edges = _expand(features[lo:hi], self.edge_offsets[features[lo:hi]], counts[lo:hi])
+            px, py = points[point_ids[lo:hi][rows], 0], points[point_ids[lo:hi][rows], 1]
+            x0, y0, x1, y1 = self.x0[edges], self.y0[edges], self.x1[edges], self.y1[edges]
+            straddles = (y0 > py) != (y1 > py)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_cross = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+            crossings = np.bincount(rows, straddles & (px < x_cross), minlength=hi - lo)
+            inside[lo:hi] = crossings % 2 == 1
+        return inside
+
+    def locate(self, points):
+        """
+        점마다 포함하는 행정동 번호 (없으면 -1, 여러 개면 번호가 작은 행정동)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        point_ids, features = self.tree.query_points(points)
+        inside = self.contains(point_ids, features, points)
+        result = np.full(len(points), -1, dtype=np.int64)
+        # 같은 점이 여러 행정동에 포함되면 번호가 가장 작은 행정동
+        point_ids, features = point_ids[inside], features[inside]
+        order = np.lexsort((features, point_ids))
+        points_found, first = np.unique(point_ids[order], return_index=True)
+        result[points_found] = features[order][first]
+        return result
+
+
+def locate_stations(geo_cache, stations, tolerance_km=TOLERANCE_KM, index=None):
+    """
+    지점 좌표 → 행정동
+    Args:
+        geo_cache (GeometryCache): 행정동 지오메트리
+        stations (pd.DataFrame): 지점정보, 경도, 위도 (rainfall_assignment.load_station_coords 결과, 뒤의 행이 최근 좌표)
+        tolerance_km (float): 어떤 행정동에도 포함되지 않을 때 가장 가까운 정점을 허용하는 거리
+    Returns:
+        pd.DataFrame: 지점번호, 지점정보, 경도, 위도, adm_cd2, adm_nm, sidonm, sggnm,
+            판정('포함'/'인접'/'시도 목록'/'영역 밖')
+    """
+    if index is None:
+        index = PolygonIndex(geo_cache)
+    points = stations[['경도', '위도']].to_numpy(dtype=np.float64)
+    found = index.locate(points)
+    method = np.where(found >= 0, '포함', '영역 밖').astype(object)
+
+    missing = np.flatnonzero(found < 0)
+    if len(missing) and len(geo_cache.coords):
+        # 해안 지점: 가장 가까운 경계 정점의 행정동
+        coords = np.asarray(geo_cache.coords)
+        dist, vertex = cKDTree(to_km(coords[:, 0], coords[:, 1])).query(
+            to_km(points[missing, 0], points[missing, 1]))
+        start, _ = geo_cache.feature_coord_ranges()
+        near = dist <= tolerance_km
+        found[missing[near]] = np.searchsorted(start, vertex[near], side='right') - 1
+        method[missing[near]] = '인접'
+
+    labels = [normalize_station(text, aliases={}) for text in stations['지점정보']]
+    properties = pd.DataFrame(geo_cache.properties).reindex(columns=REGION_COLUMNS)
+    regions = properties.iloc[np.maximum(found, 0)].reset_index(drop=True).astype(object)
+    regions[found < 0] = None
+    # 행정동을 찾지 못한 지점은 지오메트리 없이 지점번호 → 시도 목록으로 시도만 할당
+    station_sido = {code: sido for sido, codes in STATION_SIDO.items() for code in codes}
+    listed = pd.Series([station_sido.get(label[1]) if f < 0 else None for label, f in zip(labels, found)], dtype=object)
+    regions['sidonm'] = regions['sidonm'].where(listed.isna(), listed)
+    method[listed.notna().to_numpy()] = '시도 목록'
+    table = pd.DataFrame({
+        '지점번호': [label[1] for label in labels],
+        '지점정보': [f"{label[0]}({label[1]})" for label in labels],
+        '경도': points[:, 0],
+        '위도': points[:, 1]
+    })
+    table = pd.concat([table, regions], axis=1)
+    table['판정'] = method
+    # 지점 이전으로 표기가 바뀐 지점(예: 세종(예)(239) → 세종(239))은 가장 최근 좌표만 유지
+    return table.drop_duplicates(subset='지점번호', keep='last').reset_index(drop=True)
+
+
+def _print_unlocated(table):
+    """행정동을 찾지 못해 STATION_SIDO로 시도만 할당했거나 시도도 모르는 지점 출력"""
+    for method, mark in [('시도 목록', '⚠️'), ('영역 밖', '❌')]:
+        rows = table[table['판정'] == method]
+        if len(rows):
+            names = ', '.join(f"{label}→{sido}" if isinstance(sido, str) else label
+                              for label, sido in zip(rows['지점정보'], rows['sidonm']))
+            print(f"{mark} {method} {len(rows)}개 지점: {names}")
+
+
+def load_station_regions(geo_cache=None, weather_dir=WEATHER_DIR, cache_dir=CACHE_DIR, verbose=True):
+    """
+    지점 → 행정동 테이블 로드 (지오메트리/지점 파일이 바뀌었으면 재계산)
+    """
+    if geo_cache is None:
+        geo_cache = load_geometry_cache(verbose=verbose)
+
+    table_path = os.path.join(cache_dir, 'station_regions.csv')
+    manifest_path = os.path.join(cache_dir, 'station_regions.json')
+    fingerprint = {
+        'version': CACHE_VERSION,
+        'geometry': geo_cache.sources,
+        'stations': [file_fingerprint(p) for p in station_files(weather_dir)],
+        'tolerance_km': TOLERANCE_KM,
+        'station_sido': STATION_SIDO
+    }
+
+    if os.path.exists(manifest_path) and os.path.exists(table_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == fingerprint:
+                table = pd.read_csv(table_path, dtype={'adm_cd2': str}, encoding='utf-8-sig')
+                if verbose:
+                    print(f"⚡ 지점 위치 캐시 사용: {table_path}")
+                    _print_unlocated(table)
+                return table
+
+    table = locate_stations(geo_cache, load_station_coords(weather_dir))
+    os.makedirs(cache_dir, exist_ok=True)
+    table.to_csv(table_path, index=False, encoding='utf-8-sig')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprint, f, ensure_ascii=False, indent=2)
+    if verbose:
+        counts = table['판정'].value_counts()
+        print(f"✅ 지점 위치 판정: {len(table)}개 지점 (포함 {counts.get('포함', 0)}, 인접 {counts.get('인접', 0)}, "
+              f"시도 목록 {counts.get('시도 목록', 0)}, 영역 밖 {counts.get('영역 밖', 0)})")
+        _print_unlocated(table)
+    return table
+
+
+def lookup_stations(labels, regions, column='sidonm'):
+    """
+    지점정보('이름(번호)') → 지점번호 기준 regions의 column 값
+    Returns:
+        pd.Series: labels와 같은 순서 (지점번호가 없거나 위치를 모르면 NaN)
+    """
+    labels = pd.Series(labels)
+    codes = [normalize_station(text if isinstance(text, str) else '', aliases={}) for text in labels]
+    by_code = regions.dropna(subset=[column]).drop_duplicates(subset='지점번호', keep='last').set_index('지점번호')[column]
+    return pd.Series([by_code.get(code[1]) if code else None for code in codes], index=labels.index, dtype=object)
+
+
+def main(n_random=20000, n_check=300, seed=42):
+    """지점 위치 판정 시간, 전체 행정동 검사와의 결과 비교, STATION_SIDO 사용 지점 출력"""
+    import time
+
+    geo_cache = load_geometry_cache(verbose=False)
+    stations = load_station_coords()
+
+    start = time.perf_counter()
+    index = PolygonIndex(geo_cache)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    table = locate_stations(geo_cache, stations, index=index)
+    locate_time = time.perf_counter() - start
+    counts = table['판정'].value_counts()
+    print(f"📍 지점 {len(table)}개 → 행정동 {len(geo_cache)}개: 색인 {build_time * 1000:.0f}ms, 판정 {locate_time * 1000:.1f}ms "
+          f"(포함 {counts.get('포함', 0)}, 인접 {counts.get('인접', 0)}, 시도 목록 {counts.get('시도 목록', 0)}, "
+          f"영역 밖 {counts.get('영역 밖', 0)})")
+
+    _print_unlocated(table)
+    # 목록 지점이 지오메트리로 판정되면 (GeoJSON 추가 시) 목록은 필요 없음 → 시도가 같은지만 확인
+    station_sido = {code: sido for sido, codes in STATION_SIDO.items() for code in codes}
+    located = table[table['지점번호'].isin(station_sido) & table['판정'].isin(['포함', '인접'])]
+    disagree = located[located['지점번호'].map(station_sido) != located['sidonm']]
+    print(f"   STATION_SIDO {len(station_sido)}개 중 지오메트리로 판정된 지점 {len(located)}개 (시도 불일치 {len(disagree)}개)")
+
+    rng = np.random.default_rng(seed)
+    bounds = geo_cache.bounds()
+    points = rng.uniform(bounds[:, :2].min(axis=0), bounds[:, 2:].max(axis=0), (n_random, 2))
+    start = time.perf_counter()
+    located = index.locate(points)
+    print(f"⚡ 임의 점 {n_random:,}개: {(time.perf_counter() - start) * 1000:.0f}ms ({(located >= 0).sum():,}개 포함)")
+
+    # 지점 + 임의 점 일부를 후보 없이 모든 행정동에 대해 검사한 결과와 비교
+    check = np.vstack([stations[['경도', '위도']].to_numpy(), points[:n_check]])
+    start = time.perf_counter()
+    brute = np.full(len(check), -1, dtype=np.int64)
+    for f in range(len(geo_cache) - 1, -1, -1):
+        brute[index.contains(np.arange(len(check)), np.full(len(check), f), check)] = f
+    print(f"   점 {len(check)}개 전체 행정동 검사: {time.perf_counter() - start:.1f}초, "
+          f"STR-tree 결과와 일치 {'예' if np.array_equal(index.locate(check), brute) else '아니오'}")
+    return table
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+가공 테이블 열 지향 저장소 (Feather / Arrow IPC)
+data/processed/*.csv, results/yunjin/*.csv를 테이블별 스키마로 한 번 변환하여
+data/cache/tables/에 Feather(비압축 Arrow IPC, 작은 표에서 Parquet보다 읽기가 빠름)로 저장하고,
+이후에는 read_table(이름)으로 바로 로드
+- 시도명/시군구명/등급 라벨: category
+- 행정동코드/인구수 등 정수: 명시한 정수형 (행정동코드는 10자리라 int64)
+- 원자료 측정값(면적, 보급률, 연도별 강수량 등): float32 (지수/점수 열은 지도 표시값이 바뀌지 않도록 float64 유지)
+- 원본 CSV의 크기/수정 시각이 바뀌면 자동 재변환
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from csv_ingest import read_csv, sniff_encoding
+from geo_cache import file_fingerprint
+
+CACHE_DIR = 'data/cache/tables'
+CACHE_VERSION = 1
+
+_SEWER_MEASURES = ['총면적', '하수도설치율', '공공하수처리구역 인구보급률', '고도처리인구 보급률', '인구밀도']
+_RAINFALL_YEARS = ['2020강수량(mm)', '2021강수량(mm)', '2022강수량(mm)', '2023강수량(mm)', '2024강수량(mm)']
+
+# 테이블 이름 → 원본 경로 / 열 자료형 (인코딩은 csv_ingest가 판별, 명시하지 않은 열은 추론 결과 유지)
+TABLES = {
+    'housing_vulnerability': {
+        'path': 'results/yunjin/housing_vulnerability_analysis.csv',
+        'category': ['region', 'vulnerability_level'],
+        'int': {'total_risk': 'int32', 'high_risk': 'int32'},
+        'float32': ['aged_housing_ratio']
+    },
+    'housing_processed': {
+        'path': 'data/processed/processed_data.csv',
+        'category': ['region'],
+        'int': {'total_risk': 'int32', 'high_risk': 'int32', 'medium_risk': 'int32',
+                'aged_housing_count': 'int32', 'total_housing_count': 'int32'},
+        'float32': ['low_risk', 'aged_housing_ratio']
+    },
+    'sewer_summary': {
+        'path': 'results/yunjin/sewer_infrastructure_analysis_summary.csv',
+        'category': ['시도', '행정구역명', '인프라_등급'],
+        'int': {'총인구(명)': 'int32', '등급_숫자': 'int8'},
+        'float32': _SEWER_MEASURES + ['인구밀도_정규화']
+    },
+    'sewer_by_region': {
+        'path': 'results/yunjin/sewer_infrastructure_by_region.csv',
+        'category': ['시도'],
+        'int': {'지역수': 'int32'},
+        'float32': ['평균_인프라지수', '표준편차', '최소값', '최대값',
+                    '평균_하수도설치율', '평균_공공하수처리구역', '평균_고도처리', '평균_인구밀도']
+    },
+    'sewer_analysis': {
+        'path': 'data/processed/sewer_infrastructure_analysis.csv',
+        'category': ['시도', '행정구역명', '인프라_등급'],
+        'int': {'총인구(명)': 'int32'},
+        'float32': _SEWER_MEASURES + ['인구밀도_정규화']
+    },
+    'sewer_processed': {
+        'path': 'data/processed/sewer_infrastructure_processed.csv',
+        'category': ['시도', '행정구역명'],
+        'int': {'총인구(명)': 'int32'},
+        'float32': _SEWER_MEASURES
+    },
+    'social_vulnerability': {
+        'path': 'data/processed/202506_읍면동_사회취약계층표.csv',
+        'category': ['시도명', '시군구명'],
+        'int': {'아동인구수': 'int32', '고령자인구수': 'int32', '총인구': 'int32', '외국인': 'int32',
+                '장애인인구수': 'int32', '행정동코드': 'int64'},
+        'float32': ['아동인구수_pct', '고령자인구수_pct', '외국인_pct', '장애인_pct']
+    },
+    'social_index': {
+        'path': 'data/processed/사회취약지수표.csv',
+        'category': ['시도명', '시군구명'],
+        'int': {'행정동코드': 'int64'},
+        'float32': []
+    },
+    'summer_rainfall': {
+        'path': 'data/processed/20~24_여름.csv',
+        'category': [],
+        'int': {'호우주의보': 'int16', '호우경보': 'int16', '호우특보': 'int16'},
+        'float32': _RAINFALL_YEARS + ['2020~2024강수량 총합 (mm)', '2020~2024강수량 평균 (mm)']
+    },
+    'rainfall_percentile': {
+        'path': 'data/processed/여름_강수량_호우_백분위.csv',
+        'category': [],
+        'int': {'2020~2024 호우주의보 개수': 'int16'},
+        'float32': _RAINFALL_YEARS + ['2020~2024강수량(mm)', '강수량_정규화', '호우_정규화', '통합점수']
+    }
+}
+
+
+def read_csv_table(name, base_dir='.'):
+    """원본 CSV를 테이블 스키마의 자료형으로 읽기 (Feather 변환 입력)"""
+    spec = TABLES[name]
+    df = read_csv(os.path.join(base_dir, spec['path']))
+    for col in spec['category']:
+        df[col] = df[col].astype('category')
+    for col, dtype in spec['int'].items():
+        df[col] = df[col].astype(dtype)
+    for col in spec['float32']:
+        df[col] = df[col].astype(np.float32)
+    return df
+
+
+def _is_fresh(manifest_path, name, source):
+    """매니페스트의 원본 지문과 스키마가 현재와 일치하는지 확인"""
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return (manifest.get('version') == CACHE_VERSION
+            and manifest.get('source') == file_fingerprint(source)
+            and manifest.get('schema') == TABLES[name])
+
+
+def read_table(name, base_dir='.', cache_dir=None, verbose=False):
+    """
+    가공 테이블 로드 (Feather 캐시 사용, 원본 CSV가 바뀌었으면 재변환)
+    Args:
+        name (str): TABLES의 테이블 이름
+        base_dir (str): 상대 경로의 기준 디렉토리 (notebooks/에서는 '..')
+        cache_dir (str): 캐시 디렉토리 (기본값: base_dir/data/cache/tables)
+    Returns:
+        pd.DataFrame: 스키마 자료형이 적용된 테이블
+    """
+    if name not in TABLES:
+        raise KeyError(f"알 수 없는 테이블: {name} (사용 가능: {', '.join(TABLES)})")
+    if cache_dir is None:
+        cache_dir = os.path.normpath(os.path.join(base_dir, CACHE_DIR))
+    source = os.path.normpath(os.path.join(base_dir, TABLES[name]['path']))
+    table_path = os.path.join(cache_dir, f'{name}.feather')
+    manifest_path = os.path.join(cache_dir, f'{name}.json')
+
+    if _is_fresh(manifest_path, name, source) and os.path.exists(table_path):
+        return pd.read_feather(table_path)
+
+    df = read_csv_table(name, base_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    # 여러 단계가 동시에 같은 테이블을 변환할 수 있으므로 프로세스별 임시 파일에 쓴 뒤 교체
+    tmp_suffix = f'.{os.getpid()}.tmp'
+    df.to_feather(table_path + tmp_suffix, compression='uncompressed')
+    os.replace(table_path + tmp_suffix, table_path)
+    # 매니페스트는 마지막에 기록 (중간에 실패하면 다음 실행에서 재변환)
+    with open(manifest_path + tmp_suffix, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'name': name, 'source': file_fingerprint(source),
+                   'schema': TABLES[name]}, f, ensure_ascii=False, indent=2)
+    os.replace(manifest_path + tmp_suffix, manifest_path)
+    if verbose:
+        print(f"✅ {name}: {len(df):,}행 Feather 변환 ({table_path})")
+    return df
+
+
+def main(repeat=20):
+    """테이블별 CSV 읽기 / Feather 읽기 시간과 메모리 비교"""
+    import time
+
+    def best_time(func):
+        func()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    print(f"📦 가공 테이블 열 지향 저장소: {len(TABLES)}개 테이블")
+    total = {'csv_time': 0.0, 'table_time': 0.0, 'csv_mem': 0, 'table_mem': 0}
+    for name, spec in TABLES.items():
+        if not os.path.exists(spec['path']):
+            print(f"❌ {name}: 파일 없음 ({spec['path']})")
+            continue
+        read_table(name, verbose=True)
+        encoding = sniff_encoding(spec['path'])
+        csv = pd.read_csv(spec['path'], encoding=encoding)
+        table = read_table(name)
+        csv_time = best_time(lambda: pd.read_csv(spec['path'], encoding=encoding))
+        table_time = best_time(lambda: read_table(name))
+        csv_mem = int(csv.memory_usage(deep=True).sum())
+        table_mem = int(table.memory_usage(deep=True).sum())
+        for key, value in zip(total, [csv_time, table_time, csv_mem, table_mem]):
+            total[key] += value
+        print(f"   - {name}: {len(table):,}행, 읽기 {csv_time * 1000:.1f}ms → {table_time * 1000:.1f}ms, "
+              f"메모리 {csv_mem / 1024:.0f}KB → {table_mem / 1024:.0f}KB")
+    print(f"⚡ 전체: 읽기 {total['csv_time'] * 1000:.1f}ms → {total['table_time'] * 1000:.1f}ms, "
+          f"메모리 {total['csv_mem'] / 1024:.0f}KB → {total['table_mem'] / 1024:.0f}KB")
+    return total
+
+
+if __name__ == "__main__":
+    main()
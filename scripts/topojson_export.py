@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+행정동 지오메트리 TopoJSON 변환
+인접 행정동이 공유하는 경계를 경계선(arc) 하나로 저장하고 좌표를 정수 격자로 양자화(차분 부호화)
+- to_topojson(): geo_cache 순서의 행정동 전체(geo_all) → TopoJSON 딕셔너리 (속성 포함 가능)
+- load_lod_topojson(): geometry_lod의 줌 단계별 TopoJSON (속성 제외, data/cache/topojson/에 캐시)
+- 지도에서는 folium.TopoJson(topojson-client)으로 로드
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from geo_cache import GEOM_POLYGON, load_geometry_cache
+from geometry_lod import LOD_LEVELS, LOD_VERSION, arc_importance, build_topology
+
+TOPOJSON_CACHE_DIR = 'data/cache/topojson'
+TOPOJSON_VERSION = 1
+
+# TopoJSON 객체 이름 (folium.TopoJson object_path = 'objects.dongs')
+OBJECT_NAME = 'dongs'
+OBJECT_PATH = f'objects.{OBJECT_NAME}'
+
+# 단순화 없이 내보낼 때의 좌표 소수 자릿수 (약 0.1m)
+FULL_DECIMALS = 6
+
+
+def _quantize(points, factor, origin):
+    """좌표 → 정수 격자 (연속 중복 제거, 한 점으로 줄면 두 번 반복)"""
+    q = np.round(points * factor).astype(np.int64) - origin
+    if len(q) > 1:
+        keep = np.ones(len(q), dtype=bool)
+        keep[1:] = np.any(q[1:] != q[:-1], axis=1)
+        q = q[keep]
+    if len(q) == 1:
+        q = np.vstack([q, q])
+    return q
+
+
+def _delta(q):
+    """차분 부호화된 TopoJSON 경계선"""
+    return np.vstack([q[:1], np.diff(q, axis=0)]).tolist()
+
+
+def to_topojson(cache, properties=None, tolerance=0.0, decimals=FULL_DECIMALS,
+                topology=None, importances=None):
+    """
+    행정동 전체 → TopoJSON
+    Args:
+        cache (GeometryCache): 행정동 지오메트리
+        properties (list): 행정동별 속성 딕셔너리 (cache 순서, None이면 속성 없이 지오메트리만)
+        tolerance (float): 경계선 단순화 허용 오차(도), 0이면 단순화 없음
+        decimals (int): 좌표 소수 자릿수 (양자화 격자 = 10^-decimals도)
+        topology, importances: 미리 계산한 geometry_lod.build_topology / arc_importance 결과 (재사용용)
+    Returns:
+        dict: TopoJSON Topology (객체 이름 OBJECT_NAME)
+    """
+    if topology is None:
+        topology = build_topology(cache)
+    if tolerance > 0 and importances is None:
+        importances = [arc_importance(topology.vertices[arc], tolerance) for arc in topology.arcs]
+
+    factor = 10.0 ** decimals
+    origin = np.floor(np.asarray(cache.coords).min(axis=0) * factor).astype(np.int64)
+
+    quantized = []
+    for i, arc in enumerate(topology.arcs):
+        points = topology.vertices[arc]
+        if tolerance > 0:
+            points = points[importances[i] > tolerance]
+        quantized.append(_quantize(points, factor, origin))
+    arcs = [_delta(q) for q in quantized]
+
+    geometries = []
+    for i in range(len(cache)):
+        polygons = []
+        for part in range(cache.feature_offsets[i], cache.feature_offsets[i + 1]):
+            rings = []
+            for position, ring in enumerate(range(cache.part_offsets[part], cache.part_offsets[part + 1])):
+                refs = [~a if reversed_ else a for a, reversed_ in topology.ring_arcs[ring]]
+                # 링 정점 수 = 경계선별 (점 수 - 1) 합 (인접 경계선은 끝점 공유)
+                size = sum(len(quantized[~r if r < 0 else r]) - 1 for r in refs)
+                if size < 3:
+                    if position > 0:
+                        # 퇴화한 구멍은 제거
+                        continue
+                    # 퇴화한 외곽 링은 원본 링을 별도 경계선으로
+                    original = np.asarray(cache.coords[cache.ring_offsets[ring]:cache.ring_offsets[ring + 1]])
+                    refs = [len(arcs)]
+                    arcs.append(_delta(_quantize(original, factor, origin)))
+                rings.append(refs)
+            polygons.append(rings)
+
+        if cache.geom_types[i] == GEOM_POLYGON:
+            geometry = {'type': 'Polygon', 'arcs': polygons[0]}
+        else:
+            geometry = {'type': 'MultiPolygon', 'arcs': polygons}
+        if properties is not None:
+            geometry['properties'] = dict(properties[i])
+        geometries.append(geometry)
+
+    return {
+        'type': 'Topology',
+        'transform': {'scale': [1 / factor, 1 / factor], 'translate': (origin / factor).tolist()},
+        'objects': {OBJECT_NAME: {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': arcs
+    }
+
+
+def attach_properties(topology, properties):
+    """지오메트리만 있는 TopoJSON에 행정동별 속성을 붙인 사본 (경계선은 공유)"""
+    geometries = topology['objects'][OBJECT_NAME]['geometries']
+    return {
+        'type': 'Topology',
+        'transform': topology['transform'],
+        'objects': {OBJECT_NAME: {
+            'type': 'GeometryCollection',
+            'geometries': [dict(geometry, properties=dict(props)) for geometry, props in zip(geometries, properties)]
+        }},
+        'arcs': topology['arcs']
+    }
+
+
+def load_lod_topojson(geo_cache=None, levels=None, cache_dir=TOPOJSON_CACHE_DIR, verbose=True):
+    """
+    geometry_lod 단계별 TopoJSON 로드 (원본 GeoJSON이나 단계 설정이 바뀌었으면 재생성)
+    Returns:
+        dict: 단계 이름 → TopoJSON (속성 없음, LOD_LEVELS 순서)
+    """
+    if geo_cache is None:
+        geo_cache = load_geometry_cache(verbose=verbose)
+    if levels is None:
+        levels = LOD_LEVELS
+
+    manifest = {'version': TOPOJSON_VERSION, 'lod_version': LOD_VERSION, 'levels': levels,
+                'sources': geo_cache.sources}
+    key = hashlib.md5(json.dumps(manifest, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:12]
+    cache_path = os.path.join(cache_dir, key)
+    manifest_path = os.path.join(cache_path, 'manifest.json')
+
+    if os.path.exists(manifest_path):
+        if verbose:
+            print(f"⚡ TopoJSON 캐시 사용: {cache_path}")
+        topologies = {}
+        for level in levels:
+            with open(os.path.join(cache_path, f"{level['name']}.json"), 'r', encoding='utf-8') as f:
+                topologies[level['name']] = json.load(f)
+        return topologies
+
+    topology = build_topology(geo_cache)
+    min_tolerance = min(level['tolerance'] for level in levels)
+    importances = [arc_importance(topology.vertices[arc], min_tolerance) for arc in topology.arcs]
+
+    os.makedirs(cache_path, exist_ok=True)
+    topologies = {}
+    for level in levels:
+        topo = to_topojson(geo_cache, tolerance=level['tolerance'], decimals=level['decimals'],
+                           topology=topology, importances=importances)
+        with open(os.path.join(cache_path, f"{level['name']}.json"), 'w', encoding='utf-8') as f:
+            json.dump(topo, f, separators=(',', ':'))
+        topologies[level['name']] = topo
+        if verbose:
+            print(f"✅ TopoJSON {level['name']}: 경계선 {len(topo['arcs']):,}개")
+    # 매니페스트는 마지막에 기록 (중간에 실패하면 다음 실행에서 재생성)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return topologies
+
+
+def decode_topojson(topology):
+    """TopoJSON → GeoJSON geometry 목록 (topojson-client feature()와 같은 규칙, 확인용)"""
+    (sx, sy), (tx, ty) = topology['transform']['scale'], topology['transform']['translate']
+    arcs = []
+    for arc in topology['arcs']:
+        q = np.cumsum(np.asarray(arc, dtype=np.int64), axis=0)
+        arcs.append(np.column_stack([q[:, 0] * sx + tx, q[:, 1] * sy + ty]))
+
+    def ring(refs):
+        points = []
+        for r in refs:
+            arc = arcs[~r][::-1] if r < 0 else arcs[r]
+            points.extend(arc[1:] if points else arc)
+        return np.asarray(points)
+
+    geometries = []
+    for geometry in topology['objects'][OBJECT_NAME]['geometries']:
+        if geometry['type'] == 'Polygon':
+            coordinates = [ring(refs) for refs in geometry['arcs']]
+        else:
+            coordinates = [[ring(refs) for refs in polygon] for polygon in geometry['arcs']]
+        geometries.append({'type': geometry['type'], 'coordinates': coordinates})
+    return geometries
+
+
+def main():
+    """전체 해상도 / LOD 단계별 TopoJSON 크기를 GeoJSON과 비교하고 복원 좌표 확인"""
+    import time
+
+    cache = load_geometry_cache(verbose=False)
+    geo_all = cache.to_feature_collection()
+    properties = [feat['properties'] for feat in geo_all['features']]
+
+    geojson_size = len(json.dumps(geo_all, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    start = time.time()
+    topo = to_topojson(cache, properties)
+    elapsed = time.time() - start
+    topo_size = len(json.dumps(topo, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    print(f"📦 GeoJSON(geo_all): {geojson_size / 1e6:.1f}MB")
+    print(f"📦 TopoJSON (소수 {FULL_DECIMALS}자리, 단순화 없음): {topo_size / 1e6:.1f}MB "
+          f"({topo_size / geojson_size:.1%}), 변환 {elapsed:.1f}초")
+
+    # 복원 정점 = 원본 정점을 격자에 반올림한 값 (링 시작점은 접합점으로 바뀔 수 있으므로 정점 집합 비교)
+    factor = 10.0 ** FULL_DECIMALS
+    mismatched = total = 0
+    for i, geometry in enumerate(decode_topojson(topo)):
+        original = cache.geometry(i)
+        polygons = [original['coordinates']] if original['type'] == 'Polygon' else original['coordinates']
+        restored = [geometry['coordinates']] if geometry['type'] == 'Polygon' else geometry['coordinates']
+        for rings, restored_rings in zip(polygons, restored):
+            for ring, restored_ring in zip(rings, restored_rings):
+                expected = np.unique(np.round(np.asarray(ring) * factor), axis=0)
+                actual = np.unique(np.round(restored_ring * factor), axis=0)
+                total += 1
+                mismatched += not np.array_equal(expected, actual)
+    print(f"   복원 정점 불일치 링: {mismatched}개 / {total:,}개")
+
+    for name, level in load_lod_topojson(cache, verbose=False).items():
+        size = len(json.dumps(level, separators=(',', ':')))
+        print(f"   - {name}: {size / 1e6:.2f}MB (지오메트리만)")
+    return topo
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+취약지수 행정동 벡터 타일 생성 (정적 z/x/y 피라미드)
+행정동 지오메트리와 주거/수도/사회/강수량/통합 지수를 Mapbox Vector Tile(.pbf)로 잘라
+results/vector_tiles/tiles/{z}/{x}/{y}.pbf에 저장하고, 화면에 보이는 타일만 불러오는 지도(index.html) 생성
+- 줌별 지오메트리는 geometry_lod 단계 사용 (전국 → 시도 → 시군구)
+- 타일 인코딩은 MVT 2.1 protobuf를 직접 작성 (추가 의존성 없음)
+- 보기: python -m http.server -d results/vector_tiles 8000 → http://localhost:8000/
+"""
+
+import json
+import os
+import shutil
+import struct
+
+import numpy as np
+import pandas as pd
+
+from geo_cache import load_geometry_cache
+from geometry_lod import LOD_LEVELS, load_geometry_lod
+from grading import GRADE_LABELS, assign_grades
+from weight_scenarios import SCORES_PATH
+
+OUTPUT_DIR = 'results/vector_tiles'
+LAYER_NAME = 'dongs'
+
+MIN_ZOOM = 5
+MAX_ZOOM = 12
+
+# 타일 좌표 범위와 경계 여유 (타일 경계에서 선이 끊겨 보이지 않도록)
+EXTENT = 4096
+BUFFER = 64
+
+# 지수 컬럼, 등급 컬럼, 등급 척도 (grading.GRADE_SCALES)
+TILE_INDEXES = [
+    {'name': '주거취약지수', 'value': '주거취약지수', 'grade': '주거취약등급', 'scale': '주거취약',
+     'colors': ['#fee5d9', '#fcae91', '#fb6a4a', '#de2d26', '#a50f15']},
+    {'name': '수도인프라지수', 'value': '수도인프라지수', 'grade': '수도인프라등급', 'scale': '수도인프라',
+     'colors': ['#edf8e9', '#bae4b3', '#74c476', '#31a354', '#006d2c']},
+    {'name': '사회취약지수', 'value': '사회취약지수', 'grade': '사회취약등급', 'scale': '사회취약',
+     'colors': ['#fde0dd', '#fcc5c0', '#fa9fb5', '#f768a1', '#c51b8a']},
+    {'name': '강수량지수', 'value': '강수량지수', 'grade': '강수량등급', 'scale': '강수량',
+     'colors': ['#e3f2fd', '#bbdefb', '#90caf9', '#42a5f5', '#1976d2']},
+    {'name': '통합취약지수', 'value': '통합취약도', 'grade': '통합등급', 'scale': '통합',
+     'colors': ['#f7f7f7', '#cccccc', '#969696', '#525252', '#252525']},
+]
+
+
+# ---------------------------
+# MVT protobuf 인코딩
+# ---------------------------
+def _varint(value, out):
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _key(field, wire_type, out):
+    _varint((field << 3) | wire_type, out)
+
+
+def _bytes_field(field, payload, out):
+    _key(field, 2, out)
+    _varint(len(payload), out)
+    out += payload
+
+
+def _packed(field, values, out):
+    payload = bytearray()
+    for value in values:
+        _varint(value, payload)
+    _bytes_field(field, payload, out)
+
+
+def _encode_value(value):
+    """Layer.values 항목 (문자열 / 정수 / 실수)"""
+    out = bytearray()
+    if isinstance(value, str):
+        _bytes_field(1, value.encode('utf-8'), out)
+    elif isinstance(value, (int, np.integer)):
+        _key(6, 0, out)
+        _varint((int(value) << 1) ^ (int(value) >> 63), out)
+    else:
+        _key(3, 1, out)
+        out += struct.pack('<d', float(value))
+    return bytes(out)
+
+
+def _zigzag(values):
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def encode_polygon(rings):
+    """
+    정수 타일 좌표 링 목록 → MVT 지오메트리 명령 (MoveTo/LineTo/ClosePath, 커서 기준 차분)
+    rings: 닫는 점을 뺀 (n, 2) int64 배열 목록 (외곽은 시계 방향, 구멍은 반시계 방향으로 정렬된 상태)
+    """
+    commands = []
+    cursor = np.zeros(2, dtype=np.int64)
+    for ring in rings:
+        deltas = np.diff(np.vstack([cursor, ring]), axis=0)
+        params = _zigzag(deltas).ravel().tolist()
+        commands += [9] + params[:2] + [((len(ring) - 1) << 3) | 2] + params[2:] + [15]
+        cursor = ring[-1]
+    return commands
+
+
+def encode_layer(name, features, extent=EXTENT):
+    """
+    features: [(id, properties dict, rings), ...] → Layer 메시지
+    속성 키/값은 레이어 단위 사전으로 공유
+    """
+    keys, values = {}, {}
+    out = bytearray()
+    _key(15, 0, out)
+    _varint(2, out)
+    _bytes_field(1, name.encode('utf-8'), out)
+    for feature_id, props, rings in features:
+        tags = []
+        for key, value in props.items():
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value).__name__, value), len(values)))
+        feature = bytearray()
+        _key(1, 0, feature)
+        _varint(int(feature_id), feature)
+        _packed(2, tags, feature)
+        _key(3, 0, feature)
+        _varint(3, feature)  # POLYGON
+        _packed(4, encode_polygon(rings), feature)
+        _bytes_field(2, feature, out)
+    for key in keys:
+        _bytes_field(3, key.encode('utf-8'), out)
+    for _, value in values:
+        _bytes_field(4, _encode_value(value), out)
+    _key(5, 0, out)
+    _varint(extent, out)
+    tile = bytearray()
+    _bytes_field(3, out, tile)
+    return bytes(tile)
+
+
+# ---------------------------
+# 타일 분할
+# ---------------------------
+def mercator(coords):
+    """경위도 → 웹 메르카토르 정규 좌표 (0~1, y는 아래쪽이 증가)"""
+    lon, lat = coords[:, 0], np.clip(coords[:, 1], -85.0511, 85.0511)
+    x = (lon + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(np.radians(lat)) + 1.0 / np.cos(np.radians(lat))) / np.pi) / 2.0
+    return np.column_stack([x, y])
+
+
+def _clip_axis(points, axis, bound, keep_greater):
+    """Sutherland-Hodgman 한 경계 자르기 (닫는 점 없는 링, 벡터 연산)"""
+    if not len(points):
+        return points
+    inside = points[:, axis] >= bound if keep_greater else points[:, axis] <= bound
+    if inside.all():
+        return points
+    if not inside.any():
+        return points[:0]
+    prev = np.roll(points, 1, axis=0)
+    cross = inside != np.roll(inside, 1)
+    # 경계를 지나는 변(이전 점 → 현재 점)의 교차점
+    p, q = prev[cross], points[cross]
+    crossing = p + ((bound - p[:, axis]) / (q[:, axis] - p[:, axis]))[:, None] * (q - p)
+    crossing[:, axis] = bound
+    counts = cross.astype(np.int64) + inside
+    starts = np.cumsum(counts) - counts
+    out = np.empty((int(counts.sum()), 2))
+    out[starts[cross]] = crossing
+    out[starts[inside] + cross[inside]] = points[inside]
+    return out
+
+
+def clip_ring(points, low, high):
+    """링을 [low, high]² 사각형으로 자르기"""
+    for axis in (0, 1):
+        points = _clip_axis(points, axis, low, True)
+        points = _clip_axis(points, axis, high, False)
+    return points
+
+
+def _tile_ring(points, exterior):
+    """타일 좌표 링 → 정수 링 (연속 중복 제거, 외곽 시계/구멍 반시계 방향), 퇴화하면 None"""
+    ring = np.round(points).astype(np.int64)
+    keep = np.any(ring != np.roll(ring, 1, axis=0), axis=1)
+    ring = ring[keep]
+    if len(ring) < 3:
+        return None
+    x, y = ring[:, 0], ring[:, 1]
+    area = int(np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y))
+    if area == 0:
+        return None
+    # 타일 좌표(y 아래로 증가)에서 넓이 > 0이면 시계 방향
+    if (area > 0) != exterior:
+        ring = ring[::-1]
+    return ring
+
+
+def _feature_tiles(cache, projected, i, zoom, start, end):
+    """행정동 i(coords[start:end])를 zoom 단계 타일별 링 목록으로 분할 → {(x, y): rings}"""
+    scale = (1 << zoom) * EXTENT
+    pixels = projected[start:end] * scale
+    lo = np.floor((pixels.min(axis=0) - BUFFER) / EXTENT).astype(np.int64)
+    hi = np.floor((pixels.max(axis=0) + BUFFER) / EXTENT).astype(np.int64)
+
+    tiles = {}
+    for part in range(cache.feature_offsets[i], cache.feature_offsets[i + 1]):
+        for position, ring in enumerate(range(cache.part_offsets[part], cache.part_offsets[part + 1])):
+            # 닫는 점 제외
+            points = projected[cache.ring_offsets[ring]:cache.ring_offsets[ring + 1] - 1] * scale
+            ring_lo = np.floor((points.min(axis=0) - BUFFER) / EXTENT).astype(np.int64)
+            ring_hi = np.floor((points.max(axis=0) + BUFFER) / EXTENT).astype(np.int64)
+            for tx in range(max(ring_lo[0], lo[0]), min(ring_hi[0], hi[0]) + 1):
+                for ty in range(max(ring_lo[1], lo[1]), min(ring_hi[1], hi[1]) + 1):
+                    rings = tiles.get((tx, ty))
+                    if position > 0 and not rings:
+                        # 이 타일에 외곽 링이 없으면 구멍도 생략
+                        continue
+                    local = clip_ring(points - (tx * EXTENT, ty * EXTENT), -BUFFER, EXTENT + BUFFER)
+                    tile_ring = _tile_ring(local, exterior=position == 0) if len(local) >= 3 else None
+                    if tile_ring is not None:
+                        tiles.setdefault((tx, ty), []).append(tile_ring)
+    return tiles
+
+
+def level_for_zoom(zoom, levels=LOD_LEVELS):
+    """줌 → geometry_lod 단계 이름 (min_zoom 이하 중 가장 세밀한 단계)"""
+    name = levels[0]['name']
+    for level in levels:
+        if zoom >= level['min_zoom']:
+            name = level['name']
+    return name
+
+
+def tile_attributes(geo_cache, scores=None):
+    """
+    타일 속성 테이블 (geo_cache 순서)
+    scores: integrated_vulnerability_scores.csv (adm_cd2 인덱스), 지수별 등급은 grading 척도로 계산
+    """
+    if scores is None:
+        scores = pd.read_csv(SCORES_PATH, dtype={'adm_cd2': str}, encoding='utf-8-sig').set_index('adm_cd2')
+    table = scores.reindex(geo_cache.adm_cd2)
+    attributes = pd.DataFrame({
+        'adm_cd2': geo_cache.adm_cd2,
+        'adm_nm': [str(p.get('adm_nm', '')) for p in geo_cache.properties]
+    })
+    for config in TILE_INDEXES:
+        values = table[config['value']].to_numpy(dtype=np.float64)
+        attributes[config['value']] = np.round(values, 2)
+        attributes[config['grade']] = assign_grades(values, config['scale'])[0]
+    return attributes
+
+
+def build_vector_tiles(geo_cache, attributes, output_dir=OUTPUT_DIR, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM,
+                       lod=None, verbose=True):
+    """
+    z/x/y 벡터 타일 피라미드 생성 (기존 tiles/ 디렉터리는 교체)
+    Args:
+        geo_cache (GeometryCache): 원본 지오메트리 (LOD 단계 생성용)
+        attributes (pd.DataFrame): geo_cache 순서의 행정동 속성 (tile_attributes 결과)
+    Returns:
+        dict: 메타데이터 (metadata.json과 같은 내용)
+    """
+    if lod is None:
+        lod = load_geometry_lod(geo_cache, verbose=verbose)
+    records = attributes.to_dict(orient='records')
+    feature_ids = attributes['adm_cd2'].astype(np.int64).to_numpy()
+
+    tiles_dir = os.path.join(output_dir, 'tiles')
+    if os.path.exists(tiles_dir):
+        shutil.rmtree(tiles_dir)
+
+    counts = {}
+    total_bytes = 0
+    for zoom in range(min_zoom, max_zoom + 1):
+        cache = lod[level_for_zoom(zoom)]
+        projected = mercator(np.asarray(cache.coords))
+        starts, ends = cache.feature_coord_ranges()
+
+        tiles = {}
+        for i in range(len(cache)):
+            for tile, rings in _feature_tiles(cache, projected, i, zoom, starts[i], ends[i]).items():
+                tiles.setdefault(tile, []).append((feature_ids[i], records[i], rings))
+
+        for (tx, ty), features in tiles.items():
+            path = os.path.join(tiles_dir, str(zoom), str(tx))
+            os.makedirs(path, exist_ok=True)
+            data = encode_layer(LAYER_NAME, features)
+            with open(os.path.join(path, f'{ty}.pbf'), 'wb') as f:
+                f.write(data)
+            total_bytes += len(data)
+        counts[zoom] = len(tiles)
+        if verbose:
+            print(f"   - z{zoom} ({level_for_zoom(zoom)}): 타일 {len(tiles):,}개")
+
+    (west, south), (east, north) = np.min(geo_cache.coords, axis=0), np.max(geo_cache.coords, axis=0)
+    metadata = {
+        'tiles': 'tiles/{z}/{x}/{y}.pbf',
+        'layer': LAYER_NAME,
+        'minzoom': min_zoom,
+        'maxzoom': max_zoom,
+        'bounds': [float(west), float(south), float(east), float(north)],
+        'extent': EXTENT,
+        'fields': list(attributes.columns),
+        'tile_counts': counts,
+        'total_bytes': total_bytes
+    }
+    with open(os.path.join(output_dir, 'metadata.json'), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    return metadata
+
+
+def write_tile_viewer(metadata, output_dir=OUTPUT_DIR):
+    """화면에 보이는 타일만 불러오는 지도 페이지 (Leaflet.VectorGrid)"""
+    indexes = [{key: config[key] for key in ('name', 'value', 'grade', 'colors')} for config in TILE_INDEXES]
+    west, south, east, north = metadata['bounds']
+    html = f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>취약지수 벡터 타일 지도</title>
+    <link rel="stylesheet" href="https://unpkg.com/leaflet@1.7.1/dist/leaflet.css">
+    <script src="https://unpkg.com/leaflet@1.7.1/dist/leaflet.js"></script>
+    <script src="https://unpkg.com/leaflet.vectorgrid@1.3.0/dist/Leaflet.VectorGrid.bundled.js"></script>
+    <style>
+        html, body, #map {{ margin: 0; height: 100%; font-family: 'Nanum Gothic', Arial, sans-serif; }}
+        .info {{ background: white; padding: 8px 12px; border-radius: 6px; box-shadow: 0 2px 4px rgba(0,0,0,0.2); font-size: 12px; }}
+        .legend i {{ display: inline-block; width: 14px; height: 14px; margin-right: 6px; vertical-align: middle; }}
+    </style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+    const indexes = {json.dumps(indexes, ensure_ascii=False)};
+    const gradeLabels = {json.dumps(GRADE_LABELS, ensure_ascii=False)};
+    const map = L.map('map').fitBounds([[{south}, {west}], [{north}, {east}]]);
+    L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
+        attribution: '&copy; OpenStreetMap contributors'
+    }}).addTo(map);
+
+    let active = indexes[0];
+
+    function gradeColor(grade, colors) {{
+        if (grade === undefined || grade < 1) return colors[0];
+        return colors[Math.min(grade, colors.length) - 1];
+    }}
+
+    const dongs = L.vectorGrid.protobuf('{metadata['tiles']}', {{
+        rendererFactory: L.canvas.tile,
+        minNativeZoom: {metadata['minzoom']},
+        maxNativeZoom: {metadata['maxzoom']},
+        interactive: true,
+        getFeatureId: feature => feature.properties.adm_cd2,
+        vectorTileLayerStyles: {{
+            {metadata['layer']}: function(properties) {{
+                return {{
+                    fill: true,
+                    fillColor: gradeColor(properties[active.grade], active.colors),
+                    fillOpacity: 0.7,
+                    color: 'black',
+                    weight: 0.5
+                }};
+            }}
+        }}
+    }}).addTo(map);
+
+    // 지수 선택 (타일 다시 그리기)
+    const layers = {{}};
+    indexes.forEach(config => {{ layers[config.name] = L.layerGroup(); }});
+    layers[active.name].addTo(map);
+    L.control.layers(layers, null, {{collapsed: false}}).addTo(map);
+    map.on('baselayerchange', function(e) {{
+        active = indexes.find(config => config.name === e.name);
+        dongs.redraw();
+        updateLegend();
+    }});
+
+    // 행정동 정보
+    const info = L.control({{position: 'bottomleft'}});
+    info.onAdd = function() {{
+        this._div = L.DomUtil.create('div', 'info');
+        this._div.innerHTML = '행정동 위에 마우스를 올리세요';
+        return this._div;
+    }};
+    info.addTo(map);
+    dongs.on('mouseover', function(e) {{
+        const props = e.layer.properties;
+        const value = props[active.value];
+        const grade = props[active.grade];
+        info._div.innerHTML = '<b>' + props.adm_nm + '</b><br>'
+            + active.name + ': ' + (value === undefined ? '-' : value.toFixed(1)) + '<br>'
+            + '등급: ' + (gradeLabels[grade - 1] || '보통');
+    }});
+
+    // 범례
+    const legend = L.control({{position: 'bottomright'}});
+    legend.onAdd = function() {{
+        this._div = L.DomUtil.create('div', 'info legend');
+        return this._div;
+    }};
+    legend.addTo(map);
+    function updateLegend() {{
+        legend._div.innerHTML = '<b>' + active.name + '</b><br>' + active.colors.map(
+            (color, i) => '<i style="background:' + color + '"></i>' + gradeLabels[i]).join('<br>');
+    }}
+    updateLegend();
+</script>
+</body>
+</html>
+"""
+    path = os.path.join(output_dir, 'index.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    return path
+
+
+def _read_varint(buf, pos):
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        shift += 7
+        if byte < 0x80:
+            return result, pos
+
+
+def _read_fields(buf):
+    """protobuf 메시지 → (필드 번호, 값) 목록 (varint는 정수, 나머지는 bytes)"""
+    pos, fields = 0, []
+    while pos < len(buf):
+        key, pos = _read_varint(buf, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(buf, pos)
+        elif wire_type == 1:
+            value, pos = bytes(buf[pos:pos + 8]), pos + 8
+        elif wire_type == 5:
+            value, pos = bytes(buf[pos:pos + 4]), pos + 4
+        else:
+            length, pos = _read_varint(buf, pos)
+            value, pos = bytes(buf[pos:pos + length]), pos + length
+        fields.append((field, value))
+    return fields
+
+
+def _read_packed(buf):
+    pos, values = 0, []
+    while pos < len(buf):
+        value, pos = _read_varint(buf, pos)
+        values.append(value)
+    return values
+
+
+def _unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def decode_tile(data):
+    """MVT 타일 → [(id, 속성, 링 목록)] (encode_layer 확인용 최소 디코더)"""
+    features = []
+    for _, layer in _read_fields(data):
+        keys, values, raw = [], [], []
+        for field, value in _read_fields(layer):
+            if field == 3:
+                keys.append(value.decode('utf-8'))
+            elif field == 4:
+                value_field, encoded = _read_fields(value)[0]
+                if value_field == 1:
+                    values.append(encoded.decode('utf-8'))
+                elif value_field == 6:
+                    values.append(_unzigzag(encoded))
+                else:
+                    values.append(struct.unpack('<d', encoded)[0])
+            elif field == 2:
+                raw.append(dict(_read_fields(value)))
+
+        for feature in raw:
+            tags = _read_packed(feature[2])
+            props = {keys[tags[k]]: values[tags[k + 1]] for k in range(0, len(tags), 2)}
+            geometry = _read_packed(feature[4])
+            rings, x, y, pos = [], 0, 0, 0
+            while pos < len(geometry):
+                command, count = geometry[pos] & 7, geometry[pos] >> 3
+                pos += 1
+                if command == 7:
+                    continue
+                for _ in range(count):
+                    x += _unzigzag(geometry[pos])
+                    y += _unzigzag(geometry[pos + 1])
+                    pos += 2
+                    if command == 1:
+                        rings.append([])
+                    rings[-1].append((x, y))
+            features.append((feature[1], props, rings))
+    return features
+
+
+def main():
+    """벡터 타일 피라미드와 지도 페이지 생성 후 타일 수/크기와 샘플 타일 복원 결과 출력"""
+    import time
+
+    geo_cache = load_geometry_cache(verbose=False)
+    attributes = tile_attributes(geo_cache)
+
+    print("🧱 벡터 타일 생성 중...")
+    start = time.time()
+    metadata = build_vector_tiles(geo_cache, attributes)
+    viewer = write_tile_viewer(metadata)
+    print(f"✅ 타일 {sum(metadata['tile_counts'].values()):,}개, {metadata['total_bytes'] / 1e6:.1f}MB, "
+          f"{time.time() - start:.1f}초")
+    print(f"🗺️ 지도: {viewer} (python -m http.server -d {OUTPUT_DIR} 8000)")
+
+    # 샘플 타일 확인: 최소/최대 줌에서 가장 큰 타일의 행정동 수와 속성 복원
+    for zoom in (MIN_ZOOM, MAX_ZOOM):
+        zoom_dir = os.path.join(OUTPUT_DIR, 'tiles', str(zoom))
+        paths = [os.path.join(root, name) for root, _, names in os.walk(zoom_dir) for name in names]
+        path = max(paths, key=os.path.getsize)
+        with open(path, 'rb') as f:
+            features = decode_tile(f.read())
+        by_code = attributes.set_index('adm_cd2')
+        same = all(props['adm_nm'] == by_code.loc[props['adm_cd2'], 'adm_nm'] for _, props, _ in features)
+        print(f"   - {os.path.relpath(path, OUTPUT_DIR)}: {os.path.getsize(path) / 1e3:.0f}KB, "
+              f"행정동 {len(features)}개, 속성 일치: {same}")
+    return metadata
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+통합 취약도 가중치 시나리오 분석
+(지역 × 지수) 값 행렬과 (지수 × 시나리오) 가중치 행렬의 곱 한 번으로
+수천 개 가중치 조합의 통합 점수/등급/순위 변화를 동시에 계산
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from grading import GRADE_SCALES, grade_values
+
+# 시나리오 가중치 키 → 지수 이름 (GeoJSON 속성 / 결과 CSV 컬럼)
+INDEX_COLUMNS = {
+    'housing': '주거취약지수',
+    'sewer': '수도인프라지수',
+    'social': '사회취약지수',
+    'rainfall': '강수량지수'
+}
+INDEX_KEYS = list(INDEX_COLUMNS)
+
+# 현재 통합 취약도 가중치
+DEFAULT_WEIGHTS = {
+    'housing': 0.3,
+    'sewer': 0.2,
+    'social': 0.2,
+    'rainfall': 0.3
+}
+
+# 하수도 인프라 지수 구성 지표 (SewerInfrastructureIndex.calculate_infrastructure_index와 같은 키)
+SEWER_COMPONENT_COLUMNS = {
+    '하수도설치율': '하수도설치율',
+    '공공하수처리구역 인구보급률': '공공하수처리구역 인구보급률',
+    '고도처리인구 보급률': '고도처리인구 보급률',
+    '인구밀도_정규화': '인구밀도_정규화'
+}
+
+SCORES_PATH = 'results/integrated_vulnerability_scores.csv'
+
+
+def weight_matrix(scenarios, keys=INDEX_KEYS):
+    """
+    가중치 시나리오 → (지수 × 시나리오) 행렬
+    Args:
+        scenarios: 가중치 dict 하나, {시나리오명: 가중치 dict}, 가중치 dict 리스트,
+                   DataFrame(행 = 시나리오, 열 = keys) 또는 (시나리오 수 × 지수 수) 배열
+        keys (list): 가중치 키 (기본값: INDEX_KEYS)
+    Returns:
+        pd.DataFrame: 행 = keys, 열 = 시나리오명
+    """
+    keys = list(keys)
+    if isinstance(scenarios, dict) and set(scenarios) <= set(keys):
+        scenarios = {'scenario_0': scenarios}
+    if isinstance(scenarios, dict):
+        frame = pd.DataFrame.from_dict(scenarios, orient='index')
+    elif isinstance(scenarios, pd.DataFrame):
+        frame = scenarios
+    elif isinstance(scenarios, np.ndarray):
+        frame = pd.DataFrame(scenarios, columns=keys)
+    else:
+        frame = pd.DataFrame(list(scenarios))
+
+    unknown = set(frame.columns) - set(keys)
+    if unknown:
+        raise ValueError(f"알 수 없는 지수 가중치: {sorted(unknown)} (가능: {keys})")
+    frame = frame.reindex(columns=keys).fillna(0.0).astype(np.float64)
+    if not isinstance(scenarios, (dict, pd.DataFrame)):
+        frame.index = [f'scenario_{i}' for i in range(len(frame))]
+    return frame.T
+
+
+def index_values(table, columns=INDEX_COLUMNS):
+    """
+    (지역 × 지수) 값 행렬
+    table 컬럼은 가중치 키(housing, sewer, ...) 또는 지수 이름(주거취약지수, ...) 모두 가능
+    """
+    names = [key if key in table.columns else column for key, column in columns.items()]
+    return table[names].to_numpy(dtype=np.float64)
+
+
+def integrated_scores(table, weights=DEFAULT_WEIGHTS, columns=INDEX_COLUMNS):
+    """
+    가중치 하나로 통합 취약도 계산
+    Returns:
+        pd.Series: table과 같은 인덱스
+    """
+    scores = index_values(table, columns) @ weight_matrix(weights, columns).to_numpy()
+    return pd.Series(scores[:, 0], index=table.index)
+
+
+def score_ranks(scores):
+    """
+    시나리오별 순위 (1 = 가장 취약), 동점은 앞 행 우선
+    Args:
+        scores (np.ndarray): (지역 × 시나리오)
+    """
+    order = np.argsort(-scores, axis=0, kind='stable')
+    ranks = np.empty(scores.shape, dtype=np.int32)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[0] + 1, dtype=np.int32)[:, None], axis=0)
+    return ranks
+
+
+def weight_grid(step=0.1, min_weight=0.0, keys=INDEX_KEYS):
+    """
+    합이 1인 가중치 조합 전체 (step 간격)
+    예: 지수 4개, step=0.05 → 1,771개 시나리오
+    """
+    keys = list(keys)
+    n = int(round(1 / step))
+    lo = int(round(min_weight / step))
+    rows = [
+        combo + (n - sum(combo),)
+        for combo in itertools.product(range(lo, n + 1), repeat=len(keys) - 1)
+        if n - sum(combo) >= lo
+    ]
+    weights = np.asarray(rows, dtype=np.float64) / n
+    return pd.DataFrame(weights, columns=keys,
+                        index=['/'.join(f'{w:g}' for w in row) for row in weights])
+
+
+class ScenarioSweep:
+    """
+    가중치 시나리오 일괄 평가 결과
+    - weights: (지수 × 시나리오) DataFrame
+    - scores: (지역 × 시나리오) 통합 점수
+    - grades: (지역 × 시나리오) 통합 등급 (1~5)
+    - ranks: (지역 × 시나리오) 순위 (1 = 가장 취약)
+    - baseline_scores / baseline_grades / baseline_ranks: 기준 가중치 결과
+    - rank_changes: 기준 순위 - 시나리오 순위 (양수 = 더 취약한 쪽으로 상승)
+    columns를 바꾸면 다른 가중 합산 지수에도 사용 가능
+    (예: SEWER_COMPONENT_COLUMNS + GRADE_SCALES['수도인프라']['bins'])
+    """
+
+    def __init__(self, table, scenarios, baseline=DEFAULT_WEIGHTS, grade_bins=None, columns=INDEX_COLUMNS):
+        if grade_bins is None:
+            grade_bins = GRADE_SCALES['통합']['bins']
+        self.regions = table.index
+        self.weights = weight_matrix(scenarios, columns)
+        values = index_values(table, columns)
+
+        # 기준 가중치를 0번째 열로 붙여 한 번의 행렬 곱으로 계산
+        all_weights = np.column_stack([weight_matrix(baseline, columns).to_numpy(), self.weights.to_numpy()])
+        all_scores = values @ all_weights
+        all_grades = grade_values(all_scores, grade_bins).astype(np.int8)
+        all_ranks = score_ranks(all_scores)
+
+        self.baseline_scores = all_scores[:, 0]
+        self.baseline_grades = all_grades[:, 0]
+        self.baseline_ranks = all_ranks[:, 0]
+        self.scores = all_scores[:, 1:]
+        self.grades = all_grades[:, 1:]
+        self.ranks = all_ranks[:, 1:]
+        self.rank_changes = self.baseline_ranks[:, None] - self.ranks
+
+    @property
+    def scenario_names(self):
+        return list(self.weights.columns)
+
+    def to_frame(self, kind='scores'):
+        """scores / grades / ranks / rank_changes → (지역 × 시나리오) DataFrame"""
+        return pd.DataFrame(getattr(self, kind), index=self.regions, columns=self.scenario_names)
+
+    def rank_stability(self, top_n=100):
+        """
+        지역별 순위 안정성 요약
+        Returns:
+            pd.DataFrame: 기준점수, 기준등급, 기준순위, 최고순위, 최저순위, 순위중앙값, 순위표준편차,
+                          최대순위변동, 상위N비율, 등급변경비율 (기준순위 순)
+        """
+        summary = pd.DataFrame({
+            '기준점수': self.baseline_scores,
+            '기준등급': self.baseline_grades,
+            '기준순위': self.baseline_ranks,
+            '최고순위': self.ranks.min(axis=1),
+            '최저순위': self.ranks.max(axis=1),
+            '순위중앙값': np.median(self.ranks, axis=1),
+            '순위표준편차': self.ranks.std(axis=1),
+            '최대순위변동': np.abs(self.rank_changes).max(axis=1),
+            f'상위{top_n}비율': (self.ranks <= top_n).mean(axis=1),
+            '등급변경비율': (self.grades != self.baseline_grades[:, None]).mean(axis=1)
+        }, index=self.regions)
+        return summary.sort_values('기준순위')
+
+    def scenario_summary(self, top_n=100):
+        """
+        시나리오별 요약: 기준 대비 순위 상관(스피어만), 상위 N 중복 비율, 등급이 바뀐 지역 비율
+        """
+        n = len(self.regions)
+        base = self.baseline_ranks.astype(np.float64)
+        ranks = self.ranks.astype(np.float64)
+        # 순위에 동점이 없으므로 스피어만 = 1 - 6Σd² / (n(n²-1))
+        d2 = ((ranks - base[:, None]) ** 2).sum(axis=0)
+        spearman = 1 - 6 * d2 / (n * (n ** 2 - 1)) if n > 1 else np.ones(len(d2))
+        base_top = self.baseline_ranks <= top_n
+        top_overlap = ((self.ranks <= top_n) & base_top[:, None]).sum(axis=0) / max(base_top.sum(), 1)
+        grade_changed = (self.grades != self.baseline_grades[:, None]).mean(axis=0)
+        summary = self.weights.T.copy()
+        summary['순위상관'] = spearman
+        summary[f'상위{top_n}유지율'] = top_overlap
+        summary['등급변경비율'] = grade_changed
+        return summary
+
+
+def sweep_scenarios(table, scenarios, baseline=DEFAULT_WEIGHTS, grade_bins=None, columns=INDEX_COLUMNS):
+    """
+    가중치 시나리오 일괄 평가
+    Args:
+        table (pd.DataFrame): 지역별 지수 값 (인덱스 = 지역, 컬럼 = 가중치 키 또는 지수 이름)
+        scenarios: weight_matrix가 받는 형식의 가중치 시나리오
+        baseline (dict): 순위 변화의 기준 가중치
+        grade_bins (list): 등급 구간 (기본값: 통합 등급)
+        columns (dict): 가중치 키 → 컬럼 이름 (기본값: INDEX_COLUMNS)
+    Returns:
+        ScenarioSweep
+    """
+    return ScenarioSweep(table, scenarios, baseline=baseline, grade_bins=grade_bins, columns=columns)
+
+
+def main(step=0.05, top_n=100):
+    """행정동별 지수 결과로 step 간격의 전체 가중치 조합 평가"""
+    import time
+
+    table = pd.read_csv(SCORES_PATH, dtype={'adm_cd2': str}, encoding='utf-8-sig').set_index('adm_cd2')
+    scenarios = weight_grid(step)
+    print(f"📊 {len(table):,}개 행정동 × {len(scenarios):,}개 가중치 시나리오 (간격 {step})")
+
+    start = time.time()
+    sweep = sweep_scenarios(table, scenarios)
+    print(f"⚡ 점수/등급/순위 계산: {time.time() - start:.2f}초")
+
+    # 기준 가중치 결과가 지도 스크립트의 통합취약도와 같은지 확인
+    diff = np.abs(sweep.baseline_scores - table['통합취약도'].to_numpy()).max()
+    print(f"   기준 가중치 점수 최대 차이: {diff:.2e}")
+
+    stability = sweep.rank_stability(top_n)
+    names = table['adm_nm'].reindex(stability.index)
+    print(f"\n🏅 기준 상위 10개 행정동의 순위 안정성 (상위 {top_n} 기준)")
+    for adm_cd2, row in stability.head(10).iterrows():
+        print(f"   {int(row['기준순위']):>3}위 {names[adm_cd2]}: {int(row['최고순위'])}~{int(row['최저순위'])}위, "
+              f"상위{top_n} {row[f'상위{top_n}비율']:.0%}, 등급 변경 {row['등급변경비율']:.0%}")
+
+    scenario_summary = sweep.scenario_summary(top_n)
+    worst = scenario_summary.nsmallest(3, '순위상관')
+    print("\n⚠️ 기준과 순위가 가장 다른 시나리오")
+    for name, row in worst.iterrows():
+        print(f"   {name}: 순위상관 {row['순위상관']:.3f}, 상위{top_n} 유지 {row[f'상위{top_n}유지율']:.0%}")
+    return sweep
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+통합 취약도 몬테카를로 민감도 분석
+기준 가중치 주변의 디리클레 가중치와 등급 경계 흔들림을 표본 추출하여
+읍면동별 상위 N 우선지역 확률, 순위 신뢰구간, 등급 확률을 계산
+표본은 청크 단위로 프로세스 풀에 나누어 처리하고, 누적 결과(순위 히스토그램)만 모아 메모리 사용량을 고정
+(부모 프로세스에는 누적 합계와 워커 수 이하의 작업 결과만 남음)
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from grading import GRADE_SCALES, grade_values
+from weight_scenarios import DEFAULT_WEIGHTS, INDEX_COLUMNS, SCORES_PATH, index_values, score_ranks
+
+SENSITIVITY_PATH = 'results/weight_sensitivity.csv'
+SENSITIVITY_META_PATH = 'results/weight_sensitivity.json'
+
+# 표본 설정
+N_SAMPLES = 100_000
+CHUNK_SIZE = 500          # 한 번에 처리하는 표본 수 (청크 메모리 ≈ 지역 수 × CHUNK_SIZE × 8바이트 × 3)
+N_TASKS = 16              # 작업 수 (워커 수와 무관하게 고정 → 같은 시드면 같은 결과)
+CONCENTRATION = 50.0      # 디리클레 집중도 (α = CONCENTRATION × 기준 가중치, 클수록 기준 가중치에 가까움)
+BIN_JITTER = 2.5          # 등급 경계 흔들림 표준편차 (지수 점수 단위)
+TOP_N = 100               # 우선지역 수
+CI_LEVEL = 0.95           # 순위 신뢰구간 수준
+SEED = 42
+
+# 워커 프로세스에서 공유하는 (지역 × 지수) 값 행렬
+_VALUES = None
+
+
+def _init_worker(values):
+    global _VALUES
+    _VALUES = values
+
+
+def _simulate(task):
+    """
+    표본 n_samples개를 CHUNK_SIZE씩 계산하여 누적 결과만 반환
+    Args:
+        task (dict): seed, n_samples, alpha, bins, jitter, top_n, chunk_size
+    Returns:
+        dict: rank_hist (지역 × 순위), grade_counts (지역 × 등급), top_counts (지역), n_samples
+    """
+    values = _VALUES
+    n_regions, n_grades = values.shape[0], len(task['bins']) - 1
+    rng = np.random.default_rng(task['seed'])
+    inner_bins = np.asarray(task['bins'][1:-1], dtype=np.float64)
+    values_t = np.ascontiguousarray(values.T)
+    rank_positions = np.arange(n_regions, dtype=np.int64)
+
+    # 순위 히스토그램은 작업마다 지역² 크기로 고정 (int32: 지역 3,500개 기준 약 49MB)
+    rank_hist = np.zeros(n_regions * n_regions, dtype=np.int32)
+    grade_counts = np.zeros((n_regions, n_grades), dtype=np.int64)
+
+    remaining = task['n_samples']
+    while remaining > 0:
+        size = min(task['chunk_size'], remaining)
+        remaining -= size
+
+        weights = rng.dirichlet(task['alpha'], size=size)
+        thresholds = inner_bins + rng.normal(0.0, task['jitter'], size=(size, len(inner_bins)))
+        thresholds.sort(axis=1)
+
+        # (표본 × 지역) 점수, 행마다 내림차순 정렬 → order[s, r] = 표본 s에서 r+1위 지역
+        scores = weights @ values_t
+        order = np.argsort(-scores, axis=1, kind='stable')
+        # 지역 × 순위 히스토그램: 평탄화 인덱스 (지역 * n + 순위 - 1)
+        rank_hist += np.bincount((order * n_regions + rank_positions).ravel(), minlength=n_regions * n_regions)
+
+        # 표본별 경계로 등급 계산 (경계 이상 개수 + 1)
+        grades = np.zeros(scores.shape, dtype=np.int8)
+        for j in range(len(inner_bins)):
+            grades += scores >= thresholds[:, j:j + 1]
+        for g in range(n_grades):
+            grade_counts[:, g] += (grades == g).sum(axis=0)
+
+    rank_hist = rank_hist.reshape(n_regions, n_regions)
+    return {
+        'rank_hist': rank_hist,
+        'grade_counts': grade_counts,
+        'top_counts': rank_hist[:, :task['top_n']].sum(axis=1, dtype=np.int64),
+        'n_samples': task['n_samples']
+    }
+
+
+def rank_quantiles(rank_hist, quantiles):
+    """
+    순위 히스토그램 → 지역별 순위 분위수 (1 = 가장 취약)
+    Args:
+        rank_hist (np.ndarray): (지역 × 순위) 표본 수
+        quantiles (list): 0~1 분위
+    Returns:
+        np.ndarray: (지역 × 분위 수)
+    """
+    cdf = np.cumsum(rank_hist, axis=1)
+    totals = cdf[:, -1:]
+    return np.stack([(cdf < q * totals).sum(axis=1) + 1 for q in quantiles], axis=1)
+
+
+def simulate(values, n_samples=N_SAMPLES, weights=DEFAULT_WEIGHTS, grade_bins=None,
+             concentration=CONCENTRATION, jitter=BIN_JITTER, top_n=TOP_N,
+             chunk_size=CHUNK_SIZE, max_workers=None, seed=SEED):
+    """
+    몬테카를로 표본 계산 (프로세스 풀)
+    Args:
+        values (np.ndarray): (지역 × 지수) 값 행렬, 열 순서는 INDEX_KEYS
+        n_samples (int): 전체 표본 수
+        weights (dict): 디리클레 분포의 중심 가중치
+        grade_bins (list): 기준 등급 경계 (기본값: 통합 등급)
+        concentration (float): 디리클레 집중도
+        jitter (float): 등급 경계 흔들림 표준편차
+        top_n (int): 우선지역 수
+        chunk_size (int): 워커가 한 번에 계산하는 표본 수
+        max_workers (int): 프로세스 수 (기본값: CPU 수)
+        seed (int): 난수 시드 (같은 시드와 작업 분할이면 같은 결과)
+    Returns:
+        dict: rank_hist, grade_counts, top_counts, n_samples
+    """
+    if grade_bins is None:
+        grade_bins = GRADE_SCALES['통합']['bins']
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    alpha = concentration * np.array([weights.get(key, 0.0) for key in INDEX_COLUMNS], dtype=np.float64)
+    if (alpha <= 0).any():
+        raise ValueError(f"디리클레 중심 가중치는 모두 0보다 커야 합니다: {weights}")
+
+    n_tasks = max(1, min(N_TASKS, -(-n_samples // chunk_size)))
+    sizes = np.full(n_tasks, n_samples // n_tasks)
+    sizes[:n_samples % n_tasks] += 1
+    seeds = np.random.SeedSequence(seed).spawn(n_tasks)
+    tasks = [
+        {'seed': s, 'n_samples': int(size), 'alpha': alpha, 'bins': list(grade_bins),
+         'jitter': jitter, 'top_n': top_n, 'chunk_size': chunk_size}
+        for s, size in zip(seeds, sizes) if size > 0
+    ]
+
+    values = np.asarray(values, dtype=np.float64)
+    total = None
+
+    def accumulate(part):
+        nonlocal total
+        if total is None:
+            total = part
+        else:
+            for key in ('rank_hist', 'grade_counts', 'top_counts', 'n_samples'):
+                total[key] += part[key]
+
+    if max_workers == 1:
+        _init_worker(values)
+        for task in tasks:
+            accumulate(_simulate(task))
+        return total
+
+    # 작업별 순위 히스토그램(지역² int32)이 부모 프로세스에 쌓이지 않도록
+    # 진행 중인 작업을 워커 수로 제한하고, 끝난 작업은 바로 누적한 뒤 버림
+    pending = set()
+    queue = iter(tasks)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(values,)) as pool:
+        for task in queue:
+            pending.add(pool.submit(_simulate, task))
+            if len(pending) >= max_workers:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                accumulate(future.result())
+                next_task = next(queue, None)
+                if next_task is not None:
+                    pending.add(pool.submit(_simulate, next_task))
+            del done, future
+    return total
+
+
+def sensitivity_table(table, result, weights=DEFAULT_WEIGHTS, grade_bins=None, top_n=TOP_N, ci_level=CI_LEVEL):
+    """
+    표본 누적 결과 → 읍면동별 민감도 표
+    Returns:
+        pd.DataFrame: 기준점수, 기준순위, 기준등급, 상위N확률, 평균순위, 순위하한, 순위중앙값, 순위상한,
+                      등급유지확률, 등급별 확률 (상위N확률 내림차순, 같으면 기준순위 순)
+    """
+    if grade_bins is None:
+        grade_bins = GRADE_SCALES['통합']['bins']
+    values = index_values(table)
+    w = np.array([weights.get(key, 0.0) for key in INDEX_COLUMNS], dtype=np.float64)
+    base_scores = values @ w
+    base_ranks = score_ranks(base_scores[:, None])[:, 0]
+    base_grades = grade_values(base_scores, grade_bins)
+
+    n = result['n_samples']
+    tail = (1 - ci_level) / 2
+    bounds = rank_quantiles(result['rank_hist'], [tail, 0.5, 1 - tail])
+    mean_rank = result['rank_hist'] @ np.arange(1, len(table) + 1) / n
+    grade_prob = result['grade_counts'] / n
+
+    summary = pd.DataFrame(index=table.index)
+    for column in ('sidonm', 'adm_nm'):
+        if column in table.columns:
+            summary[column] = table[column]
+    summary['기준점수'] = base_scores
+    summary['기준순위'] = base_ranks
+    summary['기준등급'] = base_grades
+    summary[f'상위{top_n}확률'] = result['top_counts'] / n
+    summary['평균순위'] = mean_rank
+    summary['순위하한'] = bounds[:, 0]
+    summary['순위중앙값'] = bounds[:, 1]
+    summary['순위상한'] = bounds[:, 2]
+    summary['등급유지확률'] = grade_prob[np.arange(len(table)), base_grades - 1]
+    for g, label in enumerate(GRADE_SCALES['통합']['labels'][:grade_prob.shape[1]]):
+        summary[f'{label}확률'] = grade_prob[:, g]
+    return summary.sort_values([f'상위{top_n}확률', '기준순위'], ascending=[False, True])
+
+
+def load_sensitivity(path=SENSITIVITY_PATH, meta_path=SENSITIVITY_META_PATH):
+    """저장된 민감도 표와 실행 설정 (없으면 (None, None))"""
+    if not os.path.exists(path):
+        return None, None
+    summary = pd.read_csv(path, dtype={'adm_cd2': str}, encoding='utf-8-sig').set_index('adm_cd2')
+    meta = None
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    return summary, meta
+
+
+def main(n_samples=N_SAMPLES, max_workers=None, top_n=TOP_N):
+    """행정동별 지수 결과(SCORES_PATH)로 민감도 분석 후 SENSITIVITY_PATH 저장"""
+    table = pd.read_csv(SCORES_PATH, dtype={'adm_cd2': str}, encoding='utf-8-sig').set_index('adm_cd2')
+    workers = max_workers or os.cpu_count() or 1
+    print(f"🎲 몬테카를로 민감도 분석: {len(table):,}개 행정동 × {n_samples:,}개 표본 ({workers}개 프로세스)")
+    print(f"   디리클레 집중도 {CONCENTRATION:g}, 등급 경계 흔들림 σ={BIN_JITTER:g}, 상위 {top_n}개 우선지역")
+
+    start = time.time()
+    result = simulate(index_values(table), n_samples=n_samples, top_n=top_n, max_workers=workers)
+    elapsed = time.time() - start
+    print(f"⚡ 표본 계산: {elapsed:.1f}초 ({n_samples / elapsed:,.0f}개/초)")
+
+    summary = sensitivity_table(table, result, top_n=top_n)
+    summary.to_csv(SENSITIVITY_PATH, index_label='adm_cd2', encoding='utf-8-sig')
+    meta = {
+        'n_samples': int(result['n_samples']),
+        'concentration': CONCENTRATION,
+        'bin_jitter': BIN_JITTER,
+        'top_n': top_n,
+        'ci_level': CI_LEVEL,
+        'weights': DEFAULT_WEIGHTS,
+        'grade_bins': GRADE_SCALES['통합']['bins'],
+        'seed': SEED
+    }
+    with open(SENSITIVITY_META_PATH, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    print(f"💾 민감도 결과 저장: {SENSITIVITY_PATH}")
+
+    prob = summary[f'상위{top_n}확률']
+    print(f"\n📌 상위 {top_n} 확률 90% 이상: {(prob >= 0.9).sum()}개, "
+          f"10~90% (경계): {((prob >= 0.1) & (prob < 0.9)).sum()}개")
+    for adm_cd2, row in summary.head(10).iterrows():
+        print(f"   {row['adm_nm']}: 기준 {int(row['기준순위'])}위, 상위{top_n} {row[f'상위{top_n}확률']:.0%}, "
+              f"순위 {int(row['순위하한'])}~{int(row['순위상한'])}위")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
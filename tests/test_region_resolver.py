@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+SewerRegionResolver 회귀 테스트
+전국 행정동 전체에 대해 컴파일된 매칭(resolve_batch)이 기존 flexible_sewer_mapping과
+같은 하수도 행과 같은 매칭 단계를 돌려주는지 확인
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+
+from geo_cache import GEO_PATHS, load_geometry_cache  # noqa: E402
+from region_resolver import SewerRegionResolver, flexible_sewer_mapping  # noqa: E402
+
+SEWER_SUMMARY_PATH = os.path.join(ROOT_DIR, 'results/yunjin/sewer_infrastructure_analysis_summary.csv')
+
+
+@pytest.fixture(scope='module')
+def regions():
+    """하수도 요약표와 행정동별 (시도명, 시도를 뺀 행정구역명)"""
+    if not os.path.exists(SEWER_SUMMARY_PATH):
+        pytest.skip(f"하수도 요약표 없음: {SEWER_SUMMARY_PATH}")
+    sewer_data = pd.read_csv(SEWER_SUMMARY_PATH)
+    sewer_data_unique = sewer_data.drop_duplicates(subset=['시도', '행정구역명']).copy()
+    sewer_data_unique['시도'] = sewer_data_unique['시도'].astype(str)
+    sewer_data_unique['행정구역명'] = sewer_data_unique['행정구역명'].astype(str)
+    sewer_dict = sewer_data_unique.set_index(['시도', '행정구역명']).to_dict(orient='index')
+
+    cache = load_geometry_cache(base_dir=ROOT_DIR, verbose=False)
+    if len(cache) == 0:
+        pytest.skip(f"행정동 GeoJSON 없음 ({len(GEO_PATHS)}개 시도 경로)")
+    sidonms = [p.get('sidonm', '') for p in cache.properties]
+    # 시도명을 제외한 행정구역명 (create_fixed_integrated_map.extract_sgg_name과 동일)
+    sggnms = [' '.join(p.get('adm_nm', '').split()[1:]) or p.get('adm_nm', '') for p in cache.properties]
+    return sewer_data_unique, sewer_dict, sidonms, sggnms
+
+
+def test_resolve_batch_matches_flexible_sewer_mapping(regions):
+    sewer_data_unique, sewer_dict, sidonms, sggnms = regions
+    resolver = SewerRegionResolver(sewer_data_unique)
+    positions, stages = resolver.resolve_batch(sidonms, sggnms)
+
+    mismatches = []
+    for i, (sidonm, sggnm) in enumerate(zip(sidonms, sggnms)):
+        row, stage = flexible_sewer_mapping(sidonm, sggnm, sewer_dict, sewer_data_unique, return_stage=True)
+        new_row = resolver.row(positions[i])
+        # 1~3단계 결과에는 인덱스 컬럼(시도, 행정구역명)이 없으므로 공통 컬럼만 비교
+        if row is None or new_row is None:
+            same_row = row is None and new_row is None
+        else:
+            same_row = all(pd.isna(row[c]) and pd.isna(new_row[c]) or row[c] == new_row[c]
+                           for c in row if c in new_row)
+        if not same_row or stage != stages[i]:
+            mismatches.append((sidonm, sggnm, stage, stages[i]))
+
+    assert len(positions) == len(sidonms)
+    assert mismatches == [], f"불일치 {len(mismatches)}개: {mismatches[:5]}"
+
+
+def test_resolve_batch_memoizes_repeated_names(regions):
+    sewer_data_unique, _, sidonms, sggnms = regions
+    resolver = SewerRegionResolver(sewer_data_unique)
+    positions, stages = resolver.resolve_batch(sidonms[:50] * 2, sggnms[:50] * 2)
+    assert list(positions[:50]) == list(positions[50:])
+    assert list(stages[:50]) == list(stages[50:])